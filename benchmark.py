@@ -22,6 +22,12 @@ class ObjectBoxPerf:
     def read_all(self):
         return self.box.get_all()
 
+    def find_indexed(self, value: int):
+        return self.box.query(TestEntity.cls.int64.equals(value)).build().find()
+
+    def find_unindexed(self, value: int):
+        return self.box.query(TestEntity.cls.date.equals(value)).build().find()
+
 
 class Timer:
     """
@@ -68,6 +74,15 @@ class PerfExecutor:
             with Timer(times["update-many"]):
                 self.perf.put_many(items)
 
+            # 100 lookups by the same values, once using an index (int64) and once scanning all objects (date)
+            with Timer(times["find-indexed"]):
+                for value in range(0, count, max(1, count // 100)):
+                    self.perf.find_indexed(value)
+
+            with Timer(times["find-unindexed"]):
+                for value in range(0, count, max(1, count // 100)):
+                    self.perf.find_unindexed(value)
+
             with Timer(times["remove-all"]):
                 self.perf.remove_all()
 
@@ -95,6 +110,8 @@ class PerfExecutor:
             object.str = "Entity no. %d" % i
             object.float = i * 1.1
             object.int = i
+            object.int64 = i
+            object.date = i
             result.append(object)
         return result
 
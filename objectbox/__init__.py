@@ -13,18 +13,23 @@
 # limitations under the License.
 
 
-from objectbox.box import Box
+from objectbox.async_box import AsyncBox
+from objectbox.box import Box, PutMode
 from objectbox.builder import Builder
 from objectbox.model import Model
 from objectbox.objectbox import ObjectBox
+from objectbox.observer import Observer
 from objectbox.c import NotFoundException, version_core
 from objectbox.version import Version
 
 __all__ = [
+    'AsyncBox',
     'Box',
+    'PutMode',
     'Builder',
     'Model',
     'ObjectBox',
+    'Observer',
     'NotFoundException',
     'version',
     'version_info',
@@ -0,0 +1,324 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# asyncio API: awaitable counterparts of Box, Query and the transactions.
+# The blocking calls run on threads owned by the store (ObjectBox._aio): reads on up to max_readers reader threads,
+# writes on a single writer thread, serialized by an asyncio lock so they don't contend for the write transaction.
+# Native transactions are bound to a thread, so each reader "thread" is an executor with a single thread, which a
+# read transaction keeps for its whole duration. An ObjectBox must only be used with one event loop.
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import objectbox.box
+import objectbox.query_builder
+from objectbox.objectbox import ObjectBox
+from objectbox.model.entity import _Entity
+from objectbox.condition import QueryCondition
+
+# the transaction of the current task, see read_tx()/write_tx()
+_current_tx = contextvars.ContextVar("objectbox_aio_tx", default=None)
+
+
+class _Threads:
+    """The threads of a store running the blocking calls; asyncio primitives are created lazily, in the event loop"""
+
+    def __init__(self, max_readers: int):
+        self._max_readers = max_readers
+        self._readers_semaphore = None
+        self._idle_readers = []
+        self._readers = []
+        self._write_lock = None
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="objectbox-writer")
+
+    @property
+    def write_lock(self) -> asyncio.Lock:
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+    async def acquire_reader(self) -> ThreadPoolExecutor:
+        if self._readers_semaphore is None:
+            self._readers_semaphore = asyncio.Semaphore(self._max_readers)
+        await self._readers_semaphore.acquire()
+        if self._idle_readers:
+            return self._idle_readers.pop()
+        reader = ThreadPoolExecutor(1, thread_name_prefix="objectbox-reader")
+        self._readers.append(reader)
+        return reader
+
+    def release_reader(self, reader: ThreadPoolExecutor):
+        self._idle_readers.append(reader)
+        self._readers_semaphore.release()
+
+    def shutdown(self):
+        for executor in self._readers + [self.writer]:
+            executor.shutdown()
+
+
+def _threads(ob: ObjectBox) -> _Threads:
+    if ob._aio is None:
+        if not ob._c_store:
+            raise Exception("The store is closed")
+        ob._aio = _Threads(ob._max_readers)
+    return ob._aio
+
+
+async def _call(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def _read(ob: ObjectBox, fn, *args, **kwargs):
+    tx = _current_tx.get()
+    if tx is not None and tx._ob is ob:
+        return await _call(tx._executor, fn, *args, **kwargs)
+
+    threads = _threads(ob)
+    reader = await threads.acquire_reader()
+    try:
+        return await _call(reader, fn, *args, **kwargs)
+    finally:
+        # if cancelled, the call may still be running; further calls on this thread simply queue up behind it
+        threads.release_reader(reader)
+
+
+async def _write(ob: ObjectBox, fn, *args, **kwargs):
+    tx = _current_tx.get()
+    if tx is not None and tx._ob is ob:
+        if not tx._write:
+            raise Exception("Can't write inside a read transaction")
+        return await _call(tx._executor, fn, *args, **kwargs)
+
+    threads = _threads(ob)
+    async with threads.write_lock:
+        return await _call(threads.writer, fn, *args, **kwargs)
+
+
+class _Transaction:
+    """Async context manager running a native transaction on a thread of the store. Calls of objectbox.aio made by the
+    same task inside the context run in the transaction; nested contexts join it. Cancellation-safe: whenever the
+    context is left (or entering it is cancelled), the transaction is committed or aborted on its thread before the
+    thread is released."""
+
+    def __init__(self, ob: ObjectBox, write: bool):
+        self._ob = ob
+        self._write = write
+        self._executor = None
+        self._tx = None  # the synchronous context manager, entered on the transaction's thread
+        self._entered = False
+        self._token = None
+        self._nested = False
+
+    async def __aenter__(self):
+        outer = _current_tx.get()
+        if outer is not None and outer._ob is self._ob:
+            if self._write and not outer._write:
+                raise Exception("Cannot start a write transaction inside a read only transaction")
+            # nested: calls keep running in the outer transaction, which is committed (or aborted) by its own context
+            self._nested = True
+            return self
+
+        threads = _threads(self._ob)
+        if self._write:
+            await threads.write_lock.acquire()
+            self._executor = threads.writer
+        else:
+            self._executor = await threads.acquire_reader()
+
+        try:
+            await _call(self._executor, self._begin)
+        except BaseException as exc:
+            # e.g. cancelled while waiting: _begin() may run anyway, _end() runs after it (same thread) and undoes it
+            await asyncio.shield(_call(self._executor, self._end, type(exc), exc, exc.__traceback__))
+            self._release()
+            raise
+
+        self._token = _current_tx.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._nested:
+            return False
+        _current_tx.reset(self._token)
+        try:
+            await asyncio.shield(_call(self._executor, self._end, exc_type, exc_val, exc_tb))
+        finally:
+            self._release()
+        return False
+
+    def _begin(self):
+        self._tx = self._ob.write_tx() if self._write else self._ob.read_tx()
+        self._tx.__enter__()
+        self._entered = True
+
+    def _end(self, exc_type, exc_val, exc_tb):
+        if self._entered:
+            self._entered = False
+            self._tx.__exit__(exc_type, exc_val, exc_tb)
+
+    def _release(self):
+        threads = self._ob._aio
+        if threads is None:
+            return
+        if self._write:
+            threads.write_lock.release()
+        else:
+            threads.release_reader(self._executor)
+
+
+def read_tx(ob: ObjectBox) -> _Transaction:
+    """`async with objectbox.aio.read_tx(ob): ...` - calls inside the block share a single read transaction"""
+    return _Transaction(ob, False)
+
+
+def write_tx(ob: ObjectBox) -> _Transaction:
+    """`async with objectbox.aio.write_tx(ob): ...` - calls inside the block run in a single write transaction,
+    committed when the block completes and aborted if it raises (or is cancelled)"""
+    return _Transaction(ob, True)
+
+
+class Box:
+    """Awaitable counterpart of objectbox.Box, see there for the arguments and results"""
+
+    def __init__(self, ob: ObjectBox, entity: _Entity, cache_size: int = 0):
+        self._ob = ob
+        self._box = objectbox.box.Box(ob, entity, cache_size)
+
+    async def is_empty(self) -> bool:
+        return await _read(self._ob, self._box.is_empty)
+
+    async def count(self, limit: int = 0) -> int:
+        return await _read(self._ob, self._box.count, limit)
+
+    async def get(self, id: int, **kwargs):
+        return await _read(self._ob, self._box.get, id, **kwargs)
+
+    async def get_many(self, ids, **kwargs) -> list:
+        return await _read(self._ob, self._box.get_many, ids, **kwargs)
+
+    async def get_all(self, **kwargs) -> list:
+        return await _read(self._ob, self._box.get_all, **kwargs)
+
+    async def get_all_columns(self, props=None, string_dtype=object) -> dict:
+        return await _read(self._ob, self._box.get_all_columns, props, string_dtype)
+
+    async def contains(self, id: int) -> bool:
+        return await _read(self._ob, self._box.contains, id)
+
+    async def contains_many(self, ids):
+        return await _read(self._ob, self._box.contains_many, ids)
+
+    async def put(self, *objects, **kwargs):
+        return await _write(self._ob, self._box.put, *objects, **kwargs)
+
+    async def insert_many(self, objects: list) -> list:
+        return await _write(self._ob, self._box.insert_many, objects)
+
+    async def update_many(self, objects: list) -> list:
+        return await _write(self._ob, self._box.update_many, objects)
+
+    async def put_columns(self, columns, **kwargs):
+        return await _write(self._ob, self._box.put_columns, columns, **kwargs)
+
+    async def update(self, id: int, **fields):
+        return await _write(self._ob, self._box.update, id, **fields)
+
+    async def remove(self, id_or_object):
+        return await _write(self._ob, self._box.remove, id_or_object)
+
+    async def remove_many(self, ids) -> int:
+        return await _write(self._ob, self._box.remove_many, ids)
+
+    async def remove_all(self) -> int:
+        return await _write(self._ob, self._box.remove_all)
+
+    def query(self, condition: QueryCondition = None) -> 'QueryBuilder':
+        return QueryBuilder(self._ob, self._box, self._box._entity, condition)
+
+
+class QueryBuilder(objectbox.query_builder.QueryBuilder):
+    def build(self) -> 'Query':
+        return Query(super().build())
+
+
+class Query:
+    """Awaitable counterpart of objectbox.query.Query, see there for the arguments and results"""
+
+    def __init__(self, query):
+        self._ob = query._ob
+        self._query = query
+
+    async def find(self, **kwargs) -> list:
+        return await _read(self._ob, self._query.find, **kwargs)
+
+    async def find_columns(self, props=None, string_dtype=object) -> dict:
+        return await _read(self._ob, self._query.find_columns, props, string_dtype)
+
+    async def count(self) -> int:
+        return await _read(self._ob, self._query.count)
+
+    async def remove(self) -> int:
+        return await _write(self._ob, self._query.remove)
+
+    async def update(self, **fields) -> int:
+        return await _write(self._ob, self._query.update, **fields)
+
+    def property(self, prop) -> 'PropertyQuery':
+        return PropertyQuery(self._ob, self._query.property(prop))
+
+    def set(self, **params) -> 'Query':
+        self._query.set(**params)
+        return self
+
+    def close(self):
+        self._query.close()
+
+    def offset(self, offset: int) -> 'Query':
+        self._query.offset(offset)
+        return self
+
+    def limit(self, limit: int) -> 'Query':
+        self._query.limit(limit)
+        return self
+
+
+class PropertyQuery:
+    """Awaitable counterpart of objectbox.query.PropertyQuery, see there for the arguments and results"""
+
+    def __init__(self, ob: ObjectBox, query):
+        self._ob = ob
+        self._query = query
+
+    async def min(self):
+        return await _read(self._ob, self._query.min)
+
+    async def max(self):
+        return await _read(self._ob, self._query.max)
+
+    async def sum(self):
+        return await _read(self._ob, self._query.sum)
+
+    async def avg(self):
+        return await _read(self._ob, self._query.avg)
+
+    async def count(self, distinct: bool = False, case_sensitive: bool = True) -> int:
+        return await _read(self._ob, self._query.count, distinct, case_sensitive)
+
+    async def find(self):
+        return await _read(self._ob, self._query.find)
+
+    async def distinct(self, case_sensitive: bool = True):
+        return await _read(self._ob, self._query.distinct, case_sensitive)
@@ -0,0 +1,93 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from objectbox.box import Box, PutMode
+from objectbox.c import *
+
+
+class AsyncBox:
+    """Submits puts and removes to the native async queue of the store and returns immediately.
+    Queued operations are executed in the background, batched into transactions by the core (see
+    Builder.async_max_queue_length() and Builder.async_max_batch_size()). Errors that happen while executing them
+    can't be reported to the caller (the core logs them); use await_completion() before relying on the results.
+    Close the AsyncBox (or use it as a context manager) before closing the store."""
+
+    def __init__(self, box: Box, enqueue_timeout_ms: int = 0):
+        """enqueue_timeout_ms: how long to wait for space in a full queue before failing; 0 for the core default"""
+        self._box = box
+        self._ob = box._ob
+        self._entity = box._entity
+        self._c_async = obx_async_create(box._c_box, enqueue_timeout_ms)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        c_async_to_close = self._c_async
+        if c_async_to_close:
+            self._c_async = None
+            obx_async_close(c_async_to_close)
+
+    def put(self, obj, mode: PutMode = PutMode.put) -> int:
+        """Queues putting the object and returns its ID; new objects get their ID assigned right away"""
+        id = self._entity.get_object_id(obj)
+        if not id:
+            if mode == PutMode.update:
+                raise Exception("Objects without an ID can't be updated")
+            # note: the core doesn't accept put_id_guaranteed_to_be_new for async operations
+            id = obx_box_id_for_put(self._box._c_box, 0)
+            self._entity.set_object_id(obj, id)
+
+        data = self._entity.marshal(obj, id)
+        self._box._expect(id, bytes(data))
+        obx_async_put5(self._c_async, id, data, len(data), mode)
+        return id
+
+    def insert(self, obj) -> int:
+        """Like put() but the object is only stored if its ID doesn't exist yet"""
+        return self.put(obj, PutMode.insert)
+
+    def update(self, obj) -> int:
+        """Like put() but the object is only stored if its ID exists already"""
+        return self.put(obj, PutMode.update)
+
+    def remove(self, id_or_object):
+        if isinstance(id_or_object, self._entity.cls):
+            id = self._entity.get_object_id(id_or_object)
+        else:
+            id = id_or_object
+        self._box._expect(id, None)
+        obx_async_remove(self._c_async, id)
+
+    def await_completion(self) -> bool:
+        """Waits until all operations queued so far (by any AsyncBox of the store) have been executed and committed.
+        Returns False if the queue was not empty after waiting, e.g. because the store is being closed."""
+        return self._await(obx_store_await_async_completion)
+
+    def await_submitted(self) -> bool:
+        """Waits until all operations submitted before this call have been executed and committed; unlike
+        await_completion(), operations queued in the meantime (e.g. by other threads) are not waited for."""
+        return self._await(obx_store_await_async_submitted)
+
+    def _await(self, fn) -> bool:
+        # operations queued before the call are committed afterwards, so their objects can be cached again
+        pending = [(cache, cache.pending()) for caches in list(self._ob._caches.values()) for cache in list(caches)]
+        done = fn(self._ob._c_store)
+        if done:
+            for cache, expected in pending:
+                cache.settle(expected)
+        return done
@@ -16,18 +16,84 @@
 from objectbox.model.entity import _Entity
 from objectbox.objectbox import ObjectBox
 from objectbox.query_builder import QueryBuilder
-from objectbox.condition import QueryCondition
+from objectbox.condition import QueryCondition, _ConditionOp
+from objectbox.query import Query
+from objectbox.cursor import Cursor
+from objectbox.cache import ObjectCache
+import objectbox.parallel as parallel
+import objectbox.model.codec as codec
 from objectbox.c import *
+from enum import IntEnum
+import numpy as np
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class PutMode(IntEnum):
+    put = OBXPutMode_PUT  # insert or update
+    insert = OBXPutMode_INSERT  # fails if the ID already exists
+    update = OBXPutMode_UPDATE  # fails if the ID does not exist
+    # skips the existence check; the IDs must really be new, otherwise data (e.g. indexes) gets inconsistent
+    put_id_guaranteed_to_be_new = OBXPutMode_PUT_ID_GUARANTEED_TO_BE_NEW
+
+
+class _CachedQueries:
+    """The queries cached by Box.cached_query() for one Box and thread. They are closed once the thread or the Box is
+    gone (see _close_queries()), or when the store is closed."""
+    __slots__ = "queries", "__weakref__"
+
+    def __init__(self):
+        self.queries = OrderedDict()  # condition shape => Query
+
+
+def _close_queries(queries: OrderedDict):
+    for query in queries.values():
+        query.close()
+    queries.clear()
 
 
 class Box:
-    def __init__(self, ob: ObjectBox, entity: _Entity):
+    max_cached_queries = 64  # per thread and Box, see cached_query()
+    iter_batch_size = 100  # objects read per read transaction by iter() without a chunk_size
+
+    def __init__(self, ob: ObjectBox, entity: _Entity, cache_size: int = 0):
+        """With a cache_size, get() keeps up to that many objects in an LRU cache (see the cache property). It's
+        invalidated by changes made through any Box of the same entity in this process, not by other processes."""
         if not isinstance(entity, _Entity):
             raise Exception("Given type is not an Entity")
 
         self._ob = ob
         self._entity = entity
         self._c_box = obx_box(ob._c_store, entity.id)
+        self._queries = threading.local()  # per thread: _CachedQueries, see cached_query()
+        self._cache = None
+        if cache_size > 0:
+            self._cache = ObjectCache(cache_size, entity.copy)
+            ob._caches.setdefault(entity.id, weakref.WeakSet()).add(self._cache)
+
+    @property
+    def cache(self) -> ObjectCache:
+        """The object cache used by get(), providing hit/miss statistics; None if the Box was created without one"""
+        return self._cache
+
+    def _invalidate(self, ids=None):
+        """Removes the objects with the given IDs (None: all) from all caches of this entity. Inside a write
+        transaction, that's repeated once it has ended, so objects read in the meantime can't stay cached."""
+        caches = self._ob._caches.get(self._entity.id)
+        if not caches:
+            return
+        for cache in list(caches):
+            cache.invalidate(ids)
+        tx = self._ob.current_tx()
+        if tx is not None and tx.is_write():
+            tx.after_end(lambda: self._invalidate(ids))
+
+    def _expect(self, id: int, data):
+        """Tells all caches of this entity about an async operation queued for the given ID, see ObjectCache.expect()"""
+        for cache in list(self._ob._caches.get(self._entity.id, ())):
+            cache.expect(id, data)
 
     def is_empty(self) -> bool:
         is_empty = ctypes.c_bool()
@@ -39,76 +105,237 @@ class Box:
         obx_box_count(self._c_box, limit, ctypes.byref(count))
         return int(count.value)
 
-    def put(self, *objects):
-        """Puts an object (or a list of objects) and returns its ID (or nothing for a list objects)"""
+    def put(self, *objects, mode: PutMode = PutMode.put, skip_unchanged: bool = False):
+        """Puts an object (or a list of objects) and returns its ID (or nothing for a list objects).
+        The mode selects insert-only or update-only semantics instead of the default insert-or-update; a failing
+        object raises a CoreException (ID_ALREADY_EXISTS or ID_NOT_FOUND) and nothing is put. New objects (ID 0) get
+        fresh IDs and are therefore put without checking whether they exist.
+        With skip_unchanged, objects read with track=True (or put with skip_unchanged before) whose properties haven't
+        changed since are not written again; for a list of objects, the number of skipped objects is returned. Note: this relies on
+        the stored object not having been changed or removed by other means (e.g. another object or remove by ID)."""
 
         if len(objects) != 1:
-            self._put_many(objects)
+            return self._put_many(objects, skip_unchanged, mode)
         elif isinstance(objects[0], list):
-            self._put_many(objects[0])
+            return self._put_many(objects[0], skip_unchanged, mode)
         else:
-            return self._put_one(objects[0])
+            return self._put_one(objects[0], skip_unchanged, mode)
 
-    def _put_one(self, obj) -> int:
+    def _put_one(self, obj, skip_unchanged: bool = False, mode: PutMode = PutMode.put) -> int:
         id = object_id = self._entity.get_object_id(obj)
 
+        if skip_unchanged and id and not self._entity.is_changed(obj):
+            return id
+
         if not id:
+            if mode == PutMode.update:
+                raise Exception("Objects without an ID can't be updated")
             id = obx_box_id_for_put(self._c_box, 0)
+            mode = PutMode.put_id_guaranteed_to_be_new
 
         data = self._entity.marshal(obj, id)
-        obx_box_put(self._c_box, id, bytes(data), len(data))
+        obx_box_put5(self._c_box, id, data, len(data), mode)
+        self._invalidate((id,))
 
         if id != object_id:
             self._entity.set_object_id(obj, id)
 
+        if skip_unchanged or "_ob_loaded" in obj.__dict__:
+            self._entity.snapshot(obj, bytes(data))
+
         return id
 
-    def _put_many(self, objects) -> None:
+    def _put_many(self, objects, skip_unchanged: bool = False, mode: PutMode = PutMode.put):
+        skipped = 0
+        if skip_unchanged:
+            is_changed = self._entity.is_changed
+            count = len(objects)
+            objects = [obj for obj in objects if is_changed(obj)]
+            skipped = count - len(objects)
+
+        count = len(objects)
+        if count == 0:
+            return skipped if skip_unchanged else None
+
         # retrieve IDs from the objects (to distinguish new objects and updates)
-        new = {}
-        ids = {}
-        for k in range(len(objects)):
-            id = self._entity.get_object_id(objects[k])
-            if not id:
-                new[k] = 0
-            ids[k] = id
-
-        # acquire IDs for the new objects and set them
-        if len(new) > 0:
-            c_next_id = obx_id()
-            obx_box_ids_for_put(self._c_box, len(new), ctypes.byref(c_next_id))
-            next_id = c_next_id.value
-            for k in new.keys():
-                ids[k] = next_id
-                next_id += 1
-
-        # allocate a C bytes array structure where we will push the object data
-        # OBX_bytes_array with .count = len(objects)
-        c_bytes_array_p = obx_bytes_array(len(objects))
+        get_id = self._entity.get_object_id
+        ids = np.fromiter((get_id(obj) for obj in objects), dtype=np.uint64, count=count)
+        new = np.flatnonzero(ids == 0)
+        if len(new) > 0 and mode == PutMode.update:
+            raise Exception("Objects without an ID can't be updated")
 
-        try:
-            # we need to keep the data around until put_many is executed because obx_bytes_array_set doesn't do a copy
-            data = {}
-            for k in range(len(objects)):
-                data[k] = bytes(self._entity.marshal(objects[k], ids[k]))
-                key = ctypes.c_size_t(k)
+        marshal = self._entity.marshal
+        with self._ob.write_tx():
+            if len(new) > 0:
+                ids[new] = self._ids_for_put(len(new))
+            data = [marshal(obj, id) for obj, id in zip(objects, ids.tolist())]
 
-                # OBX_bytes_array.data[k] = data
-                obx_bytes_array_set(c_bytes_array_p, key,
-                                    data[k], len(data[k]))
+            # freshly assigned IDs are guaranteed to be new, so the core doesn't need to check for existing objects
+            if len(new) == count:
+                self._put_data(data, ids, PutMode.put_id_guaranteed_to_be_new)
+            elif len(new) == 0:
+                self._put_data(data, ids, mode)
+            else:
+                is_new = np.zeros(count, dtype=bool)
+                is_new[new] = True
+                existing = np.flatnonzero(~is_new)
+                self._put_data([data[k] for k in existing.tolist()], ids[existing], mode)
+                self._put_data([data[k] for k in new.tolist()], ids[new], PutMode.put_id_guaranteed_to_be_new)
+            self._invalidate(ids.tolist())
 
-            c_ids = (obx_id * len(ids))(*ids.values())
-            obx_box_put_many(self._c_box, c_bytes_array_p,
-                             c_ids, OBXPutMode_PUT)
+        # assign new IDs on the objects
+        set_id = self._entity.set_object_id
+        for k, id in zip(new.tolist(), ids[new].tolist()):
+            set_id(objects[k], id)
 
-        finally:
-            obx_bytes_array_free(c_bytes_array_p)
+        # refresh the change tracking snapshots
+        snapshot = self._entity.snapshot
+        for obj, obj_data in zip(objects, data):
+            if skip_unchanged or "_ob_loaded" in obj.__dict__:
+                snapshot(obj, obj_data)
+
+        if skip_unchanged:
+            return skipped
 
-        # assign new IDs on the object
-        for k in new.keys():
-            self._entity.set_object_id(objects[k], ids[k])
+    def insert_many(self, objects: list) -> list:
+        """Puts the given objects unless an object with the same ID exists already; new objects (ID 0) are always
+        inserted. Returns whether each object was inserted (the others are left untouched, as is the database)."""
+        return self._put_filtered(objects, PutMode.insert)
 
-    def get(self, id: int):
+    def update_many(self, objects: list) -> list:
+        """Puts the given objects only if an object with the same ID exists already, i.e. objects without an ID and
+        objects that don't exist (anymore) are skipped. Returns whether each object was updated."""
+        return self._put_filtered(objects, PutMode.update)
+
+    def _put_filtered(self, objects: list, mode: PutMode) -> list:
+        get_id = self._entity.get_object_id
+        ids = np.fromiter((get_id(obj) for obj in objects), dtype=np.uint64, count=len(objects))
+        # an ID given more than once exists after its first occurrence: only that one is inserted, all are updated
+        _, first = np.unique(ids, return_index=True)
+        repeated = ids != 0
+        repeated[first] = False
+        with self._ob.write_tx():
+            exists = self._contains_many(ids) | repeated
+            outcomes = (~exists if mode == PutMode.insert else exists).tolist()
+            self._put_many([obj for obj, ok in zip(objects, outcomes) if ok], mode=mode)
+        return outcomes
+
+    def update(self, id: int, **fields):
+        """Sets the given properties (by name) of the stored object with the given ID, without reading it into a Python
+        object. Scalar properties are patched in the stored data directly. Raises NotFoundException for unknown IDs."""
+        patch = self._entity.patcher(fields)
+        with self._ob.write_tx():
+            c_data = ctypes.c_void_p()
+            c_size = ctypes.c_size_t()
+            obx_box_get(self._c_box, id, ctypes.byref(c_data), ctypes.byref(c_size))
+            data = bytes(patch(c_voidp_as_bytes(c_data, c_size.value)))
+            obx_box_put(self._c_box, id, data, len(data))
+            self._invalidate((id,))
+
+    def put_columns(self, columns, batch_size: int = 100000) -> np.ndarray:
+        """Puts objects given as columns instead of Python objects and returns their IDs.
+        Columns are either a dict {property (or its name): array} or a numpy structured array, e.g. one created
+        with the dtype from _Entity.columns_dtype(). Properties without a column get their default value; a missing
+        ID column, or a zero ID, stands for a new object. Scalar-only columns are encoded without per-object Python
+        code. All objects are put in a single transaction, passed to the core in batches of batch_size objects."""
+        if isinstance(columns, np.ndarray):
+            if columns.dtype.names is None:
+                raise Exception("Columns must be given as a dict or a numpy structured array")
+            columns = {name: columns[name] for name in columns.dtype.names}
+
+        props = self._entity.get_properties(list(columns.keys()))
+        columns = {prop._name: np.asarray(column) for prop, column in zip(props, columns.values())}
+        lengths = set(len(column) for column in columns.values())
+        if len(lengths) != 1:
+            raise Exception("All columns must have the same (non-zero) length")
+        count = lengths.pop()
+
+        id_column = columns.pop(self._entity.id_property._name, None)
+        ids = np.zeros(count, dtype=np.uint64) if id_column is None else np.array(id_column, dtype=np.uint64)
+        new = np.flatnonzero(ids == 0)
+
+        # only freshly assigned IDs are known not to exist
+        mode = PutMode.put_id_guaranteed_to_be_new if len(new) == count else PutMode.put
+        with self._ob.write_tx():
+            if len(new) > 0:
+                ids[new] = self._ids_for_put(len(new))
+            for start in range(0, count, batch_size):
+                end = start + batch_size
+                batch = {name: column[start:end] for name, column in columns.items()}
+                self._put_data(self._entity.encode_columns(batch, ids[start:end]), ids[start:end], mode)
+            self._invalidate(ids.tolist())
+        return ids
+
+    def _ids_for_put(self, count: int) -> np.ndarray:
+        """Reserves IDs for the given number of new objects"""
+        ids = np.empty(count, dtype=np.uint64)
+        c_first_id = obx_id()
+        # the core limits the number of IDs per call
+        for start in range(0, count, 10000):
+            n = min(10000, count - start)
+            obx_box_ids_for_put(self._c_box, n, ctypes.byref(c_first_id))
+            ids[start:start + n] = np.arange(c_first_id.value, c_first_id.value + n, dtype=np.uint64)
+        return ids
+
+    def _put_data(self, records, ids: np.ndarray, mode: int = OBXPutMode_PUT):
+        """Puts encoded objects with the given IDs in a single native call.
+        Records are a list of bytes or a 2D uint8 array with one object per row. Either way, the data ends up in a
+        single contiguous buffer and the OBX_bytes_array pointing into it is filled with numpy instead of one
+        obx_bytes_array_set() call per object."""
+        count = len(ids)
+        if isinstance(records, np.ndarray):
+            buffer = records
+            sizes = np.full(count, records.shape[1], dtype=np.uintp)
+            offsets = np.arange(count, dtype=np.uintp) * records.shape[1]
+        else:
+            sizes = np.fromiter(map(len, records), dtype=np.uintp, count=count)
+            padded = (sizes + 7) & ~np.uintp(7)  # keep each object 8-byte aligned within the buffer
+            if (padded != sizes).any():
+                records = [data + bytes(int(pad)) for data, pad in zip(records, padded - sizes)]
+            buffer = np.frombuffer(b"".join(records), dtype=np.uint8)
+            offsets = np.cumsum(padded) - padded
+
+        # OBX_bytes[count] = (data, size) pairs
+        items = np.empty((count, 2), dtype=np.uintp)
+        items[:, 0] = offsets + np.uintp(buffer.ctypes.data)
+        items[:, 1] = sizes
+        c_bytes_array = OBX_bytes_array(ctypes.cast(items.ctypes.data, OBX_bytes_p), count)
+
+        c_ids = np.ascontiguousarray(ids, dtype=np.uint64)
+        obx_box_put_many(self._c_box, ctypes.byref(c_bytes_array), c_ids.ctypes.data_as(ctypes.POINTER(obx_id)), mode)
+
+    def _unmarshaller(self, lazy: bool, fields=None, into=None, track: bool = False):
+        """Returns the function converting FlatBuffers data to results.
+        Lazy objects are proxies decoding each property only when it's first accessed.
+        If fields (properties or their names) are given, only those are decoded, see _Entity.projection(); `into`
+        selects the result type: entity objects (None), tuples or dicts.
+        Tracked objects remember the values read, so put(skip_unchanged=True) can skip them if they're unchanged."""
+        if track:
+            if lazy or fields is not None or into is not None:
+                raise Exception("Tracked reads can't be combined with lazy/fields/into")
+            return self._entity.unmarshal_tracked
+        if fields is None and into is None:
+            return self._entity.unmarshal_lazy if lazy else self._entity.unmarshal
+        if lazy:
+            raise Exception("Lazy reads can't be combined with fields/into")
+        return self._entity.projection(fields, into)
+
+    def get(self, id: int, lazy: bool = False, fields=None, into=None, track: bool = False):
+        """Reads the object with the given ID. lazy returns a proxy decoding properties on access; fields/into read only
+        some properties, into entity objects, tuples or dicts; track records the values read, so that
+        put(skip_unchanged=True) can skip the object while it's unchanged. See _unmarshaller()."""
+        cache = self._cache if not lazy and fields is None and into is None and not track else None
+        # only objects read in a transaction of their own are cached: a transaction opened earlier by the caller may
+        # see an outdated snapshot or, if it's a write transaction, uncommitted changes
+        if cache is not None and self._ob.current_tx() is not None:
+            cache = None
+        if cache is not None:
+            obj = cache.get(id)
+            if obj is not None:
+                return obj
+            generation = cache.generation
+
+        unmarshal = self._unmarshaller(lazy, fields, into, track)
         with self._ob.read_tx():
             c_data = ctypes.c_void_p()
             c_size = ctypes.c_size_t()
@@ -116,40 +343,240 @@ class Box:
                 c_data), ctypes.byref(c_size))
 
             data = c_voidp_as_bytes(c_data, c_size.value)
-            return self._entity.unmarshal(data)
+            obj = unmarshal(data)
 
-    def get_all(self) -> list:
-        with self._ob.read_tx():
-            # OBX_bytes_array*
-            c_bytes_array_p = obx_box_get_all(self._c_box)
+        if cache is not None:
+            cache.add(id, obj, generation, data)
+            return self._entity.copy(obj)
+        return obj
+
+    def get_many(self, ids, found_only: bool = False, lazy: bool = False, fields=None, into=None,
+                 track: bool = False) -> list:
+        """Reads the objects with the given IDs (a list or a numpy integer array) with a single native call.
+        Results are in the order of the given IDs, with None for IDs that don't exist; with found_only, missing
+        objects are left out instead. See get() for the other arguments."""
+        unmarshal = self._unmarshaller(lazy, fields, into, track)
+        c_ids = self._id_array(ids)
+        if len(c_ids) == 0:
+            return []
 
+        c_id_array = OBX_id_array(c_ids.ctypes.data_as(ctypes.POINTER(obx_id)), len(c_ids))
+        with self._ob.read_tx():
+            c_bytes_array_p = obx_box_get_many(self._c_box, ctypes.byref(c_id_array))
             try:
-                # OBX_bytes_array
-                c_bytes_array = c_bytes_array_p.contents
+                records = c_bytes_array_to_list(c_bytes_array_p)
+            finally:
+                obx_bytes_array_free(c_bytes_array_p)
+
+        if found_only:
+            return [unmarshal(data) for data in records if data is not None]
+        return [None if data is None else unmarshal(data) for data in records]
+
+    def get_all(self, lazy: bool = False, fields=None, into=None, track: bool = False) -> list:
+        unmarshal = self._unmarshaller(lazy, fields, into, track)
+        return [unmarshal(data) for data in self._get_all_data()]
+
+    def iter(self, chunk_size: int = 0, start_id: int = 0, end_id: int = 0, lazy: bool = False, fields=None,
+             into=None, track: bool = False):
+        """Iterates over all objects in the order of their IDs, optionally restricted to start_id <= ID <= end_id.
+        Yields objects one by one or, if chunk_size is given, lists of up to chunk_size objects. Objects are read with
+        a native cursor in batches (of chunk_size, or iter_batch_size objects), so only the current batch is kept in
+        memory, regardless of the number of objects. A read transaction is only held while reading a batch, not while
+        the iterator is suspended: the caller may write while iterating, and an abandoned iterator holds nothing.
+        Objects put or removed during the iteration are seen if the iteration hasn't passed their ID yet. Inside a
+        transaction (e.g. write_tx()), the batches are read in that transaction. See get() for the other arguments."""
+        unmarshal = self._unmarshaller(lazy, fields, into, track)
+        decode_id = self._entity.decoders[self._entity.id_property._name]
+        batch_size = chunk_size or self.iter_batch_size
+        next_id = max(start_id, 1)
+        while True:
+            records = self._read_batch(next_id, end_id, batch_size, decode_id)
+            if records and chunk_size:
+                yield [unmarshal(data) for data in records]
+            else:
+                for data in records:
+                    yield unmarshal(data)
+            if len(records) < batch_size:
+                return
+            next_id = decode_id(*codec.read_table(records[-1])) + 1
+
+    def _read_batch(self, start_id: int, end_id: int, limit: int, decode_id) -> list:
+        """Reads the data of up to limit objects with start_id <= ID <= end_id (0: no end) with a cursor, in the
+        thread's current transaction, if any, or in a read transaction of its own, closed before returning (and
+        not registered as the thread's current transaction, see objectbox.transaction)"""
+        tx = self._ob.current_tx()
+        c_txn = tx._c_txn if tx is not None else obx_txn_read(self._ob._c_store)
+        try:
+            with Cursor(c_txn, self._entity.id) as cursor:
+                if start_id > 1:
+                    data = cursor.seek(start_id)
+                    if data is None:  # the start ID doesn't exist, look up the next one
+                        first_id = self._first_id_from(start_id)
+                        data = cursor.seek(first_id) if first_id else None
+                else:
+                    data = cursor.first()
+
+                records = []
+                while data is not None and len(records) < limit:
+                    if end_id and decode_id(*codec.read_table(data)) > end_id:
+                        break
+                    records.append(data)
+                    data = cursor.next() if len(records) < limit else None
+                return records
+        finally:
+            if tx is None:
+                obx_txn_close(c_txn)
+
+    def _first_id_from(self, start_id: int) -> int:
+        """Returns the lowest existing ID >= start_id, or 0 if there is none"""
+        ids = self._ids(start_id, 1)
+        return int(ids[0]) if len(ids) else 0
+
+    def _ids(self, start_id: int = 0, limit: int = 0) -> np.ndarray:
+        """Returns the existing IDs >= start_id in ascending order, up to limit (0: all)"""
+        c_builder = obx_query_builder(self._ob._c_store, self._entity.id)
+        try:
+            if start_id > 1:
+                obx_qb_greater_or_equal_int(c_builder, self._entity.id_property._id, start_id)
+            c_query = obx_query(c_builder)
+        finally:
+            obx_qb_close(c_builder)
+        try:
+            if limit:
+                obx_query_limit(c_query, limit)
+            return c_id_array_to_numpy(obx_query_find_ids(c_query))
+        finally:
+            obx_query_close(c_query)
+
+    def parallel_map(self, fn, workers: int = 0, reduce=None, partitions: int = 0):
+        """Applies fn to all objects in worker processes (default: one per CPU), each reading a range of IDs from the
+        same store directory. Without reduce, returns an iterator over the results, in the order of the IDs; with a
+        reduce function (like for functools.reduce()), returns the reduced result (None if there are no objects).
+        The IDs are split into partitions (default: 4 per worker) of about the same number of objects.
+        fn, reduce and the entity class must be picklable, i.e. defined at module level; see objectbox.parallel."""
+        workers = workers or os.cpu_count()
+        ranges = parallel._id_ranges(self._ids(), partitions or 4 * workers)
+        return parallel.parallel_map(self._ob, self._entity, ranges, fn, workers, reduce)
 
-                result = list()
-                for i in range(c_bytes_array.count):
-                    # OBX_bytes
-                    c_bytes = c_bytes_array.data[i]
-                    data = c_voidp_as_bytes(c_bytes.data, c_bytes.size)
-                    result.append(self._entity.unmarshal(data))
+    def get_all_columns(self, props=None, string_dtype=object) -> dict:
+        """Reads the given properties (Property objects or names; default: all) of all objects into numpy arrays,
+        keyed by the property name. No objects are created, see _Entity.columns() for the resulting types.
+        Scalars and strings are read by the core directly into arrays, see Query.find_columns()."""
+        with QueryBuilder(self._ob, self, self._entity, None).build() as query:
+            return query._columns(props, string_dtype)
 
-                return result
+    def _get_all_data(self) -> list:
+        with self._ob.read_tx():
+            # OBX_bytes_array*
+            c_bytes_array_p = obx_box_get_all(self._c_box)
+            try:
+                return c_bytes_array_to_list(c_bytes_array_p)
             finally:
                 obx_bytes_array_free(c_bytes_array_p)
 
+    @staticmethod
+    def _id_array(ids) -> np.ndarray:
+        """Converts IDs given as a list or a numpy integer array to a contiguous uint64 array, e.g. for OBX_id_array"""
+        c_ids = np.ascontiguousarray(ids, dtype=np.uint64)
+        if c_ids.ndim != 1:
+            raise Exception("IDs must be given as a one-dimensional sequence")
+        return c_ids
+
+    def contains(self, id: int) -> bool:
+        """Checks whether an object with the given ID exists, without reading it"""
+        contains = ctypes.c_bool()
+        obx_box_contains(self._c_box, id, ctypes.byref(contains))
+        return bool(contains.value)
+
+    def contains_many(self, ids) -> np.ndarray:
+        """Checks for each of the given IDs (a list or a numpy integer array) whether the object exists, with a single
+        native call and without reading any object into Python. Returns a numpy bool array."""
+        with self._ob.read_tx():
+            return self._contains_many(self._id_array(ids))
+
+    def _contains_many(self, c_ids: np.ndarray) -> np.ndarray:
+        """contains_many() in the current transaction: a single obx_box_get_many() call, whose result has a NULL data
+        pointer for each missing object; the objects' data isn't copied"""
+        result = np.zeros(len(c_ids), dtype=bool)
+        valid = c_ids != 0  # 0 is not a valid ID (rejected by the core), i.e. never exists
+        c_ids = np.ascontiguousarray(c_ids[valid])
+        if len(c_ids) == 0:
+            return result
+        c_id_array = OBX_id_array(c_ids.ctypes.data_as(ctypes.POINTER(obx_id)), len(c_ids))
+        c_bytes_array_p = obx_box_get_many(self._c_box, ctypes.byref(c_id_array))
+        try:
+            # OBX_bytes[count] = (data, size) pairs
+            pairs = np.ctypeslib.as_array(ctypes.cast(c_bytes_array_p.contents.data, ctypes.POINTER(ctypes.c_size_t)),
+                                          (len(c_ids), 2))
+            result[valid] = pairs[:, 0] != 0
+        finally:
+            obx_bytes_array_free(c_bytes_array_p)
+        return result
+
     def remove(self, id_or_object):
         if isinstance(id_or_object, self._entity.cls):
             id = self._entity.get_object_id(id_or_object)
+            # a removed object must be written again by put(skip_unchanged=True)
+            id_or_object.__dict__.pop("_ob_loaded", None)
         else:
             id = id_or_object
         obx_box_remove(self._c_box, id)
+        self._invalidate((id,))
+
+    def remove_many(self, ids) -> int:
+        """Removes the objects with the given IDs (a list or a numpy integer array) in a single transaction.
+        IDs that don't exist are ignored; returns the number of removed objects."""
+        c_ids = self._id_array(ids)
+        if len(c_ids) == 0:
+            return 0
+        c_id_array = OBX_id_array(c_ids.ctypes.data_as(ctypes.POINTER(obx_id)), len(c_ids))
+        count = ctypes.c_uint64()
+        obx_box_remove_many(self._c_box, ctypes.byref(c_id_array), ctypes.byref(count))
+        self._invalidate(c_ids.tolist())
+        return int(count.value)
 
     def remove_all(self) -> int:
         count = ctypes.c_uint64()
         obx_box_remove_all(self._c_box, ctypes.byref(count))
+        self._invalidate()
         return int(count.value)
     
-    def query(self, condition: QueryCondition) -> QueryBuilder:
+    def cached_query(self, condition: QueryCondition) -> Query:
+        """Returns a built query for the condition, like query(condition).build(), but reusing a query built before for
+        a condition of the same shape (the same properties, operations and combination, regardless of the values).
+        All conditions of a cached query are parameters: the values of the given condition are set on each call.
+        Queries are cached per thread (up to Box.max_cached_queries per thread) and are closed when evicted, when the
+        thread ends or the Box is garbage collected, and when the store is closed; only use the returned query on the
+        calling thread, until the next cached_query() call, and don't close it."""
+        cached = getattr(self._queries, "cached", None)
+        if cached is None:
+            cached = self._queries.cached = _CachedQueries()
+            # not referencing `cached`: the queries are closed once it's collected, e.g. when the thread ends
+            weakref.finalize(cached, _close_queries, cached.queries)
+            self._ob._cached_queries.add(cached)
+        queries = cached.queries
+
+        shape = condition._shape()
+        query = queries.get(shape)
+        if query is None:
+            query = QueryBuilder(self._ob, self, self._entity, condition, alias_all=True).build()
+            queries[shape] = query
+            if len(queries) > self.max_cached_queries:
+                queries.popitem(last=False)[1].close()
+            return query
+
+        queries.move_to_end(shape)
+        params = {}
+        for leaf in condition._leaves():
+            alias = leaf._alias or "_%d" % len(params)
+            params[alias] = (leaf._value, leaf._value_b) if leaf._op == _ConditionOp.between else leaf._value
+        if query._offset or query._limit:
+            query.offset(0)
+            query.limit(0)
+        return query.set(**params)
+
+    def query(self, condition: QueryCondition = None) -> QueryBuilder:
+        """Starts building a query for objects matching the condition, which may combine conditions with & (and)
+        and | (or), e.g. `(a.equals(1) | a.equals(2)) & b.starts_with("x")`; without a condition, all objects match"""
         qb = QueryBuilder(self._ob, self, self._entity, condition)
         return qb
\ No newline at end of file
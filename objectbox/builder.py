@@ -16,7 +16,7 @@
 from objectbox.c import *
 from objectbox.model import Model, IdUid
 from objectbox.model.entity import Entity
-from objectbox.model.properties import Property, Id
+from objectbox.model.properties import Property, Id, IndexType
 from objectbox.objectbox import ObjectBox
 import json
 
@@ -30,11 +30,37 @@ class Builder:
     def __init__(self):
         self._model = Model()
         self._directory = ""
+        self._max_readers = 0
+        self._async_max_queue_length = 0
+        self._async_max_batch_size = 0
+        self._query_cache_size = 0
 
     def directory(self, path: str) -> "Builder":
         self._directory = path
         return self
 
+    def max_readers(self, readers: int) -> "Builder":
+        """Maximum number of concurrent read transactions (0: the core's default, 126); also limits the number of
+        reader threads used by objectbox.aio"""
+        self._max_readers = readers
+        return self
+
+    def async_max_queue_length(self, length: int) -> "Builder":
+        """Maximum number of operations waiting in the async queue (see AsyncBox) before submitting blocks"""
+        self._async_max_queue_length = length
+        return self
+
+    def async_max_batch_size(self, operations: int) -> "Builder":
+        """Maximum number of queued async operations the core executes in a single transaction"""
+        self._async_max_batch_size = operations
+        return self
+
+    def query_cache_size(self, max_bytes: int) -> "Builder":
+        """Enables caching the results of Query.find(), find_columns() and count(), using up to about max_bytes of
+        memory. Results are invalidated by commits changing their entity (in this process)."""
+        self._query_cache_size = max_bytes
+        return self
+
     def model(self, model: Model) -> "Builder":
         self._model = model
         self._model._finish()
@@ -47,13 +73,20 @@ class Builder:
             if len(self._directory) > 0:
                 obx_opt_directory(c_options, c_str(self._directory))
 
+            if self._max_readers > 0:
+                obx_opt_max_readers(c_options, self._max_readers)
+            if self._async_max_queue_length > 0:
+                obx_opt_async_max_queue_length(c_options, self._async_max_queue_length)
+            if self._async_max_batch_size > 0:
+                obx_opt_async_max_in_tx_operations(c_options, self._async_max_batch_size)
+
             obx_opt_model(c_options, self._model._c_model)
         except CoreException:
             obx_opt_free(c_options)
             raise
 
         c_store = obx_store_open(c_options)
-        return ObjectBox(c_store)
+        return ObjectBox(c_store, self._max_readers, self._query_cache_size, self._model, self._directory)
 
     def from_json(self, file: str, identifier_name="id") -> "Builder":
         with open(file) as f:
@@ -61,6 +94,8 @@ class Builder:
 
         model = Model()
         model.last_entity_id = IdUid(*extract_id_uid(data["lastEntityId"]))
+        if data.get("lastIndexId"):
+            model.last_index_id = IdUid(*extract_id_uid(data["lastIndexId"]))
 
         for entity in data["entities"]:
             entity_name = entity["name"]
@@ -72,6 +107,8 @@ class Builder:
             for property in entity["properties"]:
                 flags = None
                 index_type = None
+                unique = False
+                index_id, index_uid = extract_id_uid(property["indexId"]) if "indexId" in property else (0, 0)
                 id, uid = extract_id_uid(property["id"])
                 name = property["name"]
                 prop_type = property["type"]
@@ -80,14 +117,16 @@ class Builder:
                 except:
                     print(f"Property type {prop_type} not found. Skipping...")
                     continue
-                try:
+                if "flags" in property:
                     flags = int(property["flags"])
-                    if flags > 999:
-                        # TODO not yet implemented in python api
-                        index_type = flags
-                        flags = None
-                except:
-                    pass
+                    for index_flag in (IndexType.hash64, IndexType.hash, IndexType.value):
+                        if flags & index_flag:
+                            index_type = index_flag
+                            break
+                    unique = bool(flags & OBXPropertyFlags_UNIQUE)
+                    # the index flags are set by Property
+                    flags &= ~(OBXPropertyFlags_INDEXED | OBXPropertyFlags_INDEX_HASH | OBXPropertyFlags_INDEX_HASH64
+                               | OBXPropertyFlags_UNIQUE)
                 props[name] = (
                     Property(
                         py_type,
@@ -96,6 +135,9 @@ class Builder:
                         uid=uid,
                         property_flags=flags,
                         index_type=index_type,
+                        unique=unique,
+                        index_id=index_id,
+                        index_uid=index_uid,
                     )
                     if name != identifier_name
                     else Id(id=id, uid=uid)
@@ -14,6 +14,7 @@
 
 
 import ctypes.util
+import numpy as np
 import os
 import platform
 from objectbox.version import Version
@@ -131,6 +132,38 @@ class OBX_id_array(ctypes.Structure):
 OBX_id_array_p = ctypes.POINTER(OBX_id_array)
 
 
+class OBX_string_array(ctypes.Structure):
+    _fields_ = [
+        ("items", ctypes.POINTER(ctypes.c_char_p)),
+        ("count", ctypes.c_size_t),
+    ]
+
+
+OBX_string_array_p = ctypes.POINTER(OBX_string_array)
+
+
+def _scalar_array(name: str, item_type) -> type:
+    """Declares a structure like OBX_int64_array: items (pointer to item_type) and count"""
+    return type(name, (ctypes.Structure,), {"_fields_": [
+        ("items", ctypes.POINTER(item_type)),
+        ("count", ctypes.c_size_t),
+    ]})
+
+
+OBX_int64_array = _scalar_array("OBX_int64_array", ctypes.c_int64)
+OBX_int64_array_p = ctypes.POINTER(OBX_int64_array)
+OBX_int32_array = _scalar_array("OBX_int32_array", ctypes.c_int32)
+OBX_int32_array_p = ctypes.POINTER(OBX_int32_array)
+OBX_int16_array = _scalar_array("OBX_int16_array", ctypes.c_int16)
+OBX_int16_array_p = ctypes.POINTER(OBX_int16_array)
+OBX_int8_array = _scalar_array("OBX_int8_array", ctypes.c_int8)
+OBX_int8_array_p = ctypes.POINTER(OBX_int8_array)
+OBX_double_array = _scalar_array("OBX_double_array", ctypes.c_double)
+OBX_double_array_p = ctypes.POINTER(OBX_double_array)
+OBX_float_array = _scalar_array("OBX_float_array", ctypes.c_float)
+OBX_float_array_p = ctypes.POINTER(OBX_float_array)
+
+
 class OBX_txn(ctypes.Structure):
     pass
 
@@ -138,6 +171,13 @@ class OBX_txn(ctypes.Structure):
 OBX_txn_p = ctypes.POINTER(OBX_txn)
 
 
+class OBX_cursor(ctypes.Structure):
+    pass
+
+
+OBX_cursor_p = ctypes.POINTER(OBX_cursor)
+
+
 class OBX_box(ctypes.Structure):
     pass
 
@@ -165,6 +205,20 @@ class OBX_query(ctypes.Structure):
 
 OBX_query_p = ctypes.POINTER(OBX_query)
 
+
+class OBX_query_prop(ctypes.Structure):
+    pass
+
+
+OBX_query_prop_p = ctypes.POINTER(OBX_query_prop)
+
+
+class OBX_observer(ctypes.Structure):
+    pass
+
+
+OBX_observer_p = ctypes.POINTER(OBX_observer)
+
 # manually configure error methods, we can't use `fn()` defined below yet due to circular dependencies
 C.obx_last_error_message.restype = ctypes.c_char_p
 C.obx_last_error_code.restype = obx_err
@@ -187,6 +241,8 @@ class CoreException(Exception):
         10201: "UNIQUE_VIOLATED",
         10202: "NON_UNIQUE_RESULT",
         10203: "PROPERTY_TYPE_MISMATCH",
+        10210: "ID_ALREADY_EXISTS",
+        10211: "ID_NOT_FOUND",
         10299: "CONSTRAINT_VIOLATED",
         10301: "STD_ILLEGAL_ARGUMENT",
         10302: "STD_OUT_OF_RANGE",
@@ -205,6 +261,19 @@ class CoreException(Exception):
         name = self.codes[code] if code in self.codes else "n/a"
         super(CoreException, self).__init__("%d (%s) - %s" % (code, name, self.message))
 
+    def __reduce__(self):
+        # e.g. raised in a worker process of parallel_map(); the message is not available in the receiving process
+        return _restore_core_exception, (self.code, self.message)
+
+
+def _restore_core_exception(code, message):
+    exception = CoreException.__new__(CoreException)
+    exception.code = code
+    exception.message = message
+    name = CoreException.codes.get(code, "n/a")
+    Exception.__init__(exception, "%d (%s) - %s" % (code, name, message))
+    return exception
+
 
 class NotFoundException(Exception):
     pass
@@ -240,6 +309,15 @@ def c_fn(name: str, restype: type, argtypes):
     return func
 
 
+# like c_fn, but without error checking, for functions whose result doesn't indicate an error (e.g. a bool)
+def c_fn_nocheck(name: str, restype: type, argtypes):
+    func = C.__getattr__(name)
+    func.argtypes = argtypes
+    func.restype = restype
+
+    return func
+
+
 # like c_fn, but for functions returning obx_err
 def c_fn_rc(name: str, argtypes):
     func = C.__getattr__(name)
@@ -270,6 +348,51 @@ def c_voidp_as_bytes(voidp, size):
     ).tobytes()
 
 
+def c_id_array_to_numpy(c_id_array_p):
+    """Copies the IDs of the given OBX_id_array* into a numpy uint64 array and frees it"""
+    try:
+        c_id_array = c_id_array_p.contents
+        return np.ctypeslib.as_array(c_id_array.ids, (c_id_array.count,)).copy() if c_id_array.count \
+            else np.empty(0, dtype=np.uint64)
+    finally:
+        obx_id_array_free(c_id_array_p)
+
+
+def c_array_to_numpy(c_array_p, free, dtype) -> np.ndarray:
+    """Copies the items of the given scalar array (e.g. OBX_int64_array*) into a numpy array and frees it"""
+    try:
+        c_array = c_array_p.contents
+        return np.ctypeslib.as_array(c_array.items, (c_array.count,)).copy() if c_array.count \
+            else np.empty(0, dtype=dtype)
+    finally:
+        free(c_array_p)
+
+
+def c_string_array_to_numpy(c_string_array_p) -> np.ndarray:
+    """Copies the items of the given OBX_string_array* into a numpy object array of str and frees it"""
+    try:
+        c_string_array = c_string_array_p.contents
+        array = np.empty(c_string_array.count, dtype=object)
+        array[:] = [item.decode("utf-8") for item in c_string_array.items[:c_string_array.count]]
+        return array
+    finally:
+        obx_string_array_free(c_string_array_p)
+
+
+def c_bytes_array_to_list(c_bytes_array_p) -> list:
+    """Copies the data of all items of the given OBX_bytes_array* into a list of bytes (None for NULL items)"""
+    c_bytes_array = c_bytes_array_p.contents
+    if c_bytes_array.count == 0:
+        return []
+
+    # read all (data, size) pairs at once instead of accessing the OBX_bytes structures one by one
+    pairs = (ctypes.c_size_t * (2 * c_bytes_array.count)).from_address(
+        ctypes.cast(c_bytes_array.data, ctypes.c_void_p).value
+    )
+    pairs = list(pairs)
+    return [ctypes.string_at(pairs[i], pairs[i + 1]) if pairs[i] else None for i in range(0, len(pairs), 2)]
+
+
 # OBX_model* (void);
 obx_model = c_fn("obx_model", OBX_model_p, [])
 
@@ -289,6 +412,11 @@ obx_model_property_flags = c_fn_rc(
     "obx_model_property_flags", [OBX_model_p, OBXPropertyFlags]
 )
 
+# obx_err (OBX_model* model, obx_schema_id index_id, obx_uid index_uid);
+obx_model_property_index_id = c_fn_rc(
+    "obx_model_property_index_id", [OBX_model_p, obx_schema_id, obx_uid]
+)
+
 # obx_err (OBX_model*, obx_schema_id entity_id, obx_uid entity_uid);
 obx_model_last_entity_id = c_fn(
     "obx_model_last_entity_id", None, [OBX_model_p, obx_schema_id, obx_uid]
@@ -330,6 +458,16 @@ obx_opt_max_readers = c_fn(
     "obx_opt_max_readers", None, [OBX_store_options_p, ctypes.c_uint]
 )
 
+# void (OBX_store_options* opt, size_t value);
+obx_opt_async_max_queue_length = c_fn(
+    "obx_opt_async_max_queue_length", None, [OBX_store_options_p, ctypes.c_size_t]
+)
+
+# void (OBX_store_options* opt, uint32_t value);
+obx_opt_async_max_in_tx_operations = c_fn(
+    "obx_opt_async_max_in_tx_operations", None, [OBX_store_options_p, ctypes.c_uint32]
+)
+
 # obx_err (OBX_store_options* opt, OBX_model* model);
 obx_opt_model = c_fn_rc("obx_opt_model", [OBX_store_options_p, OBX_model_p])
 
@@ -357,6 +495,40 @@ obx_txn_abort = c_fn_rc("obx_txn_abort", [OBX_txn_p])
 # obx_err (OBX_txn* txn);
 obx_txn_success = c_fn_rc("obx_txn_success", [OBX_txn_p])
 
+# typedef void obx_observer(const obx_schema_id* type_ids, size_t type_ids_count, void* user_data);
+# Called after each commit changing objects, with the changed entity types; on the committing thread.
+obx_observer = ctypes.CFUNCTYPE(None, ctypes.POINTER(obx_schema_id), ctypes.c_size_t, ctypes.c_void_p)
+
+# OBX_observer* (OBX_store* store, obx_observer* callback, void* user_data);
+obx_observe = c_fn("obx_observe", OBX_observer_p, [OBX_store_p, obx_observer, ctypes.c_void_p])
+
+# obx_err (OBX_observer* observer);
+obx_observer_close = c_fn_rc("obx_observer_close", [OBX_observer_p])
+
+# OBX_cursor* (OBX_txn* txn, obx_schema_id entity_id);
+obx_cursor = c_fn("obx_cursor", OBX_cursor_p, [OBX_txn_p, obx_schema_id])
+
+# obx_err (OBX_cursor* cursor);
+obx_cursor_close = c_fn_rc("obx_cursor_close", [OBX_cursor_p])
+
+# obx_err (OBX_cursor* cursor, obx_id id);
+obx_cursor_seek = c_fn_rc("obx_cursor_seek", [OBX_cursor_p, obx_id])
+
+# obx_err (OBX_cursor* cursor, const void** data, size_t* size);
+obx_cursor_first = c_fn_rc(
+    "obx_cursor_first", [OBX_cursor_p, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+)
+
+# obx_err (OBX_cursor* cursor, const void** data, size_t* size);
+obx_cursor_next = c_fn_rc(
+    "obx_cursor_next", [OBX_cursor_p, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+)
+
+# obx_err (OBX_cursor* cursor, const void** data, size_t* size);
+obx_cursor_current = c_fn_rc(
+    "obx_cursor_current", [OBX_cursor_p, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+)
+
 # OBX_box* (OBX_store* store, obx_schema_id entity_id);
 obx_box = c_fn("obx_box", OBX_box_p, [OBX_store_p, obx_schema_id])
 
@@ -374,6 +546,9 @@ obx_box_get = c_fn_rc(
 # OBX_bytes_array* (OBX_box* box);
 obx_box_get_all = c_fn("obx_box_get_all", OBX_bytes_array_p, [OBX_box_p])
 
+# OBX_bytes_array* (OBX_box* box, const OBX_id_array* ids);
+obx_box_get_many = c_fn("obx_box_get_many", OBX_bytes_array_p, [OBX_box_p, OBX_id_array_p])
+
 # obx_id (OBX_box* box, obx_id id_or_zero);
 obx_box_id_for_put = c_fn("obx_box_id_for_put", obx_id, [OBX_box_p, obx_id])
 
@@ -387,6 +562,14 @@ obx_box_put = c_fn_rc(
     "obx_box_put", [OBX_box_p, obx_id, ctypes.c_void_p, ctypes.c_size_t]
 )
 
+# obx_err (OBX_box* box, obx_id id, const void* data, size_t size, OBXPutMode mode);
+obx_box_put5 = c_fn_rc(
+    "obx_box_put5", [OBX_box_p, obx_id, ctypes.c_void_p, ctypes.c_size_t, OBXPutMode]
+)
+
+# obx_err (OBX_box* box, obx_id id, bool* out_contains);
+obx_box_contains = c_fn_rc("obx_box_contains", [OBX_box_p, obx_id, ctypes.POINTER(ctypes.c_bool)])
+
 # obx_err (OBX_box* box, const OBX_bytes_array* objects, const obx_id* ids, OBXPutMode mode);
 obx_box_put_many = c_fn_rc(
     "obx_box_put_many",
@@ -396,6 +579,11 @@ obx_box_put_many = c_fn_rc(
 # obx_err (OBX_box* box, obx_id id);
 obx_box_remove = c_fn_rc("obx_box_remove", [OBX_box_p, obx_id])
 
+# obx_err (OBX_box* box, const OBX_id_array* ids, uint64_t* out_count);
+obx_box_remove_many = c_fn_rc(
+    "obx_box_remove_many", [OBX_box_p, OBX_id_array_p, ctypes.POINTER(ctypes.c_uint64)]
+)
+
 # obx_err (OBX_box* box, uint64_t* out_count);
 obx_box_remove_all = c_fn_rc(
     "obx_box_remove_all", [OBX_box_p, ctypes.POINTER(ctypes.c_uint64)]
@@ -411,6 +599,26 @@ obx_box_count = c_fn_rc(
     "obx_box_count", [OBX_box_p, ctypes.c_uint64, ctypes.POINTER(ctypes.c_uint64)]
 )
 
+# OBX_async* (OBX_box* box, uint64_t enqueue_timeout_millis);
+obx_async_create = c_fn("obx_async_create", OBX_async_p, [OBX_box_p, ctypes.c_uint64])
+
+# obx_err (OBX_async* async);
+obx_async_close = c_fn_rc("obx_async_close", [OBX_async_p])
+
+# obx_err (OBX_async* async, obx_id id, const void* data, size_t size, OBXPutMode mode);
+obx_async_put5 = c_fn_rc(
+    "obx_async_put5", [OBX_async_p, obx_id, ctypes.c_void_p, ctypes.c_size_t, OBXPutMode]
+)
+
+# obx_err (OBX_async* async, obx_id id);
+obx_async_remove = c_fn_rc("obx_async_remove", [OBX_async_p, obx_id])
+
+# bool (OBX_store* store);
+obx_store_await_async_completion = c_fn_nocheck("obx_store_await_async_completion", ctypes.c_bool, [OBX_store_p])
+
+# bool (OBX_store* store);
+obx_store_await_async_submitted = c_fn_nocheck("obx_store_await_async_submitted", ctypes.c_bool, [OBX_store_p])
+
 # OBX_query_builder* obx_query_builder(OBX_store* store, obx_schema_id entity_id);
 obx_query_builder = c_fn(
     "obx_query_builder", OBX_query_builder_p, [OBX_store_p, obx_schema_id]
@@ -736,12 +944,12 @@ obx_qb_less_or_equal_bytes = c_fn(
 
 # OBX_C_API obx_qb_cond obx_qb_all(OBX_query_builder* builder, const obx_qb_cond conditions[], size_t count);
 obx_qb_all = c_fn(
-    "obx_qb_all", obx_qb_cond, [OBX_query_builder_p, obx_qb_cond, ctypes.c_size_t]
+    "obx_qb_all", obx_qb_cond, [OBX_query_builder_p, ctypes.POINTER(obx_qb_cond), ctypes.c_size_t]
 )
 
 # OBX_C_API obx_qb_cond obx_qb_any(OBX_query_builder* builder, const obx_qb_cond conditions[], size_t count);
 obx_qb_any = c_fn(
-    "obx_qb_any", obx_qb_cond, [OBX_query_builder_p, obx_qb_cond, ctypes.c_size_t]
+    "obx_qb_any", obx_qb_cond, [OBX_query_builder_p, ctypes.POINTER(obx_qb_cond), ctypes.c_size_t]
 )
 
 # OBX_C_API obx_err obx_qb_param_alias(OBX_query_builder* builder, const char* alias);
@@ -757,6 +965,54 @@ obx_qb_order = c_fn_rc(
 # OBX_C_API OBX_query* obx_query(OBX_query_builder* builder);
 obx_query = c_fn("obx_query", OBX_query_p, [OBX_query_builder_p])
 
+# OBX_C_API obx_err obx_query_param_alias_string(OBX_query* query, const char* alias, const char* value);
+obx_query_param_alias_string = c_fn_rc(
+    "obx_query_param_alias_string", [OBX_query_p, ctypes.c_char_p, ctypes.c_char_p]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_strings(OBX_query* query, const char* alias, const char* const values[],
+#                                                 size_t count);
+obx_query_param_alias_strings = c_fn_rc(
+    "obx_query_param_alias_strings", [OBX_query_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_int(OBX_query* query, const char* alias, int64_t value);
+obx_query_param_alias_int = c_fn_rc(
+    "obx_query_param_alias_int", [OBX_query_p, ctypes.c_char_p, ctypes.c_int64]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_2ints(OBX_query* query, const char* alias, int64_t value_a, int64_t value_b);
+obx_query_param_alias_2ints = c_fn_rc(
+    "obx_query_param_alias_2ints", [OBX_query_p, ctypes.c_char_p, ctypes.c_int64, ctypes.c_int64]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_int64s(OBX_query* query, const char* alias, const int64_t values[],
+#                                                size_t count);
+obx_query_param_alias_int64s = c_fn_rc(
+    "obx_query_param_alias_int64s", [OBX_query_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_int32s(OBX_query* query, const char* alias, const int32_t values[],
+#                                                size_t count);
+obx_query_param_alias_int32s = c_fn_rc(
+    "obx_query_param_alias_int32s", [OBX_query_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_int32), ctypes.c_size_t]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_double(OBX_query* query, const char* alias, double value);
+obx_query_param_alias_double = c_fn_rc(
+    "obx_query_param_alias_double", [OBX_query_p, ctypes.c_char_p, ctypes.c_double]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_2doubles(OBX_query* query, const char* alias, double value_a, double value_b);
+obx_query_param_alias_2doubles = c_fn_rc(
+    "obx_query_param_alias_2doubles", [OBX_query_p, ctypes.c_char_p, ctypes.c_double, ctypes.c_double]
+)
+
+# OBX_C_API obx_err obx_query_param_alias_bytes(OBX_query* query, const char* alias, const void* value, size_t size);
+obx_query_param_alias_bytes = c_fn_rc(
+    "obx_query_param_alias_bytes", [OBX_query_p, ctypes.c_char_p, ctypes.c_void_p, ctypes.c_size_t]
+)
+
 # OBX_C_API obx_err obx_query_close(OBX_query* query);
 obx_query_close = c_fn_rc("obx_query_close", [OBX_query_p])
 
@@ -815,6 +1071,100 @@ obx_query_describe_params = c_fn(
     "obx_query_describe_params", ctypes.c_char_p, [OBX_query_p]
 )
 
+# OBX_C_API OBX_query_prop* obx_query_prop(OBX_query* query, obx_schema_id property_id);
+obx_query_prop = c_fn("obx_query_prop", OBX_query_prop_p, [OBX_query_p, obx_schema_id])
+
+# OBX_C_API obx_err obx_query_prop_close(OBX_query_prop* query);
+obx_query_prop_close = c_fn_rc("obx_query_prop_close", [OBX_query_prop_p])
+
+# OBX_C_API obx_err obx_query_prop_distinct(OBX_query_prop* query, bool distinct);
+obx_query_prop_distinct = c_fn_rc("obx_query_prop_distinct", [OBX_query_prop_p, ctypes.c_bool])
+
+# OBX_C_API obx_err obx_query_prop_distinct_case(OBX_query_prop* query, bool distinct, bool case_sensitive);
+obx_query_prop_distinct_case = c_fn_rc(
+    "obx_query_prop_distinct_case", [OBX_query_prop_p, ctypes.c_bool, ctypes.c_bool]
+)
+
+# OBX_C_API obx_err obx_query_prop_count(OBX_query_prop* query, uint64_t* out_count);
+obx_query_prop_count = c_fn_rc(
+    "obx_query_prop_count", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_uint64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_avg(OBX_query_prop* query, double* out_average, int64_t* out_count);
+obx_query_prop_avg = c_fn_rc(
+    "obx_query_prop_avg", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_avg_int(OBX_query_prop* query, int64_t* out_average, int64_t* out_count);
+obx_query_prop_avg_int = c_fn_rc(
+    "obx_query_prop_avg_int", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_min(OBX_query_prop* query, double* out_minimum, int64_t* out_count);
+obx_query_prop_min = c_fn_rc(
+    "obx_query_prop_min", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_max(OBX_query_prop* query, double* out_maximum, int64_t* out_count);
+obx_query_prop_max = c_fn_rc(
+    "obx_query_prop_max", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_sum(OBX_query_prop* query, double* out_sum, int64_t* out_count);
+obx_query_prop_sum = c_fn_rc(
+    "obx_query_prop_sum", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_min_int(OBX_query_prop* query, int64_t* out_minimum, int64_t* out_count);
+obx_query_prop_min_int = c_fn_rc(
+    "obx_query_prop_min_int", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_max_int(OBX_query_prop* query, int64_t* out_maximum, int64_t* out_count);
+obx_query_prop_max_int = c_fn_rc(
+    "obx_query_prop_max_int", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API obx_err obx_query_prop_sum_int(OBX_query_prop* query, int64_t* out_sum, int64_t* out_count);
+obx_query_prop_sum_int = c_fn_rc(
+    "obx_query_prop_sum_int", [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API OBX_string_array* obx_query_prop_find_strings(OBX_query_prop* query, const char* value_if_null);
+obx_query_prop_find_strings = c_fn(
+    "obx_query_prop_find_strings", OBX_string_array_p, [OBX_query_prop_p, ctypes.c_char_p]
+)
+
+# OBX_C_API OBX_int64_array* obx_query_prop_find_int64s(OBX_query_prop* query, const int64_t* value_if_null);
+obx_query_prop_find_int64s = c_fn(
+    "obx_query_prop_find_int64s", OBX_int64_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int64)]
+)
+
+# OBX_C_API OBX_int32_array* obx_query_prop_find_int32s(OBX_query_prop* query, const int32_t* value_if_null);
+obx_query_prop_find_int32s = c_fn(
+    "obx_query_prop_find_int32s", OBX_int32_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int32)]
+)
+
+# OBX_C_API OBX_int16_array* obx_query_prop_find_int16s(OBX_query_prop* query, const int16_t* value_if_null);
+obx_query_prop_find_int16s = c_fn(
+    "obx_query_prop_find_int16s", OBX_int16_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int16)]
+)
+
+# OBX_C_API OBX_int8_array* obx_query_prop_find_int8s(OBX_query_prop* query, const int8_t* value_if_null);
+obx_query_prop_find_int8s = c_fn(
+    "obx_query_prop_find_int8s", OBX_int8_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_int8)]
+)
+
+# OBX_C_API OBX_double_array* obx_query_prop_find_doubles(OBX_query_prop* query, const double* value_if_null);
+obx_query_prop_find_doubles = c_fn(
+    "obx_query_prop_find_doubles", OBX_double_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_double)]
+)
+
+# OBX_C_API OBX_float_array* obx_query_prop_find_floats(OBX_query_prop* query, const float* value_if_null);
+obx_query_prop_find_floats = c_fn(
+    "obx_query_prop_find_floats", OBX_float_array_p, [OBX_query_prop_p, ctypes.POINTER(ctypes.c_float)]
+)
+
 # OBX_bytes_array* (size_t count);
 obx_bytes_array = c_fn("obx_bytes_array", OBX_bytes_array_p, [ctypes.c_size_t])
 
@@ -827,6 +1177,30 @@ obx_bytes_array_set = c_fn_rc(
 # void (OBX_bytes_array * array);
 obx_bytes_array_free = c_fn("obx_bytes_array_free", None, [OBX_bytes_array_p])
 
+# void (OBX_id_array* array);
+obx_id_array_free = c_fn("obx_id_array_free", None, [OBX_id_array_p])
+
+# void (OBX_string_array* array);
+obx_string_array_free = c_fn("obx_string_array_free", None, [OBX_string_array_p])
+
+# void (OBX_int64_array* array);
+obx_int64_array_free = c_fn("obx_int64_array_free", None, [OBX_int64_array_p])
+
+# void (OBX_int32_array* array);
+obx_int32_array_free = c_fn("obx_int32_array_free", None, [OBX_int32_array_p])
+
+# void (OBX_int16_array* array);
+obx_int16_array_free = c_fn("obx_int16_array_free", None, [OBX_int16_array_p])
+
+# void (OBX_int8_array* array);
+obx_int8_array_free = c_fn("obx_int8_array_free", None, [OBX_int8_array_p])
+
+# void (OBX_double_array* array);
+obx_double_array_free = c_fn("obx_double_array_free", None, [OBX_double_array_p])
+
+# void (OBX_float_array* array);
+obx_float_array_free = c_fn("obx_float_array_free", None, [OBX_float_array_p])
+
 OBXPropertyType_Bool = 1
 OBXPropertyType_Byte = 2
 OBXPropertyType_Short = 3
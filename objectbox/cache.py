@@ -0,0 +1,164 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import threading
+
+
+class ObjectCache:
+    """LRU cache of objects by ID, used by Box.get() if the Box was created with a cache_size.
+    Cached objects are never handed out directly; get() returns copies (see _Entity.copy()).
+    Every invalidation increments the generation; objects read before an invalidation (i.e. possibly outdated) are
+    not added, see add(). Objects with a queued async operation aren't added until it's known to be committed, see
+    expect()."""
+
+    def __init__(self, max_size: int, copy):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._copy = copy
+        self._objects = OrderedDict()
+        self._generation = 0
+        self._pending = {}  # ID => (data expected once the queued async operation is committed,), see expect()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, id: int):
+        """Returns a copy of the cached object with the given ID, or None"""
+        with self._lock:
+            obj = self._objects.get(id)
+            if obj is None:
+                self.misses += 1
+                return None
+            self._objects.move_to_end(id)
+            self.hits += 1
+        return self._copy(obj)
+
+    def add(self, id: int, obj, generation: int, data: bytes = None):
+        """Adds an object that was read (from the given data) while the cache had the given generation; the object
+        must not be used afterwards. Evicts the least recently used objects if the cache is full."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            expected = self._pending.get(id)
+            if expected is not None:
+                if expected[0] is None or expected[0] != data:
+                    return  # the async operation hasn't been committed yet
+                del self._pending[id]
+            self._objects[id] = obj
+            self._objects.move_to_end(id)
+            while len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+
+    def invalidate(self, ids=None):
+        """Removes the objects with the given IDs, or all objects if ids is None"""
+        with self._lock:
+            self._generation += 1
+            if ids is None:
+                self._objects.clear()
+            else:
+                for id in ids:
+                    self._objects.pop(id, None)
+
+    def expect(self, id: int, data):
+        """Removes the object for an async operation queued for it (see AsyncBox), which is committed at some point
+        later: until then, reads would see the old object. So the object isn't cached again until it's read with the
+        given data (None for a removal), i.e. the operation has been committed, or settle() is called."""
+        with self._lock:
+            self._generation += 1
+            self._objects.pop(id, None)
+            self._pending[id] = (data,)
+
+    def pending(self) -> dict:
+        """The current expectations, to be passed to settle() once all queued operations have been committed"""
+        with self._lock:
+            return dict(self._pending)
+
+    def settle(self, pending: dict):
+        """Ends the given expectations (from pending()), unless they were replaced by a newer operation since"""
+        with self._lock:
+            for id, expected in pending.items():
+                if self._pending.get(id) is expected:
+                    del self._pending[id]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._objects), "max_size": self.max_size}
+
+
+class QueryCache:
+    """LRU cache of query results (see Query), used if the store was built with a query_cache_size.
+    Its size is bounded by the estimated bytes of the results. Results are dropped whenever a commit changes objects
+    of their entity, see invalidate(), which ObjectBox calls from a native observer.
+    Like in ObjectCache, results computed before an invalidation of their entity are not added."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key => (entity ID, result, size)
+        self._bytes = 0
+        self._generations = {}  # entity ID => generation
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def generation(self, entity_id: int) -> int:
+        return self._generations.get(entity_id, 0)
+
+    def get(self, key):
+        """Returns the cached result for the given key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def add(self, key, entity_id: int, result, size: int, generation: int):
+        """Adds a result that was computed while its entity had the given generation. Results larger than max_bytes
+        are not cached; otherwise, the least recently used results are evicted to make room."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generations.get(entity_id, 0):
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (entity_id, result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    def invalidate(self, entity_ids):
+        """Removes the results of queries for the given entities"""
+        entity_ids = set(entity_ids)
+        with self._lock:
+            for entity_id in entity_ids:
+                self._generations[entity_id] = self._generations.get(entity_id, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[0] in entity_ids]:
+                self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "bytes": self._bytes,
+                "max_bytes": self.max_bytes}
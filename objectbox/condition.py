@@ -1,4 +1,25 @@
 from enum import Enum
+from datetime import datetime
+from math import floor
+import numpy as np
+from objectbox.c import *
+
+# property types compared with the *_int conditions; the ones in _int32_types use the int32 variants of in/not-in
+_int_types = (OBXPropertyType_Bool, OBXPropertyType_Byte, OBXPropertyType_Short, OBXPropertyType_Char,
+              OBXPropertyType_Int, OBXPropertyType_Long, OBXPropertyType_Date, OBXPropertyType_DateNano)
+_int32_types = (OBXPropertyType_Byte, OBXPropertyType_Short, OBXPropertyType_Char, OBXPropertyType_Int)
+
+
+def _hashable(value):
+    """The given condition value in a hashable form"""
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist()) if value.dtype == object else (value.dtype.str, value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    elif isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return value
+
 
 class _ConditionOp(Enum):
     eq = 1
@@ -11,85 +32,316 @@ class _ConditionOp(Enum):
     lt = 8
     lessOrEq = 9
     between = 10
+    in_ = 11
+    notIn = 12
 
 
 class QueryCondition:
-    def __init__(self, property_id: int, op: _ConditionOp, value, value_b = None, case_sensitive: bool = True):
+    def __init__(self, property_id: int, op: _ConditionOp, value, value_b = None, case_sensitive: bool = True,
+                 property_type: int = None):
+        """property_type (OBXPropertyType): selects the native condition, e.g. for a double property an int value is
+        compared as a double; if not given, it's derived from the type of the value"""
         self._property_id = property_id
         self._op = op
         self._value = value
         self._value_b = value_b
         self._case_sensitive = case_sensitive
+        self._property_type = property_type
+        self._alias = None
+
+    def alias(self, name: str) -> 'QueryCondition':
+        """Names the condition as a query parameter: its value can be changed on the built query with
+        Query.set(name=value), without building a new query"""
+        self._alias = name
+        return self
+
+    def __and__(self, other: 'QueryCondition') -> 'QueryCondition':
+        return _CombinedCondition.combine(_CombinedCondition.all, self, other)
+
+    def __or__(self, other: 'QueryCondition') -> 'QueryCondition':
+        return _CombinedCondition.combine(_CombinedCondition.any, self, other)
+
+    def _kind(self) -> str:
+        """The kind of native condition to use: "string", "int", "double" or "bytes" """
+        kind = self.__dict__.get("_kind_value")
+        if kind is None:
+            kind = self._kind_value = self._determine_kind()
+        return kind
+
+    def _determine_kind(self) -> str:
+        property_kind = None
+        if self._property_type == OBXPropertyType_String:
+            property_kind = "string"
+        elif self._property_type == OBXPropertyType_ByteVector:
+            property_kind = "bytes"
+        elif self._property_type in (OBXPropertyType_Float, OBXPropertyType_Double):
+            property_kind = "double"
+        elif self._property_type in _int_types:
+            property_kind = "int"
+
+        value = self._value
+        if self._op in (_ConditionOp.in_, _ConditionOp.notIn):
+            if property_kind is not None:  # don't consume iterators
+                return property_kind
+            value = np.asarray(value if isinstance(value, (list, tuple, np.ndarray)) else list(value))
+            return {"U": "string", "i": "int", "u": "int"}.get(value.dtype.kind, "unsupported")
+
+        if isinstance(value, str):
+            kind = "string"
+        elif isinstance(value, (bytes, bytearray)):
+            kind = "bytes"
+        elif isinstance(value, (bool, int, np.integer, datetime, np.datetime64)):
+            kind = "int"
+        elif isinstance(value, (float, np.floating)):
+            kind = "double"
+        else:
+            return "unsupported"
+        # integers are compared as doubles with float properties; other mismatches are reported by the core
+        return "double" if kind == "int" and property_kind == "double" else kind
+
+    def _int(self, value) -> int:
+        """Converts a value for an integer property, e.g. a datetime for a date property (stored as ms or ns)"""
+        if isinstance(value, datetime):
+            from objectbox.model.codec import _date_scales
+            return floor(value.timestamp() * _date_scales.get(self._property_type, 1000))
+        elif isinstance(value, np.datetime64):
+            unit = "ns" if self._property_type == OBXPropertyType_DateNano else "ms"
+            return int(value.astype("datetime64[%s]" % unit).astype(np.int64))
+        return int(value)
+
+    def _int_array(self, values, dtype) -> np.ndarray:
+        """The values of an in/not-in condition as a contiguous array, without creating Python lists"""
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            unit = "ns" if self._property_type == OBXPropertyType_DateNano else "ms"
+            values = values.astype("datetime64[%s]" % unit).astype(np.int64)
+        if isinstance(values, np.ndarray):
+            return np.ascontiguousarray(values, dtype=dtype)
+        elif isinstance(values, (list, tuple)) and not any(isinstance(v, (datetime, np.datetime64)) for v in values):
+            return np.array(values, dtype=dtype)
+        return np.fromiter((self._int(v) for v in values), dtype=dtype)
+
+    def _shape(self) -> tuple:
+        """Identifies the native condition created by apply(), regardless of the value (apart from its kind, e.g. a
+        float compared with an int property gives a double condition)"""
+        return self._property_id, self._op, self._kind(), self._case_sensitive, self._alias
+
+    def _cache_key(self) -> tuple:
+        """Identifies the native condition created by apply(), including the values; see Query._cached()"""
+        return self._shape() + (_hashable(self._value), _hashable(self._value_b))
+
+    def _leaves(self) -> list:
+        return [self]
+
+    def _set_param(self, c_query, alias: str, value):
+        """Sets a new value of the condition on a query built with the given alias for it (see apply()); returns the
+        value in a hashable form, used as part of the key for query results cached by the store"""
+        c_alias = c_str(alias)
+        kind = self._kind()
+        if self._op == _ConditionOp.between:
+            value_a, value_b = value
+            if kind == "int":
+                value = self._int(value_a), self._int(value_b)
+                obx_query_param_alias_2ints(c_query, c_alias, *value)
+            elif kind == "double":
+                value = float(value_a), float(value_b)
+                obx_query_param_alias_2doubles(c_query, c_alias, *value)
+            else:
+                raise Exception("Unsupported type for 'between': " + str(type(value_a)))
+        elif self._op in (_ConditionOp.in_, _ConditionOp.notIn):
+            if kind == "string":
+                value = tuple(value)
+                c_values = (ctypes.c_char_p * len(value))(*[c_str(v) for v in value])
+                obx_query_param_alias_strings(c_query, c_alias, c_values, len(value))
+            elif kind == "int" and self._property_type in _int32_types:
+                array = self._int_array(value, np.int32)
+                obx_query_param_alias_int32s(c_query, c_alias, array.ctypes.data_as(ctypes.POINTER(ctypes.c_int32)),
+                                             len(array))
+                value = array.tobytes()
+            elif kind == "int":
+                array = self._int_array(value, np.int64)
+                obx_query_param_alias_int64s(c_query, c_alias, array.ctypes.data_as(ctypes.POINTER(ctypes.c_int64)),
+                                             len(array))
+                value = array.tobytes()
+            else:
+                raise Exception("Unsupported type for 'in': " + str(type(value)))
+        elif kind == "string":
+            obx_query_param_alias_string(c_query, c_alias, c_str(value))
+        elif kind == "int":
+            value = self._int(value)
+            obx_query_param_alias_int(c_query, c_alias, value)
+        elif kind == "double":
+            value = float(value)
+            obx_query_param_alias_double(c_query, c_alias, value)
+        elif kind == "bytes":
+            value = bytes(value)
+            obx_query_param_alias_bytes(c_query, c_alias, value, len(value))
+        else:
+            raise Exception("Unsupported parameter type: " + str(type(value)))
+        return value
 
     def apply(self, builder: 'QueryBuilder'):
+        """Adds the condition to the builder, returning its native handle"""
+        c_condition = self._apply(builder)
+        alias = self._alias or builder.default_alias()
+        if alias:
+            builder.param_alias(alias, self)
+        return c_condition
+
+    def _apply(self, builder: 'QueryBuilder'):
+        kind = self._kind()
+        value = self._value
+        if kind == "int" and self._op not in (_ConditionOp.in_, _ConditionOp.notIn):
+            value = self._int(value)
+        elif kind == "double":
+            value = float(value)
+
         if self._op == _ConditionOp.eq:
-            if isinstance(self._value, str):
-                builder.equals_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.equals_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._equals_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._equals_int(self._property_id, value)
+            elif kind == "bytes":
+                return builder._equals_bytes(self._property_id, value)
+            elif kind == "double":
+                raise Exception("Floating point values can't be compared for equality, use 'between' instead")
             else:
                 raise Exception("Unsupported type for 'eq': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.notEq:
-            if isinstance(self._value, str):
-                builder.not_equals_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.not_equals_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._not_equals_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._not_equals_int(self._property_id, value)
             else:
                 raise Exception("Unsupported type for 'notEq': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.contains:
-            if isinstance(self._value, str):
-                builder.contains_string(self._property_id, self._value, self._case_sensitive)
+            if kind == "string":
+                return builder._contains_string(self._property_id, value, self._case_sensitive)
             else:
                 raise Exception("Unsupported type for 'contains': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.startsWith:
-            if isinstance(self._value, str):
-                builder.starts_with_string(self._property_id, self._value, self._case_sensitive)
+            if kind == "string":
+                return builder._starts_with_string(self._property_id, value, self._case_sensitive)
             else:
                 raise Exception("Unsupported type for 'startsWith': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.endsWith:
-            if isinstance(self._value, str):
-                builder.ends_with_string(self._property_id, self._value, self._case_sensitive)
+            if kind == "string":
+                return builder._ends_with_string(self._property_id, value, self._case_sensitive)
             else:
                 raise Exception("Unsupported type for 'endsWith': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.gt:
-            if isinstance(self._value, str):
-                builder.greater_than_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.greater_than_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._greater_than_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._greater_than_int(self._property_id, value)
+            elif kind == "double":
+                return builder._greater_than_double(self._property_id, value)
+            elif kind == "bytes":
+                return builder._greater_than_bytes(self._property_id, value)
             else:
                 raise Exception("Unsupported type for 'gt': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.greaterOrEq:
-            if isinstance(self._value, str):
-                builder.greater_or_equal_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.greater_or_equal_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._greater_or_equal_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._greater_or_equal_int(self._property_id, value)
+            elif kind == "double":
+                return builder._greater_or_equal_double(self._property_id, value)
+            elif kind == "bytes":
+                return builder._greater_or_equal_bytes(self._property_id, value)
             else:
                 raise Exception("Unsupported type for 'greaterOrEq': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.lt:
-            if isinstance(self._value, str):
-                builder.less_than_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.less_than_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._less_than_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._less_than_int(self._property_id, value)
+            elif kind == "double":
+                return builder._less_than_double(self._property_id, value)
+            elif kind == "bytes":
+                return builder._less_than_bytes(self._property_id, value)
             else:
                 raise Exception("Unsupported type for 'lt': " + str(type(self._value)))
         
         elif self._op == _ConditionOp.lessOrEq:
-            if isinstance(self._value, str):
-                builder.less_or_equal_string(self._property_id, self._value, self._case_sensitive)
-            elif isinstance(self._value, int):
-                builder.less_or_equal_int(self._property_id, self._value)
+            if kind == "string":
+                return builder._less_or_equal_string(self._property_id, value, self._case_sensitive)
+            elif kind == "int":
+                return builder._less_or_equal_int(self._property_id, value)
+            elif kind == "double":
+                return builder._less_or_equal_double(self._property_id, value)
+            elif kind == "bytes":
+                return builder._less_or_equal_bytes(self._property_id, value)
             else:
                 raise Exception("Unsupported type for 'lessOrEq': " + str(type(self._value)))
             
         elif self._op == _ConditionOp.between:
-            if isinstance(self._value, int):
-                builder.between_2ints(self._property_id, self._value, self._value_b)
+            if kind == "int":
+                return builder._between_2ints(self._property_id, value, self._int(self._value_b))
+            elif kind == "double":
+                return builder._between_2doubles(self._property_id, value, float(self._value_b))
+            else:
+                raise Exception("Unsupported type for 'between': " + str(type(self._value)))
+
+        elif self._op == _ConditionOp.in_:
+            if kind == "string":
+                return builder._in_strings(self._property_id, list(value), self._case_sensitive)
+            elif kind == "int" and self._property_type in _int32_types:
+                return builder._in_int32s(self._property_id, self._int_array(self._value, np.int32))
+            elif kind == "int":
+                return builder._in_int64s(self._property_id, self._int_array(self._value, np.int64))
+            else:
+                raise Exception("Unsupported type for 'in': " + str(type(self._value)))
+
+        elif self._op == _ConditionOp.notIn:
+            if kind == "int" and self._property_type in _int32_types:
+                return builder._not_in_int32s(self._property_id, self._int_array(self._value, np.int32))
+            elif kind == "int":
+                return builder._not_in_int64s(self._property_id, self._int_array(self._value, np.int64))
+            else:
+                raise Exception("Unsupported type for 'notIn': " + str(type(self._value)))
+
+
+class _CombinedCondition(QueryCondition):
+    """Conditions combined with & (all) or | (any), evaluated by the core as a tree of conditions"""
+    all = "all"
+    any = "any"
+
+    def __init__(self, op: str, conditions: list):
+        self._op = op
+        self._conditions = conditions
+
+    def alias(self, name: str):
+        raise Exception("Only single conditions can be used as parameters")
+
+    def _shape(self) -> tuple:
+        return (self._op,) + tuple(condition._shape() for condition in self._conditions)
+
+    def _cache_key(self) -> tuple:
+        return (self._op,) + tuple(condition._cache_key() for condition in self._conditions)
+
+    def _leaves(self) -> list:
+        return [leaf for condition in self._conditions for leaf in condition._leaves()]
+
+    @staticmethod
+    def combine(op: str, a: QueryCondition, b: QueryCondition) -> '_CombinedCondition':
+        # a & b & c becomes a single all() of three conditions instead of a nested one
+        conditions = []
+        for condition in (a, b):
+            if not isinstance(condition, QueryCondition):
+                raise Exception("Conditions can only be combined with other conditions, got " + str(type(condition)))
+            if isinstance(condition, _CombinedCondition) and condition._op == op:
+                conditions.extend(condition._conditions)
             else:
-                raise Exception("Unsupported type for 'between': " + str(type(self._value)))
\ No newline at end of file
+                conditions.append(condition)
+        return _CombinedCondition(op, conditions)
+
+    def apply(self, builder: 'QueryBuilder'):
+        c_conditions = [condition.apply(builder) for condition in self._conditions]
+        return builder._all(c_conditions) if self._op == _CombinedCondition.all else builder._any(c_conditions)
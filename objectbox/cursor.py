@@ -0,0 +1,58 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from objectbox.c import *
+
+
+class Cursor:
+    """Native cursor over the objects of an entity, ordered by ID, valid only inside the given transaction.
+    Read methods return a copy of the object's FlatBuffers data, or None if there's no (further) object."""
+
+    def __init__(self, c_txn: OBX_txn_p, entity_id: int):
+        self._c_cursor = obx_cursor(c_txn, entity_id)
+        self._c_data = ctypes.c_void_p()
+        self._c_size = ctypes.c_size_t()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        c_cursor_to_close = self._c_cursor
+        if c_cursor_to_close:
+            self._c_cursor = None
+            obx_cursor_close(c_cursor_to_close)
+
+    def _read(self, fn) -> bytes:
+        try:
+            fn(self._c_cursor, ctypes.byref(self._c_data), ctypes.byref(self._c_size))
+        except NotFoundException:
+            return None
+        return c_voidp_as_bytes(self._c_data, self._c_size.value)
+
+    def first(self) -> bytes:
+        return self._read(obx_cursor_first)
+
+    def next(self) -> bytes:
+        return self._read(obx_cursor_next)
+
+    def seek(self, id: int) -> bytes:
+        """Moves to the object with the given ID and returns it (None if it doesn't exist)"""
+        try:
+            obx_cursor_seek(self._c_cursor, id)
+        except NotFoundException:
+            return None
+        return self._read(obx_cursor_current)
@@ -0,0 +1,688 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Generates entity specific marshal/unmarshal functions.
+# The generic implementation in _Entity dispatches on the property type for every property of every object; the
+# functions generated here resolve all of that once (when the entity is added to a Model) so only the actual
+# FlatBuffers reads/writes remain at runtime.
+
+import copy
+import struct
+import flatbuffers
+import flatbuffers.flexbuffers
+import numpy as np
+from math import floor
+from datetime import datetime
+from objectbox.c import *
+
+# numpy element types of vector properties, used for both directions (marshal/unmarshal)
+_vector_dtypes = {
+    OBXPropertyType_BoolVector: (np.bool_, flatbuffers.number_types.BoolFlags),
+    OBXPropertyType_ShortVector: (np.int16, flatbuffers.number_types.Int16Flags),
+    # note: chars are written as uint16 but read as int16, mirroring _Entity.marshal/unmarshal
+    OBXPropertyType_CharVector: (np.uint16, flatbuffers.number_types.Int16Flags),
+    OBXPropertyType_IntVector: (np.int32, flatbuffers.number_types.Int32Flags),
+    OBXPropertyType_LongVector: (np.int64, flatbuffers.number_types.Int64Flags),
+    OBXPropertyType_FloatVector: (np.float32, flatbuffers.number_types.Float32Flags),
+    OBXPropertyType_DoubleVector: (np.float64, flatbuffers.number_types.Float64Flags),
+}
+
+# date property scale factors relative to seconds (as returned by datetime.timestamp())
+_date_scales = {
+    OBXPropertyType_Date: 1000,
+    OBXPropertyType_DateNano: 1000000000,
+}
+
+_uoffset = struct.Struct("<I").unpack_from
+_soffset = struct.Struct("<i").unpack_from
+_voffset = struct.Struct("<H").unpack_from
+
+
+def default_value(prop):
+    """Returns the value used for the property if it's not set on the object (see _Entity.get_value())."""
+    if prop._py_type == np.ndarray:
+        return np.array([])
+    elif prop._py_type == datetime:
+        return datetime.fromtimestamp(0)
+    elif prop._ob_type == OBXPropertyType_Flex:
+        return None
+    return prop._py_type()
+
+
+def _default_expr(prop, ns: dict, i: int) -> str:
+    """Python expression creating the value for a property missing in the FlatBuffers table."""
+    if prop._py_type == np.ndarray:
+        return "_np.array([])"
+    elif prop._py_type == list:
+        return "[]"
+    elif prop._py_type == datetime:
+        return "_datetime.fromtimestamp(0)"
+    elif prop._ob_type == OBXPropertyType_Flex:
+        return "None"
+    elif prop._py_type in (str, bytes, int, float, bool):
+        ns["_D%d" % i] = prop._py_type()
+        return "_D%d" % i
+    ns["_T%d" % i] = prop._py_type
+    return "_T%d()" % i
+
+
+def decode_lines(prop, ns: dict, i: int, target: str) -> list:
+    """Python statements reading the (present) property into `target`.
+    Expects the locals `data` (the FlatBuffers bytes), `pos` (the table position) and `o` (the field offset)."""
+    ob_type = prop._ob_type
+    if ob_type == OBXPropertyType_String:
+        return [
+            "p = pos + o",
+            "p += _uoffset(data, p)[0]",
+            "%s = str(data[p + 4:p + 4 + _uoffset(data, p)[0]], 'utf-8')" % target,
+        ]
+    elif ob_type == OBXPropertyType_ByteVector:
+        ns["_T%d" % i] = prop._py_type
+        return [
+            "p = pos + o",
+            "p += _uoffset(data, p)[0]",
+            "%s = _T%d(data[p + 4:p + 4 + _uoffset(data, p)[0]])" % (target, i),
+        ]
+    elif ob_type == OBXPropertyType_Flex:
+        return [
+            "p = pos + o",
+            "p += _uoffset(data, p)[0]",
+            "%s = _flex_loads(data[p + 4:p + 4 + _uoffset(data, p)[0]])" % target,
+        ]
+    elif ob_type in _vector_dtypes:
+        ns["_DT%d" % i] = flatbuffers.number_types.to_numpy_type(_vector_dtypes[ob_type][1])
+        lines = [
+            "p = pos + o",
+            "p += _uoffset(data, p)[0]",
+            "%s = _np.frombuffer(data, dtype=_DT%d, count=_uoffset(data, p)[0], offset=p + 4)" % (target, i),
+        ]
+        if prop._py_type == list:
+            lines.append("%s = %s.tolist()" % (target, target))
+        return lines
+
+    # scalars
+    ns["_U%d" % i] = prop._fb_type.packer_type.unpack_from
+    if ob_type in _date_scales and prop._py_type == datetime:
+        return ["%s = _datetime.fromtimestamp(_U%d(data, pos + o)[0] / %d)" % (target, i, _date_scales[ob_type])]
+    return ["%s = _U%d(data, pos + o)[0]" % (target, i)]
+
+
+def encode_lines(prop, ns: dict, i: int) -> list:
+    """Python statements reading the value of the given property from `obj` into `v<i>`, applying the default.
+    The default instance is shared between calls, which is fine as it's only read while encoding."""
+    ns["_P%d" % i] = prop
+    ns["_D%d" % i] = default_value(prop)
+    return [
+        "v%d = obj.%s" % (i, prop._name),
+        "if v%d is _P%d: v%d = _D%d" % (i, i, i, i),
+    ]
+
+
+def compile_source(source: str, ns: dict, name: str, entity):
+    code = compile(source, "<objectbox %s %s>" % (entity.name, name), "exec")
+    exec(code, ns)
+    return ns[name]
+
+
+def base_namespace() -> dict:
+    return {
+        "_np": np,
+        "_floor": floor,
+        "_datetime": datetime,
+        "_uoffset": _uoffset,
+        "_soffset": _soffset,
+        "_voffset": _voffset,
+        "_FlexBuilder": flatbuffers.flexbuffers.Builder,
+        "_flex_loads": flatbuffers.flexbuffers.Loads,
+    }
+
+
+def struct_layout(entity, props: list) -> tuple:
+    """Computes a fixed FlatBuffers layout for a table containing only the given scalar properties.
+    Returns (struct format, constant header values, table position, {property: offset in the table}).
+
+    The buffer is laid out as: root uoffset, vtable, padding, table (soffset to the vtable, fields). Fields are sorted
+    by size (largest first) and naturally aligned, assuming the buffer itself is 8-byte aligned.
+    """
+    entries = max(prop._fb_slot for prop in props) + 1
+    vtable = [0] * entries
+    fields = sorted(props, key=lambda prop: -prop._fb_type.bytewidth)  # stable: keeps the slot order otherwise
+    max_align = max([4] + [prop._fb_type.bytewidth for prop in fields])
+
+    # the table starts with a 4-byte soffset, the first (largest) field follows and must be aligned
+    table_pos = 4 + 4 + 2 * entries
+    while (table_pos + 4) % max_align != 0:
+        table_pos += 1
+
+    fmt = "<IHH" + "H" * entries + "x" * (table_pos - 4 - 4 - 2 * entries) + "i"
+    offsets = {}
+    table_size = 4
+    for prop in fields:
+        width = prop._fb_type.bytewidth
+        pad = (-(table_pos + table_size)) % width
+        fmt += "x" * pad + prop._fb_type.packer_type.format[-1]
+        table_size += pad
+        offsets[prop] = table_size
+        vtable[prop._fb_slot] = table_size
+        table_size += width
+
+    fmt += "x" * ((-(table_pos + table_size)) % 8)
+    header = [table_pos, 4 + 2 * entries, table_size] + vtable + [table_pos - 4]
+    return fmt, header, table_pos, offsets
+
+
+def compile_struct_marshal(entity, raw_dates: bool = False):
+    """Generates `marshal(object, id) -> bytes` writing FlatBuffers data without the Builder.
+    The table has a fixed layout (see struct_layout()) and is written with a single struct.pack() call. Strings,
+    vectors and flex values follow the table, each aligned as required, with their offsets stored in the table.
+    With raw_dates, date properties are expected as numbers (ms/ns) even if declared as datetime."""
+    fmt, header, table_pos, offsets = struct_layout(entity, entity.properties)
+    ns = base_namespace()
+    ns["_pack"] = struct.Struct(fmt).pack
+    ns["_len"] = struct.Struct("<I").pack
+    ns["_pad"] = tuple(b"\0" * (-r % 4) for r in range(4))  # indexed by size % 4
+    ns["_nul_pad"] = tuple(b"\0" * (4 - r) for r in range(4))  # string terminator + padding
+    ns["_Z4"] = bytes(4)
+
+    body = []
+    for i, prop in enumerate(entity.properties):
+        if prop is entity.id_property:
+            body.append("v%d = id" % i)
+            continue
+        body.extend(encode_lines(prop, ns, i))
+        if prop._ob_type in _date_scales:
+            if prop._py_type == datetime and not raw_dates:
+                body.append("v%d = _floor(v%d.timestamp() * %d)" % (i, i, _date_scales[prop._ob_type]))
+            else:
+                body.append("v%d = _floor(v%d)" % (i, i))
+
+    # offset properties: `pos` is the absolute position of the next payload, the table's field holds the offset from
+    # the field to the payload; the table (with the header) is 8-byte aligned and always a multiple of 8 bytes long
+    if entity.offset_properties:
+        body.append("parts = [None]")
+        body.append("pos = %d" % struct.calcsize(fmt))
+    for i, prop in enumerate(entity.properties):
+        if prop not in entity.offset_properties:
+            continue
+        ob_type = prop._ob_type
+        width = 1
+        if ob_type == OBXPropertyType_String:
+            body.append("b = v%d.encode('utf-8')" % i)
+        elif ob_type == OBXPropertyType_ByteVector:
+            body.append("b = bytes(v%d)" % i)
+        elif ob_type == OBXPropertyType_Flex:
+            fb = flatbuffers.flexbuffers.Builder()
+            fb.Add(None)
+            ns["_FN%d" % i] = bytes(fb.Finish())  # the default, no need to build it every time
+            body.extend([
+                "if v%d is None:" % i,
+                "    b = _FN%d" % i,
+                "else:",
+                "    fb = _FlexBuilder()",
+                "    fb.Add(v%d)" % i,
+                "    b = bytes(fb.Finish())",
+            ])
+        else:
+            dtype = np.dtype(_vector_dtypes[ob_type][0]).newbyteorder("<")
+            ns["_VT%d" % i] = dtype
+            width = dtype.itemsize
+            body.append("b = _np.asarray(v%d, dtype=_VT%d).tobytes()" % (i, i))
+        if width == 8:
+            # the length prefix is 4-aligned, the elements must be 8-aligned
+            body.append("if pos & 4 == 0: parts.append(_Z4); pos += 4")
+        body.append("n = len(b)")
+        body.append("v%d = pos - %d" % (i, table_pos + offsets[prop]))
+        count = "n" if width == 1 else "n // %d" % width
+        if ob_type == OBXPropertyType_String:
+            body.append("parts += (_len(n), b, _nul_pad[n & 3])")
+            body.append("pos += 8 + n - (n & 3)")
+        else:
+            body.append("parts += (_len(%s), b, _pad[n & 3])" % count)
+            body.append("pos += 4 + n + (-n & 3)")
+
+    # pack arguments are in the layout order (by field offset), not the declaration order
+    index = {prop: i for i, prop in enumerate(entity.properties)}
+    values = ["v%d" % index[prop] for prop in sorted(offsets, key=offsets.get)]
+    packed = "_pack(%s)" % ", ".join([str(v) for v in header] + values)
+    if entity.offset_properties:
+        body.append("if pos & 4: parts.append(_Z4)  # keep the size a multiple of 8, see Box._put_data()")
+        body.append("parts[0] = " + packed)
+        body.append("return b''.join(parts)")
+    else:
+        body.append("return " + packed)
+    source = "def marshal(obj, id):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "marshal", entity)
+
+
+def compile_unmarshal(entity, track: bool = False):
+    """Generates `unmarshal(data) -> object` for the given entity, equivalent to _Entity.unmarshal().
+    With track, the loaded values are recorded on the object for change tracking, see compile_change_tracking()."""
+    ns = base_namespace()
+    ns["_cls"] = entity.cls
+    body = [
+        "pos = _uoffset(data, 0)[0]",
+        "vt = pos - _soffset(data, pos)[0]",
+        "vt_size = _voffset(data, vt)[0]",
+        "obj = _cls()",
+    ]
+    for i, prop in enumerate(entity.properties):
+        body.append("o = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (prop._fb_v_offset, prop._fb_v_offset))
+        body.append("if o:")
+        body.extend("    " + line for line in decode_lines(prop, ns, i, "v%d" % i))
+        body.append("else:")
+        body.append("    v%d = %s" % (i, _default_expr(prop, ns, i)))
+        body.append("obj.%s = v%d" % (prop._name, i))
+    if track:
+        values = "".join("v%d, " % i for i in range(len(entity.properties)))
+        snapshot_data = "data" if any(_is_mutable(prop) for prop in entity.properties) else "None"
+        body.append("obj._ob_loaded = (%s, (%s))" % (snapshot_data, values))
+    body.append("return obj")
+    source = "def unmarshal(data):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "unmarshal", entity)
+
+
+def _is_mutable(prop) -> bool:
+    """Whether values of the property can be changed in place, i.e. without assigning a new value to the object"""
+    return prop._py_type in (list, np.ndarray) or prop._ob_type == OBXPropertyType_Flex
+
+
+def compile_change_tracking(entity) -> tuple:
+    """Generates `snapshot(obj, data)` and `is_changed(obj) -> bool` for the given entity.
+
+    A snapshot, stored as `_ob_loaded` in the object's __dict__, holds the property values the object had when it was
+    read with tracking (see compile_unmarshal()) or last put, and the FlatBuffers data if there are mutable properties. Values that
+    are replaced by assignment are detected by identity; mutable values (lists, writable arrays, flex) are
+    additionally compared with the values decoded from the snapshot data. Objects without a snapshot (e.g. new or
+    lazily loaded ones) are always considered changed."""
+    ns = base_namespace()
+    index = {prop: i for i, prop in enumerate(entity.properties)}
+    mutable = [prop for prop in entity.properties if _is_mutable(prop)]
+
+    values = "".join("obj.%s, " % prop._name for prop in entity.properties)
+    snapshot = "def snapshot(obj, data):\n    obj._ob_loaded = (%s, (%s))\n" % (
+        "data" if mutable else "None", values)
+
+    body = [
+        "loaded = obj.__dict__.get('_ob_loaded')",
+        "if loaded is None: return True",
+        "data, values = loaded",
+    ]
+    # cheap identity checks first
+    for prop in entity.properties:
+        body.append("if obj.%s is not values[%d]: return True" % (prop._name, index[prop]))
+    if mutable:
+        body.append("pos = _uoffset(data, 0)[0]")
+        body.append("vt = pos - _soffset(data, pos)[0]")
+        body.append("vt_size = _voffset(data, vt)[0]")
+    for prop in mutable:
+        i = index[prop]
+        ns["_P%d" % i] = prop
+        body.append("v = values[%d]" % i)
+        if prop._py_type == np.ndarray:
+            # arrays read from the database are read-only views; only writable ones can have changed in place
+            body.append("if v is not _P%d and (not isinstance(v, _np.ndarray) or v.flags.writeable):" % i)
+        else:
+            body.append("if v is not _P%d:" % i)
+        body.append("    o = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (
+            prop._fb_v_offset, prop._fb_v_offset))
+        body.append("    if o:")
+        body.extend("        " + line for line in decode_lines(prop, ns, i, "d"))
+        body.append("    else:")
+        body.append("        d = %s" % _default_expr(prop, ns, i))
+        if prop._py_type == np.ndarray:
+            body.append("    if not _np.array_equal(v, d): return True")
+        else:
+            body.append("    if v != d: return True")
+    body.append("return False")
+    source = snapshot + "def is_changed(obj):\n" + "\n".join("    " + line for line in body)
+    code = compile(source, "<objectbox %s change tracking>" % entity.name, "exec")
+    exec(code, ns)
+    return ns["snapshot"], ns["is_changed"]
+
+
+def compile_patch(entity, props: list):
+    """Generates `patch(data, values) -> bytes`, returning a copy of the given FlatBuffers data with the given
+    properties set to the values (a tuple in the order of props).
+    Scalars present in the table are overwritten in place (fixed width, so the layout doesn't change); otherwise,
+    e.g. for strings or vectors, the object is decoded, changed and encoded again."""
+    ns = base_namespace()
+    ns["_unmarshal"] = entity.unmarshal
+    ns["_marshal"] = entity.marshal
+    index = {prop: i for i, prop in enumerate(entity.properties)}
+    body = []
+    if not any(prop in entity.offset_properties for prop in props):
+        body.extend([
+            "pos = _uoffset(data, 0)[0]",
+            "vt = pos - _soffset(data, pos)[0]",
+            "vt_size = _voffset(data, vt)[0]",
+        ])
+        for prop in props:
+            body.append("o%d = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (
+                index[prop], prop._fb_v_offset, prop._fb_v_offset))
+        body.append("if %s:" % " and ".join("o%d" % index[prop] for prop in props))
+        body.append("    buf = bytearray(data)")
+        for k, prop in enumerate(props):
+            i = index[prop]
+            ns["_PK%d" % i] = prop._fb_type.packer_type.pack_into
+            body.append("    v = values[%d]" % k)
+            if prop._ob_type in _date_scales:
+                if prop._py_type == datetime:
+                    body.append("    v = _floor(v.timestamp() * %d)" % _date_scales[prop._ob_type])
+                else:
+                    body.append("    v = _floor(v)")
+            body.append("    _PK%d(buf, pos + o%d, v)" % (i, i))
+        body.append("    return buf")
+
+    # fallback: a full decode/encode round trip
+    body.append("obj = _unmarshal(data)")
+    for k, prop in enumerate(props):
+        body.append("obj.%s = values[%d]" % (prop._name, k))
+    body.append("return _marshal(obj, obj.%s)" % entity.id_property._name)
+    source = "def patch(data, values):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "patch", entity)
+
+
+def _copy_vector(value):
+    """Copies a (mutable) vector property value; vector elements are scalars, so a shallow copy suffices"""
+    if isinstance(value, np.ndarray):
+        return value.copy() if value.flags.writeable else value
+    return list(value) if isinstance(value, list) else value
+
+
+def compile_copy(entity):
+    """Generates `copy(obj) -> object`, copying an object (e.g. one read by unmarshal) so that the copy doesn't share
+    mutable property values (lists, writable arrays, flex) with the original. The change tracking snapshot is carried
+    over, pointing to the copied values."""
+    ns = base_namespace()
+    ns["_cls"] = entity.cls
+    ns["_copy_vector"] = _copy_vector
+    ns["_deepcopy"] = copy.deepcopy
+    body = [
+        "new = _cls.__new__(_cls)",
+        "d = new.__dict__",
+        "d.update(obj.__dict__)",
+    ]
+    mutable = [(i, prop) for i, prop in enumerate(entity.properties) if _is_mutable(prop)]
+    if mutable:
+        body.append("loaded = d.get('_ob_loaded')")
+        body.append("values = list(loaded[1]) if loaded is not None else None")
+    for i, prop in mutable:
+        body.append("v = d.get(%r)" % prop._name)
+        body.append("if v is not None:")
+        if prop._ob_type == OBXPropertyType_Flex:
+            body.append("    c = _deepcopy(v)")
+        else:
+            body.append("    c = _copy_vector(v)")
+        body.append("    d[%r] = c" % prop._name)
+        body.append("    if values is not None and values[%d] is v: values[%d] = c" % (i, i))
+    if mutable:
+        body.append("if values is not None: d['_ob_loaded'] = (loaded[0], tuple(values))")
+    body.append("return new")
+    source = "def copy(obj):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "copy", entity)
+
+
+def compile_projection(entity, props: list, into=None):
+    """Generates `project(data)` decoding only the given properties. The result is a lazy entity object (see
+    compile_unmarshal_lazy()) with those properties decoded right away (into=None), a tuple of the values (into=tuple)
+    or a dict {name: value} (into=dict). As other properties are still decoded on access, putting the object back
+    doesn't lose any data."""
+    if into not in (None, tuple, dict):
+        raise Exception("Unsupported projection type %s, expecting None (entity objects), tuple or dict" % into)
+
+    ns = base_namespace()
+    ns["_lazy"] = entity.unmarshal_lazy
+    index = {prop: i for i, prop in enumerate(entity.properties)}
+    body = [
+        "pos = _uoffset(data, 0)[0]",
+        "vt = pos - _soffset(data, pos)[0]",
+        "vt_size = _voffset(data, vt)[0]",
+    ]
+    if into is None:
+        body.append("obj = _lazy(data)")
+    for prop in props:
+        i = index[prop]
+        target = "obj." + prop._name if into is None else "v%d" % i
+        body.append("o = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (prop._fb_v_offset, prop._fb_v_offset))
+        body.append("if o:")
+        body.extend("    " + line for line in decode_lines(prop, ns, i, target))
+        body.append("else:")
+        body.append("    %s = %s" % (target, _default_expr(prop, ns, i)))
+
+    if into is None:
+        body.append("return obj")
+    elif into is tuple:
+        body.append("return (%s,)" % ", ".join("v%d" % index[prop] for prop in props))
+    else:
+        body.append("return {%s}" % ", ".join("%r: v%d" % (prop._name, index[prop]) for prop in props))
+    source = "def project(data):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "project", entity)
+
+
+def compile_decoders(entity) -> dict:
+    """Generates a `decode(data, pos, vt, vt_size)` function per property, reading just that property.
+    `pos` is the table position, `vt` the vtable position and `vt_size` the vtable size, see read_table()."""
+    ns = base_namespace()
+    lines = []
+    for i, prop in enumerate(entity.properties):
+        lines.append("def decode_%d(data, pos, vt, vt_size):" % i)
+        lines.append("    o = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (prop._fb_v_offset, prop._fb_v_offset))
+        lines.append("    if o:")
+        lines.extend("        " + line for line in decode_lines(prop, ns, i, "val"))
+        lines.append("        return val")
+        lines.append("    return %s" % _default_expr(prop, ns, i))
+    code = compile("\n".join(lines), "<objectbox %s decoders>" % entity.name, "exec")
+    exec(code, ns)
+    return {prop._name: ns["decode_%d" % i] for i, prop in enumerate(entity.properties)}
+
+
+def read_table(data) -> tuple:
+    """Returns (data, table position, vtable position, vtable size) of the root table in the given FlatBuffers data."""
+    pos = _uoffset(data, 0)[0]
+    vt = pos - _soffset(data, pos)[0]
+    return data, pos, vt, _voffset(data, vt)[0]
+
+
+class _LazyProperty:
+    """Non-data descriptor decoding a property on first access; the value is then cached in the instance __dict__,
+    which takes precedence over this descriptor for all further reads (and writes)."""
+
+    __slots__ = "_property", "_name", "_decode"
+
+    def __init__(self, prop, decode):
+        self._property = prop
+        self._name = prop._name
+        self._decode = decode
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self._property
+        val = self._decode(*obj.__dict__["_ob_lazy"])
+        obj.__dict__[self._name] = val
+        return val
+
+
+def compile_unmarshal_lazy(entity, decoders: dict):
+    """Generates `unmarshal_lazy(data) -> object`, returning a proxy (an instance of a generated subclass of the
+    entity class) that keeps the FlatBuffers data and decodes each property only when it's first accessed."""
+    attrs = {name: _LazyProperty(prop, decoders[name]) for name, prop in
+             ((prop._name, prop) for prop in entity.properties)}
+    attrs["__module__"] = entity.cls.__module__
+    attrs["__qualname__"] = entity.cls.__qualname__
+    proxy_cls = type(entity.cls.__name__, (entity.cls,), attrs)
+
+    names = tuple(prop._name for prop in entity.properties)
+
+    def unmarshal_lazy(data):
+        obj = proxy_cls()
+        state = obj.__dict__
+        if state:
+            # values assigned by the constructor would hide the lazily decoded ones
+            for name in names:
+                state.pop(name, None)
+        state["_ob_lazy"] = read_table(data)
+        return obj
+
+    return unmarshal_lazy
+
+
+def column_dtype(prop):
+    """numpy dtype of a column containing the values of the given (scalar) property"""
+    if prop._ob_type == OBXPropertyType_Date:
+        return np.dtype("datetime64[ms]")
+    elif prop._ob_type == OBXPropertyType_DateNano:
+        return np.dtype("datetime64[ns]")
+    return flatbuffers.number_types.to_numpy_type(prop._fb_type)
+
+
+def compile_column_reader(entity, props: list):
+    """Generates `read_columns(records) -> tuple of lists`, collecting the raw values of the given properties.
+    Unlike unmarshal, values are not converted to the Python property type (e.g. dates stay integers, vectors stay
+    numpy arrays) as they are converted to numpy columns afterwards, see to_columns()."""
+    ns = base_namespace()
+    index = {prop: i for i, prop in enumerate(entity.properties)}
+    body = []
+    for prop in props:
+        i = index[prop]
+        body.append("c%d = []" % i)
+        body.append("a%d = c%d.append" % (i, i))
+    body.append("for data in records:")
+    loop = [
+        "pos = _uoffset(data, 0)[0]",
+        "vt = pos - _soffset(data, pos)[0]",
+        "vt_size = _voffset(data, vt)[0]",
+    ]
+    for prop in props:
+        i = index[prop]
+        raw = _raw_property(prop)
+        loop.append("o = _voffset(data, vt + %d)[0] if %d < vt_size else 0" % (prop._fb_v_offset, prop._fb_v_offset))
+        loop.append("if o:")
+        loop.extend("    " + line for line in decode_lines(raw, ns, i, "v"))
+        loop.append("    a%d(v)" % i)
+        loop.append("else:")
+        if prop in entity.offset_properties:
+            loop.append("    a%d(%s)" % (i, _default_expr(raw, ns, i)))
+        else:
+            loop.append("    a%d(0)" % i)
+    body.extend("    " + line for line in loop)
+    body.append("return (%s,)" % ", ".join("c%d" % index[prop] for prop in props))
+    source = "def read_columns(records):\n" + "\n".join("    " + line for line in body)
+    return compile_source(source, ns, "read_columns", entity)
+
+
+class _RawProperty:
+    """Property stand-in for decode_lines(), reading the stored representation instead of the Python type."""
+
+    def __init__(self, prop, py_type):
+        self._ob_type = prop._ob_type
+        self._fb_type = prop._fb_type
+        self._py_type = py_type
+
+
+def _raw_property(prop):
+    if prop._ob_type in _vector_dtypes:
+        return _RawProperty(prop, np.ndarray)
+    elif prop._ob_type in _date_scales:
+        return _RawProperty(prop, int)
+    return prop
+
+
+def _object_column(values: list):
+    # assigned one by one, numpy would otherwise try to interpret nested sequences as additional dimensions
+    column = np.empty(len(values), dtype=object)
+    for i in range(len(values)):
+        column[i] = values[i]
+    return column
+
+
+def to_columns(props: list, lists: tuple, string_dtype=object) -> dict:
+    """Converts the lists collected by a column reader into numpy arrays, keyed by property name."""
+    result = dict()
+    for prop, values in zip(props, lists):
+        ob_type = prop._ob_type
+        if ob_type in _vector_dtypes:
+            dtype = flatbuffers.number_types.to_numpy_type(_vector_dtypes[ob_type][1])
+            if len(values) == 0:
+                column = np.empty((0, 0), dtype=dtype)
+            elif all(len(v) == len(values[0]) for v in values):
+                column = np.stack(values)  # equal lengths: a 2D array
+            else:
+                column = _object_column(values)
+        elif ob_type == OBXPropertyType_String:
+            column = np.array(values, dtype=string_dtype)
+        elif ob_type in (OBXPropertyType_ByteVector, OBXPropertyType_Flex):
+            column = _object_column(values)
+        else:
+            column = np.array(values, dtype=column_dtype(prop))
+        result[prop._name] = column
+    return result
+
+
+def date_column_as_int(prop, column: np.ndarray) -> np.ndarray:
+    """Converts a column given for a date property (datetime64 or a number of ms/ns) to the stored int64 values"""
+    if column.dtype.kind == "M":
+        return column.astype(column_dtype(prop)).astype(np.int64)
+    elif column.dtype.kind == "f":
+        return np.floor(column).astype(np.int64)
+    return column
+
+
+def pack_columns(entity, props: list, columns: list, ids: np.ndarray) -> np.ndarray:
+    """Encodes objects given as columns of scalar properties (the ID excluded) all at once. Each row starts as the
+    data of an object with all defaults, as written by entity.marshal() with the layout of struct_layout(), and the
+    given columns are written into their fields, i.e. rows are the same as marshal() of the objects would give.
+    Returns a 2D uint8 array with one (8-byte aligned) row per object."""
+    fmt, header, table_pos, offsets = struct_layout(entity, entity.properties)
+    template = np.frombuffer(bytes(entity.marshal(entity.cls.__new__(entity.cls), 0)), dtype=np.uint8)
+    names = []
+    formats = []
+    positions = []
+    for prop in [entity.id_property] + props:
+        names.append(prop._name)
+        formats.append(prop._fb_type.packer_type.format)
+        positions.append(table_pos + offsets[prop])
+    dtype = np.dtype({"names": names, "formats": formats, "offsets": positions, "itemsize": len(template)})
+
+    rows = np.empty((len(ids), len(template)), dtype=np.uint8)
+    rows[:] = template
+    records = rows.view(dtype).reshape(len(ids))
+    records[entity.id_property._name] = ids
+    for prop, column in zip(props, columns):
+        if prop._ob_type in _date_scales:
+            column = date_column_as_int(prop, column)
+        records[prop._name] = column
+    return rows
+
+
+def marshal_columns(entity, marshal, props: list, columns: list, ids: np.ndarray) -> list:
+    """Encodes objects given as columns (of any property types) one by one, using a marshal function compiled with
+    raw_dates. A single object is reused to pass the values of each row; properties without a column get their
+    default."""
+    row = entity.cls.__new__(entity.cls)
+    state = row.__dict__
+    names = [prop._name for prop in props]
+    values = []
+    for prop, column in zip(props, columns):
+        if prop._ob_type in _date_scales:
+            column = date_column_as_int(prop, column)
+        # native Python values are faster to marshal; vector rows stay numpy arrays
+        values.append(column.tolist() if column.ndim == 1 and column.dtype != object else list(column))
+
+    result = []
+    ids = ids.tolist()
+    for i in range(len(ids)):
+        for name, column in zip(names, values):
+            state[name] = column[i]
+        result.append(bytes(marshal(row, ids[i])))
+    return result
@@ -21,6 +21,7 @@ from math import floor
 from datetime import datetime
 from objectbox.c import *
 from objectbox.model.properties import Property
+import objectbox.model.codec as codec
 
 
 # _Entity class holds model information as well as conversions between python objects and FlatBuffers (ObjectBox data)
@@ -43,11 +44,100 @@ class _Entity(object):
         self.properties = list()  # List[Property]
         self.offset_properties = list()  # List[Property]
         self.id_property = None
+        self.decoders = dict()  # property name -> decode function, see compile()
+        self._compiled = dict()  # generated functions used by bulk operations, created on first use
         self.fill_properties()
 
     def __call__(self, *args):
         return self.cls(*args)
 
+    def compile(self):
+        """Replaces the generic marshal/unmarshal with functions specialized for this entity's properties and
+        generates the per-property decoders used by lazy reads as well as the change tracking used by
+        Box.put(skip_unchanged=True). Called by Model.entity() once last_property_id is known.
+        Objects are written without the FlatBuffers Builder, see codec.compile_struct_marshal()."""
+        self.marshal = codec.compile_struct_marshal(self)
+        self.decoders = codec.compile_decoders(self)
+        self.unmarshal_lazy = codec.compile_unmarshal_lazy(self, self.decoders)
+        self.unmarshal = codec.compile_unmarshal(self)
+        self.unmarshal_tracked = codec.compile_unmarshal(self, track=True)
+        self.snapshot, self.is_changed = codec.compile_change_tracking(self)
+        self.copy = codec.compile_copy(self)
+
+    def get_properties(self, props) -> list:
+        """Resolves the given properties (Property objects or names) of this entity; None stands for all properties"""
+        if props is None:
+            return list(self.properties)
+        by_name = {prop._name: prop for prop in self.properties}
+        result = []
+        for prop in props:
+            name = prop if isinstance(prop, str) else prop._name
+            if name not in by_name or (not isinstance(prop, str) and by_name[name] is not prop):
+                raise Exception("Property '%s' does not belong to entity %s" % (name, self.name))
+            result.append(by_name[name])
+        return result
+
+    def columns(self, records: list, props=None, string_dtype=object) -> dict:
+        """Reads the given properties of all records (FlatBuffers data) into numpy arrays, keyed by property name.
+        Scalars become arrays of the matching numpy type, dates datetime64 arrays, strings arrays of string_dtype
+        (e.g. object or str for fixed-width) and vectors 2D arrays if all have the same length (object arrays
+        otherwise)."""
+        props = self.get_properties(props)
+        key = ("columns",) + tuple(prop._name for prop in props)
+        reader = self._compiled.get(key)
+        if reader is None:
+            reader = codec.compile_column_reader(self, props)
+            self._compiled[key] = reader
+        return codec.to_columns(props, reader(records), string_dtype)
+
+    def projection(self, fields=None, into=None):
+        """Returns a function decoding only the given properties (default: all) of FlatBuffers data, into an entity
+        object decoding the other properties lazily (into=None), a tuple (into=tuple) or a dict (into=dict). See
+        codec.compile_projection()."""
+        props = self.get_properties(fields)
+        key = ("projection", into) + tuple(prop._name for prop in props)
+        project = self._compiled.get(key)
+        if project is None:
+            project = codec.compile_projection(self, props, into)
+            self._compiled[key] = project
+        return project
+
+    def patcher(self, fields: dict):
+        """Returns a function `patch(data) -> bytes` setting the given properties {property (or its name): value} in
+        FlatBuffers data, see codec.compile_patch()."""
+        props = self.get_properties(list(fields.keys()))
+        if self.id_property in props:
+            raise Exception("The ID property can't be updated")
+        key = ("patch",) + tuple(prop._name for prop in props)
+        patch = self._compiled.get(key)
+        if patch is None:
+            patch = codec.compile_patch(self, props)
+            self._compiled[key] = patch
+        values = tuple(fields.values())
+        return lambda data: patch(data, values)
+
+    def columns_dtype(self, props=None) -> np.dtype:
+        """numpy structured dtype with a field per given property (default: all), as accepted by Box.put_columns().
+        Strings, vectors and flex properties are object fields."""
+        props = self.get_properties(props)
+        return np.dtype([(prop._name, codec.column_dtype(prop) if prop not in self.offset_properties else object)
+                         for prop in props])
+
+    def encode_columns(self, columns: dict, ids: np.ndarray):
+        """Encodes objects given as {property name: column} (ID excluded).
+        If all given properties are scalars, all objects are encoded at once with a fixed layout, returning a 2D uint8
+        array with one object per row. Otherwise, objects are encoded one by one, returning a list of bytes."""
+        props = self.get_properties(columns.keys())
+        arrays = [np.asarray(columns[prop._name]) for prop in props]
+        if not any(prop in self.offset_properties for prop in props):
+            return codec.pack_columns(self, props, arrays, ids)
+
+        marshal = self._compiled.get(("marshal_raw_dates",))
+        if marshal is None:
+            marshal = codec.compile_struct_marshal(self, raw_dates=True)
+            self._compiled[("marshal_raw_dates",)] = marshal
+        return codec.marshal_columns(self, marshal, props, arrays, ids)
+
     def fill_properties(self):
         # TODO allow subclassing and support entities with __slots__ defined
         variables = dict(vars(self.cls))
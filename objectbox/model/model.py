@@ -17,6 +17,7 @@ from objectbox.model.entity import _Entity
 from objectbox.model.properties import Property
 from objectbox.c import *
 import json
+import random
 
 
 class IdUid:
@@ -38,6 +39,8 @@ class Model:
         self.last_index_id = IdUid(0, 0)
         self.last_relation_id = IdUid(0, 0)
         self.entity_classes = dict()
+        self._index_ids = dict()  # Property => IdUid of its index in this model, see _add_index()
+        self._uids = set()  # all UIDs used in this model, see _generate_uid()
 
     def entity(self, entity: _Entity, last_property_id: IdUid):
         if not isinstance(entity, _Entity):
@@ -47,18 +50,52 @@ class Model:
             )
 
         entity.last_property_id = last_property_id
+        entity.compile()
 
         obx_model_entity(self._c_model, c_str(entity.name), entity.id, entity.uid)
+        self._uids.add(entity.uid)
+        self._uids.update(prop._uid for prop in entity.properties)
+        self._uids.update(prop._index_uid for prop in entity.properties if prop._index_uid)
 
         for v in entity.properties:
             obx_model_property(self._c_model, c_str(v._name), v._ob_type, v._id, v._uid)
             if v._flags != 0:
                 obx_model_property_flags(self._c_model, v._flags)
+            if v._index:
+                self._add_index(v)
 
         obx_model_entity_last_property_id(
             self._c_model, last_property_id.id, last_property_id.uid
         )
         self.entity_classes[entity.name] = entity.cls
+        self._entities.append(entity)
+
+    def _add_index(self, prop: Property):
+        """Registers the index of the current property, assigning the next index ID and a generated UID if they were
+        not given; last_index_id is raised to the highest index ID.
+        Assigned IDs are kept by the model, not on the Property, which is shared by all models using its entity.
+        As they depend on the order indexes are added in, stores created with assigned IDs may not open anymore once
+        an index is added before others; index_id/index_uid must be given to keep existing stores compatible."""
+        index_id = IdUid(prop._index_id or self.last_index_id.id + 1, prop._index_uid or self._generate_uid(prop._uid))
+        self._uids.add(index_id.uid)
+        self._index_ids[prop] = index_id
+        obx_model_property_index_id(self._c_model, index_id.id, index_id.uid)
+        if index_id.id >= self.last_index_id.id:
+            self.last_index_id = index_id
+
+    def _generate_uid(self, seed: int) -> int:
+        """Returns a random UID (a positive 63-bit number, like the UIDs generated by ObjectBox' model tools) that is
+        not used in this model yet. The generator is seeded, e.g. with the property's UID, so that the same model
+        gets the same UIDs each time it's created."""
+        generator = random.Random(seed)
+        while True:
+            uid = generator.getrandbits(63)
+            if uid != 0 and uid not in self._uids:
+                return uid
+
+    def index_id(self, prop: Property) -> IdUid:
+        """The ID/UID of the index of the given property in this model (given explicitly or assigned)"""
+        return self._index_ids[prop]
 
     def get_classes(self, expand: bool = False):
         class_names = list(self.entity_classes.keys())
@@ -87,7 +87,15 @@ class Property:
         type: PropertyType = None,
         index: bool = None,
         index_type: IndexType = None,
+        unique: bool = False,
+        index_id: int = 0,
+        index_uid: int = 0,
     ):
+        """index/index_type: creates an index in the store, by default a value index, or a hash index for strings.
+        unique: rejects puts of objects with a value already used by another object (implies an index).
+        index_id/index_uid: the ID/UID of the index in the model; if not given, Model.entity() assigns them
+        (IDs in the order entities and properties are added, UIDs generated, see Model._add_index()). Assigned IDs
+        change when an index is added before others, so give them explicitly to keep existing stores compatible."""
         self._id = id
         self._uid = uid
         self._name = ""  # set in Entity.fill_properties()
@@ -97,13 +105,18 @@ class Property:
         self._fb_type = fb_type_map[self._ob_type]
 
         self._is_id = isinstance(self, Id)
-        self._flags = property_flags if property_flags != None else OBXPropertyFlags(0)
+        self._flags = property_flags if property_flags != None else 0
         self.__set_flags()
 
         # FlatBuffers marshalling information
         self._fb_slot = self._id - 1
         self._fb_v_offset = 4 + 2 * self._fb_slot
 
+        if unique and index == False:
+            raise Exception(f"unique property with id {self._id} requires an index, but index is set to False")
+        if unique and index == None:
+            index = True
+
         if index_type:
             if index == True or index == None:
                 self._index = True
@@ -119,6 +132,24 @@ class Property:
                     IndexType.value if self._py_type != str else IndexType.hash
                 )
 
+        self._unique = unique
+        self._index_id = index_id  # if not given, the Model assigns index IDs/UIDs, see Model.index_id()
+        self._index_uid = index_uid
+        if self._index:
+            self.__check_index()
+            self._flags |= self._index_type
+            if unique:
+                self._flags |= OBXPropertyFlags_UNIQUE
+
+    def __check_index(self):
+        # mirrors the checks of the core, which would reject the model when opening the store
+        if self._ob_type in (OBXPropertyType_Flex, OBXPropertyType_BoolVector, OBXPropertyType_ByteVector,
+                             OBXPropertyType_ShortVector, OBXPropertyType_CharVector, OBXPropertyType_IntVector,
+                             OBXPropertyType_LongVector, OBXPropertyType_FloatVector, OBXPropertyType_DoubleVector):
+            raise Exception(f"property with id {self._id}: indexes on vectors and flex properties are not supported")
+        if self._index_type != IndexType.value and self._ob_type != OBXPropertyType_String:
+            raise Exception(f"property with id {self._id}: only strings can have a hash index, use IndexType.value")
+
     def __determine_ob_type(self) -> OBXPropertyType:
         ts = self._py_type
         if ts == str:
@@ -145,7 +176,7 @@ class Property:
     def op(
         self, op: _ConditionOp, value, case_sensitive: bool = True
     ) -> QueryCondition:
-        return QueryCondition(self._id, op, value, case_sensitive)
+        return QueryCondition(self._id, op, value, case_sensitive=case_sensitive, property_type=self._ob_type)
 
     def equals(self, value, case_sensitive: bool = True) -> QueryCondition:
         return self.op(_ConditionOp.eq, value, case_sensitive)
@@ -175,7 +206,16 @@ class Property:
         return self.op(_ConditionOp.lessOrEq, value, case_sensitive)
 
     def between(self, value_a, value_b) -> QueryCondition:
-        return QueryCondition(self._id, _ConditionOp.between, value_a, value_b)
+        return QueryCondition(self._id, _ConditionOp.between, value_a, value_b, property_type=self._ob_type)
+
+    def is_in(self, values, case_sensitive: bool = True) -> QueryCondition:
+        """Matches one of the given values: strings, or integers (also dates) given as a numpy array, which is passed
+        to the core without copying if it has the matching dtype, or any other iterable"""
+        return self.op(_ConditionOp.in_, values, case_sensitive)
+
+    def not_in(self, values) -> QueryCondition:
+        """Matches none of the given integer values, see is_in()"""
+        return self.op(_ConditionOp.notIn, values)
 
 
 # ID property (primary key)
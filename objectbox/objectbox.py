@@ -15,22 +15,102 @@
 
 from objectbox.c import *
 import objectbox.transaction
+from objectbox.cache import QueryCache
+from objectbox.observer import Observer, _Dispatcher
+import threading
+import weakref
 
 
 class ObjectBox:
-    def __init__(self, c_store: OBX_store_p):
+    def __init__(self, c_store: OBX_store_p, max_readers: int = 0, query_cache_size: int = 0, model=None,
+                 directory: str = ""):
         self._c_store = c_store
+        self._model = model  # the model and directory are used to open the store in other processes, see parallel.py
+        self._directory = directory
+        self._max_readers = max_readers or 126  # the core's default
+        self._aio = None  # threads used by objectbox.aio, created on first use
+        self._tx_local = threading.local()  # the current transaction of each thread, see objectbox.transaction
+        self._caches = {}  # entity ID => WeakSet of the ObjectCaches of the Boxes of that entity
+        self._observers = set()  # open Observers, closed with the store
+        self._cached_queries = weakref.WeakSet()  # the _CachedQueries of all Boxes and threads, see Box.cached_query()
+        self._observer_dispatcher = None  # created on first use
+        self._dispatcher_lock = threading.Lock()
+        self._query_cache = None
+        self._c_query_cache_observer = None
+        if query_cache_size > 0:
+            self._query_cache = QueryCache(query_cache_size)
+            self._observe_for_query_cache()
+
+    def _observe_for_query_cache(self):
+        cache = self._query_cache  # not self: the callback must not keep the ObjectBox alive
+
+        def on_change(type_ids, count, user_data):
+            cache.invalidate(type_ids[:count])
+
+        self._query_cache_observer_fn = obx_observer(on_change)  # must stay referenced while the observer is open
+        self._c_query_cache_observer = obx_observe(self._c_store, self._query_cache_observer_fn, None)
+
+    @property
+    def query_cache(self) -> QueryCache:
+        """The cache of query results providing hit/miss statistics; None if the store was built without one"""
+        return self._query_cache
 
     def __del__(self):
         self.close()
 
+    def observe(self, entities, callback, loop=None) -> Observer:
+        """Calls callback(changed) after each commit that changed objects of the given entity types (an entity class
+        or a list of them), where changed is the list of those types changed by the commit. Callbacks run on a
+        dispatcher thread of the store, one at a time in commit order; or, if an asyncio loop is given, in the loop
+        (coroutine functions are scheduled as tasks). Returns the Observer, close() it to unsubscribe."""
+        if not isinstance(entities, (list, tuple)):
+            entities = [entities]
+        observer = Observer(self, entities, callback, loop)
+        self._observers.add(observer)
+        return observer
+
+    def _dispatcher(self) -> _Dispatcher:
+        with self._dispatcher_lock:
+            if self._observer_dispatcher is None:
+                self._observer_dispatcher = _Dispatcher()
+            return self._observer_dispatcher
+
     def read_tx(self):
+        """Context manager for a read transaction, yielding the Transaction; reuses the thread's current one, if any"""
         return objectbox.transaction.read(self)
 
     def write_tx(self):
+        """Context manager for a write transaction, yielding the Transaction; nested write_tx() calls on the same thread
+        join the outer transaction, which is committed once the outermost block completes"""
         return objectbox.transaction.write(self)
 
+    def current_tx(self) -> 'objectbox.transaction.Transaction':
+        """The transaction active on the current thread, or None"""
+        return objectbox.transaction.current(self)
+
     def close(self):
+        aio_to_shutdown = self._aio
+        if aio_to_shutdown:
+            self._aio = None
+            aio_to_shutdown.shutdown()
+
+        for observer in list(self._observers):
+            observer.close()
+        dispatcher_to_shutdown = self._observer_dispatcher
+        if dispatcher_to_shutdown:
+            self._observer_dispatcher = None
+            dispatcher_to_shutdown.shutdown()
+
+        for cached in list(self._cached_queries):
+            for query in cached.queries.values():
+                query.close()
+            cached.queries.clear()
+
+        c_observer_to_close = self._c_query_cache_observer
+        if c_observer_to_close:
+            self._c_query_cache_observer = None
+            obx_observer_close(c_observer_to_close)
+
         c_store_to_close = self._c_store
         if c_store_to_close:
             self._c_store = None
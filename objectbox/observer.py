@@ -0,0 +1,102 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import queue
+import threading
+import traceback
+
+from objectbox.c import *
+
+
+class Observer:
+    """A subscription to data changes, see ObjectBox.observe(); close() it (or leave the `with` block) to unsubscribe.
+    The core notifies observers after each commit with the entity types it changed, on the committing thread; this
+    only queues the notification, the callback runs on the store's dispatcher thread or in the given event loop."""
+
+    def __init__(self, ob: 'ObjectBox', entities: list, callback, loop: asyncio.AbstractEventLoop = None):
+        self._ob = ob
+        self._entities = {entity.id: entity for entity in entities}
+        self._callback = callback
+        self._loop = loop
+        self._closed = False
+        self._c_fn = obx_observer(self._on_change)  # must stay referenced while the native observer is open
+        self._c_observer = obx_observe(ob._c_store, self._c_fn, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Unsubscribes; the callback isn't called anymore after this returns (unless it's already running)"""
+        self._closed = True
+        c_observer_to_close = self._c_observer
+        if c_observer_to_close:
+            self._c_observer = None
+            obx_observer_close(c_observer_to_close)
+            self._ob._observers.discard(self)
+
+    def _on_change(self, type_ids, count, user_data):
+        # native thread: must not raise and should return quickly
+        entities = [self._entities[id] for id in type_ids[:count] if id in self._entities]
+        if not entities or self._closed:
+            return
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._deliver_in_loop, entities)
+            except RuntimeError:  # the loop is closed
+                pass
+        else:
+            self._ob._dispatcher().submit(self._deliver, entities)
+
+    def _deliver(self, entities: list):
+        if not self._closed:
+            self._callback(entities)
+
+    def _deliver_in_loop(self, entities: list):
+        if not self._closed:
+            result = self._callback(entities)
+            if asyncio.iscoroutine(result):
+                self._loop.create_task(result)
+
+
+class _Dispatcher:
+    """A thread calling the observer callbacks of a store one after another, in commit order"""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="objectbox-observers", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        self._queue.put((fn, args))
+
+    def shutdown(self):
+        """Stops the thread after the queued callbacks have run"""
+        self._queue.put(None)
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            fn, args = item
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()  # an exception in a callback must not stop other observers
@@ -0,0 +1,121 @@
+# Copyright 2019-2023 ObjectBox Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Box.parallel_map() and Query.parallel_map(): objects are split into partitions (ID ranges or lists of IDs), each
+# processed in a worker process which opens the same store directory (once per process) and reads only its partition.
+# Worker processes are started with "spawn": entity classes and the mapped functions must be importable by name
+# (defined at module level), and results are pickled.
+
+import functools
+import importlib
+import multiprocessing
+import os
+import numpy as np
+
+from objectbox.model import IdUid, Model
+
+_store = None  # the store opened by a worker process, see _open_store()
+
+
+def _entity_ref(entity) -> tuple:
+    module = importlib.import_module(entity.cls.__module__)
+    if getattr(module, entity.cls.__qualname__, None) is not entity:
+        raise Exception("Entity %s must be defined at module level to be used by parallel_map()" % entity.name)
+    return entity.cls.__module__, entity.cls.__qualname__
+
+
+def _resolve_entity(ref: tuple):
+    module, name = ref
+    return getattr(importlib.import_module(module), name)
+
+
+def _store_spec(ob) -> tuple:
+    """A picklable description of how to open the given store again: its directory and model"""
+    model = ob._model
+    directory = ob._directory
+    if model is None:
+        raise Exception("The store wasn't created by a Builder with a model")
+    if directory.startswith("memory:"):
+        raise Exception("In-memory stores can't be used by other processes")
+    entities = [(_entity_ref(entity), (entity.last_property_id.id, entity.last_property_id.uid))
+                for entity in model._entities]
+    last_ids = [(id.id, id.uid) for id in (model.last_entity_id, model.last_index_id, model.last_relation_id)]
+    return os.path.abspath(directory or "objectbox"), entities, last_ids, ob._max_readers
+
+
+def _open_store(spec: tuple):
+    """Initializer of the worker processes"""
+    global _store
+    from objectbox.builder import Builder
+    directory, entities, last_ids, max_readers = spec
+    model = Model()
+    for ref, last_property_id in entities:
+        model.entity(_resolve_entity(ref), last_property_id=IdUid(*last_property_id))
+    model.last_entity_id, model.last_index_id, model.last_relation_id = [IdUid(*id) for id in last_ids]
+    _store = Builder().model(model).directory(directory).max_readers(max_readers).build()
+
+
+def _map_partition(entity_ref: tuple, partition, fn, reduce):
+    from objectbox.box import Box
+    box = Box(_store, _resolve_entity(entity_ref))
+    if isinstance(partition, tuple):
+        start_id, end_id = partition
+        objects = box.iter(start_id=start_id, end_id=end_id)
+    else:
+        objects = box.get_many(partition, found_only=True)
+
+    if reduce is None:
+        return [fn(obj) for obj in objects]
+    # (whether the partition had objects, the reduced result)
+    results = map(fn, objects)
+    none = object()
+    first = next(results, none)
+    if first is none:
+        return False, None
+    return True, functools.reduce(reduce, results, first)
+
+
+def _id_ranges(ids: np.ndarray, partitions: int) -> list:
+    """Splits sorted IDs into up to the given number of (first ID, last ID) ranges of about the same size"""
+    if len(ids) == 0:
+        return []
+    bounds = np.linspace(0, len(ids), min(partitions, len(ids)) + 1).astype(np.int64)
+    return [(int(ids[start]), int(ids[end - 1])) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _id_chunks(ids: np.ndarray, partitions: int) -> list:
+    """Splits IDs into up to the given number of arrays of about the same size"""
+    return [chunk for chunk in np.array_split(ids, min(partitions, len(ids))) if len(chunk)] if len(ids) else []
+
+
+def parallel_map(ob, entity, partitions: list, fn, workers: int, reduce):
+    """Applies fn to the objects of all partitions in worker processes. Without reduce, returns an iterator over the
+    results in the order of the partitions, streamed as partitions complete. With reduce, each worker reduces its
+    partition and the partial results are reduced again, returning the result (None if there are no objects)."""
+    spec = _store_spec(ob)
+    task = functools.partial(_map_partition, _entity_ref(entity), fn=fn, reduce=reduce)
+    workers = max(1, min(workers or os.cpu_count(), len(partitions)))
+
+    def results():
+        if not partitions:
+            return
+        with multiprocessing.get_context("spawn").Pool(workers, _open_store, (spec,)) as pool:
+            for partial in pool.imap(task, partitions):
+                yield partial
+
+    if reduce is None:
+        return (result for partial in results() for result in partial)
+
+    partials = [partial for found, partial in results() if found]
+    return functools.reduce(reduce, partials) if partials else None
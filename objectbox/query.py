@@ -13,35 +13,153 @@
 # limitations under the License.
 
 from objectbox.c import *
+import objectbox.model.codec as codec
+import objectbox.parallel as parallel
+import numpy as np
+import os
 
 
 class Query:
-    def __init__(self, c_query, box: 'Box'):
+    def __init__(self, c_query, box: 'Box', params: dict = None, key: tuple = None):
+        """key identifies what the query matches (entity, conditions and their values), so that queries built the same
+        way share results in the store's QueryCache; see QueryBuilder.build()"""
         self._c_query = c_query
         self._box = box
         self._ob = box._ob
+        self._params = params or {}  # alias => QueryCondition, see set()
+        self._param_values = {}  # alias => value set by set(), in a hashable form
+        self._offset = 0
+        self._limit = 0
+        self._key = key if key is not None else object()
+        self._cache_key = (self._key, 0, 0)  # with the offset, limit and parameter values, see _update_cache_key()
 
-    def find(self) -> list:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Frees the native query; it can't be used afterwards"""
+        c_query_to_close = self._c_query
+        if c_query_to_close:
+            self._c_query = None
+            obx_query_close(c_query_to_close)
+
+    def set(self, **params) -> 'Query':
+        """Changes the values of the conditions named with QueryCondition.alias(), e.g. query.set(user=42). For
+        between, pass a (value_a, value_b) tuple, for is_in/not_in the values. Returns the query."""
+        for alias, value in params.items():
+            condition = self._params.get(alias)
+            if condition is None:
+                raise Exception("Unknown query parameter '%s'" % alias)
+            self._param_values[alias] = condition._set_param(self._c_query, alias, value)
+        self._update_cache_key()
+        return self
+
+    def _update_cache_key(self):
+        self._cache_key = (self._key, self._offset, self._limit) + tuple(sorted(self._param_values.items()))
+
+    def _cached(self, key: tuple, compute, size):
+        """Returns the result cached for the given key, or computes it (and caches it unless inside a transaction,
+        which may see a different state than other threads). size() estimates the bytes used by a result."""
+        cache = self._ob._query_cache
+        if cache is None or self._ob.current_tx() is not None:
+            return compute()
+        key = self._cache_key + key
+        result = cache.get(key)
+        if result is None:
+            entity_id = self._box._entity.id
+            generation = cache.generation(entity_id)
+            result = compute()
+            cache.add(key, entity_id, result, size(result), generation)
+        return result
+
+    def find(self, lazy: bool = False, fields=None, into=None, track: bool = False) -> list:
+        """See Box.get() for the arguments. With a query cache (see Builder.query_cache_size()), the full objects
+        (no lazy/fields/into/track) are cached and copies are returned."""
+        if not lazy and fields is None and into is None and not track and self._ob._query_cache is not None:
+            copy = self._box._entity.copy
+            return [copy(obj) for obj in self._cached(("find",), self._find_objects, _objects_size)]
+        unmarshal = self._box._unmarshaller(lazy, fields, into, track)
+        return [unmarshal(data) for data in self._find_data()]
+
+    def _find_objects(self) -> tuple:
+        unmarshal = self._box._entity.unmarshal
+        return tuple(unmarshal(data) for data in self._find_data())
+
+    def find_columns(self, props=None, string_dtype=object) -> dict:
+        """Like find() but reads the given properties (default: all) into numpy arrays, keyed by the property name.
+        See Box.get_all_columns(). With a query cache, the arrays are shared between calls and read-only."""
+        if self._ob._query_cache is None:
+            return self._columns(props, string_dtype)
+        key = ("columns", None if props is None else tuple(props), string_dtype)
+        return dict(self._cached(key, lambda: _read_only(self._columns(props, string_dtype)), _columns_size))
+
+    def _columns(self, props, string_dtype) -> dict:
+        """Reads scalar and string columns with native property queries, filling the arrays in the core without
+        reading the objects' data into Python. Other properties (vectors, flex, ...), and all of them if an offset or
+        limit is set (not supported by property queries), are decoded from the objects' data, see _Entity.columns()."""
+        entity = self._box._entity
+        props = entity.get_properties(props)
+        native = [] if self._offset or self._limit else [prop for prop in props if _is_native_column(prop)]
+        others = [prop for prop in props if prop not in native]
+        columns = {}
+        with self._ob.read_tx():  # all columns must see the same objects
+            for prop in native:
+                values = PropertyQuery(self, prop)._run(lambda c_prop_query: _prop_values(c_prop_query, prop, True))
+                dtype = string_dtype if prop._ob_type == OBXPropertyType_String else codec.column_dtype(prop)
+                columns[prop._name] = values if values.dtype == dtype else values.astype(dtype)
+            if others:
+                columns.update(entity.columns(self._find_data(), others, string_dtype))
+        return {prop._name: columns[prop._name] for prop in props}
+
+    def _find_data(self) -> list:
         with self._ob.read_tx():
             # OBX_bytes_array*
             c_bytes_array_p = obx_query_find(self._c_query)
-
             try:
-                # OBX_bytes_array
-                c_bytes_array = c_bytes_array_p.contents
-
-                result = list()
-                for i in range(c_bytes_array.count):
-                    # OBX_bytes
-                    c_bytes = c_bytes_array.data[i]
-                    data = c_voidp_as_bytes(c_bytes.data, c_bytes.size)
-                    result.append(self._box._entity.unmarshal(data))
-
-                return result
+                return c_bytes_array_to_list(c_bytes_array_p)
             finally:
                 obx_bytes_array_free(c_bytes_array_p)
 
+    def update(self, **fields) -> int:
+        """Sets the given properties (by name) of all matching objects in a single transaction, without reading them
+        into Python objects (see Box.update()). Returns the number of updated objects."""
+        entity = self._box._entity
+        patch = entity.patcher(fields)
+        decode_id = entity.decoders[entity.id_property._name]
+        with self._ob.write_tx():
+            records = self._find_data()
+            if not records:
+                return 0
+            ids = np.fromiter((decode_id(*codec.read_table(data)) for data in records), dtype=np.uint64,
+                              count=len(records))
+            self._box._put_data([patch(data) for data in records], ids, OBXPutMode_UPDATE)
+            self._box._invalidate(ids.tolist())
+        return len(records)
+
+    def find_ids(self) -> np.ndarray:
+        """Returns the IDs of all matching objects as a numpy uint64 array"""
+        with self._ob.read_tx():
+            return c_id_array_to_numpy(obx_query_find_ids(self._c_query))
+
+    def parallel_map(self, fn, workers: int = 0, reduce=None, partitions: int = 0):
+        """Like Box.parallel_map() for the matching objects: their IDs are split into partitions, each read by a worker
+        process with a single get_many() call."""
+        workers = workers or os.cpu_count()
+        chunks = parallel._id_chunks(self.find_ids(), partitions or 4 * workers)
+        return parallel.parallel_map(self._ob, self._box._entity, chunks, fn, workers, reduce)
+
+    def property(self, prop) -> 'PropertyQuery':
+        """Returns a query for aggregates (min, max, sum, avg, count) and values of the given property (a Property or
+        its name) of the matching objects, computed in native code without reading the objects into Python"""
+        return PropertyQuery(self, self._box._entity.get_properties([prop])[0])
+
     def count(self) -> int:
+        return self._cached(("count",), self._count, lambda count: 64)
+
+    def _count(self) -> int:
         count = ctypes.c_uint64()
         obx_query_count(self._c_query, ctypes.byref(count))
         return int(count.value)
@@ -49,10 +167,169 @@ class Query:
     def remove(self) -> int:
         count = ctypes.c_uint64()
         obx_query_remove(self._c_query, ctypes.byref(count))
+        self._box._invalidate()
         return int(count.value)
     
     def offset(self, offset: int):
+        self._offset = offset
+        self._update_cache_key()
         return obx_query_offset(self._c_query, offset)
     
     def limit(self, limit: int):
-        return obx_query_limit(self._c_query, limit)
\ No newline at end of file
+        self._limit = limit
+        self._update_cache_key()
+        return obx_query_limit(self._c_query, limit)
+
+
+# property type => (native find function, array free function, numpy dtype); strings are handled separately
+_prop_find = {
+    OBXPropertyType_Bool: (obx_query_prop_find_int8s, obx_int8_array_free, np.int8),
+    OBXPropertyType_Byte: (obx_query_prop_find_int8s, obx_int8_array_free, np.int8),
+    OBXPropertyType_Short: (obx_query_prop_find_int16s, obx_int16_array_free, np.int16),
+    OBXPropertyType_Char: (obx_query_prop_find_int16s, obx_int16_array_free, np.int16),
+    OBXPropertyType_Int: (obx_query_prop_find_int32s, obx_int32_array_free, np.int32),
+    OBXPropertyType_Long: (obx_query_prop_find_int64s, obx_int64_array_free, np.int64),
+    OBXPropertyType_Date: (obx_query_prop_find_int64s, obx_int64_array_free, np.int64),
+    OBXPropertyType_DateNano: (obx_query_prop_find_int64s, obx_int64_array_free, np.int64),
+    OBXPropertyType_Relation: (obx_query_prop_find_int64s, obx_int64_array_free, np.int64),
+    OBXPropertyType_Float: (obx_query_prop_find_floats, obx_float_array_free, np.float32),
+    OBXPropertyType_Double: (obx_query_prop_find_doubles, obx_double_array_free, np.float64),
+}
+
+
+def _prop_values(c_prop_query, prop, fill_nulls: bool = False) -> np.ndarray:
+    """Reads the values of a native property query into a numpy array (of str objects for strings). Nulls are
+    skipped or, with fill_nulls, read as 0 (or "") so the values line up with the query results."""
+    if prop._ob_type == OBXPropertyType_String:
+        return c_string_array_to_numpy(obx_query_prop_find_strings(c_prop_query, b"" if fill_nulls else None))
+    find, free, dtype = _prop_find[prop._ob_type]
+    zero = np.zeros(1, dtype=dtype)
+    return c_array_to_numpy(find(c_prop_query, zero.ctypes.data_as(find.argtypes[1]) if fill_nulls else None), free,
+                            dtype)
+
+
+def _is_native_column(prop) -> bool:
+    """Whether the column of the property can be read by a native property query, see Query._columns()"""
+    if prop._ob_type == OBXPropertyType_String:
+        return True
+    # only if the core's representation matches the stored one (e.g. not for chars)
+    return prop._ob_type in _prop_find and np.dtype(_prop_find[prop._ob_type][2]).itemsize == prop._fb_type.bytewidth
+
+
+class PropertyQuery:
+    """Aggregates and values of a single property over the objects matching a query, see Query.property(). Objects
+    with a null value for the property are skipped. Integer properties (including dates, as stored) give int results,
+    floating point properties float results. Uses the query's current parameters and the query cache like
+    Query.count(); the query must not have an offset or limit, which the core doesn't support for property queries."""
+
+    def __init__(self, query: Query, prop):
+        self._query = query
+        self._prop = prop
+        type = prop._ob_type
+        self._is_int = type in _prop_find and type not in (OBXPropertyType_Float, OBXPropertyType_Double)
+
+    def _run(self, fn, distinct: bool = False, case_sensitive: bool = True):
+        """Calls fn with a native property query created for this call"""
+        if self._query._offset or self._query._limit:
+            raise Exception("Property queries don't support offset/limit; reset them with offset(0) and limit(0)")
+        c_prop_query = obx_query_prop(self._query._c_query, self._prop._id)
+        try:
+            if distinct:
+                if self._prop._ob_type == OBXPropertyType_String:
+                    obx_query_prop_distinct_case(c_prop_query, True, case_sensitive)
+                else:
+                    obx_query_prop_distinct(c_prop_query, True)
+            with self._query._ob.read_tx():
+                return fn(c_prop_query)
+        finally:
+            obx_query_prop_close(c_prop_query)
+
+    def _aggregate(self, name: str, c_fn, c_fn_int=None):
+        """Runs a native aggregate returning (result, count of non-null values); c_fn_int is the variant for integer
+        properties, if any"""
+        if self._prop._ob_type not in _prop_find or self._prop._ob_type == OBXPropertyType_Bool:
+            raise Exception("Property '%s' isn't numeric, %s() isn't supported" % (self._prop._name, name))
+
+        is_int = self._is_int and c_fn_int is not None
+
+        def compute(c_prop_query):
+            result = ctypes.c_int64() if is_int else ctypes.c_double()
+            count = ctypes.c_int64()
+            (c_fn_int if is_int else c_fn)(c_prop_query, ctypes.byref(result), ctypes.byref(count))
+            return result.value, count.value
+
+        return self._query._cached(("property", self._prop._id, name), lambda: self._run(compute), lambda r: 64)
+
+    def min(self):
+        """The smallest value, None if there are no (non-null) values"""
+        result, count = self._aggregate("min", obx_query_prop_min, obx_query_prop_min_int)
+        return result if count else None
+
+    def max(self):
+        """The largest value, None if there are no (non-null) values"""
+        result, count = self._aggregate("max", obx_query_prop_max, obx_query_prop_max_int)
+        return result if count else None
+
+    def sum(self):
+        """The sum of all values (0 if there are none); raises if an integer sum overflows 64 bits"""
+        return self._aggregate("sum", obx_query_prop_sum, obx_query_prop_sum_int)[0]
+
+    def avg(self):
+        """The average of all values as a float, None if there are no (non-null) values"""
+        # always the floating point average, obx_query_prop_avg_int() would truncate it
+        result, count = self._aggregate("avg", obx_query_prop_avg)
+        return result if count else None
+
+    def count(self, distinct: bool = False, case_sensitive: bool = True) -> int:
+        """The number of (non-null, or with distinct=True: different) values; case_sensitive applies to strings"""
+        def compute(c_prop_query):
+            count = ctypes.c_uint64()
+            obx_query_prop_count(c_prop_query, ctypes.byref(count))
+            return int(count.value)
+
+        key = ("property", self._prop._id, "count", distinct, case_sensitive)
+        return self._query._cached(key, lambda: self._run(compute, distinct, case_sensitive), lambda r: 64)
+
+    def find(self) -> np.ndarray:
+        """All (non-null) values as a numpy array (of str objects for strings), in the order of the query results"""
+        return self._find(False, True)
+
+    def distinct(self, case_sensitive: bool = True) -> np.ndarray:
+        """The different (non-null) values as a numpy array (of str objects for strings), in no particular order"""
+        return self._find(True, case_sensitive)
+
+    def _find(self, distinct: bool, case_sensitive: bool) -> np.ndarray:
+        if self._prop._ob_type != OBXPropertyType_String and self._prop._ob_type not in _prop_find:
+            raise Exception("Can't find values of property '%s', only scalars and strings are supported" %
+                            self._prop._name)
+
+        def compute(c_prop_query):
+            values = _prop_values(c_prop_query, self._prop)
+            return values.astype(bool) if self._prop._ob_type == OBXPropertyType_Bool else values
+
+        def compute_read_only():
+            values = self._run(compute, distinct, case_sensitive)
+            values.flags.writeable = False
+            return values
+
+        if self._query._ob._query_cache is None:
+            return self._run(compute, distinct, case_sensitive)
+        key = ("property", self._prop._id, "find", distinct, case_sensitive)
+        # strings: a rough estimate of the str objects' size
+        return self._query._cached(key, compute_read_only,
+                                   lambda values: values.nbytes + (64 * len(values) if values.dtype == object else 0))
+
+
+def _read_only(columns: dict) -> dict:
+    for array in columns.values():
+        array.flags.writeable = False
+    return columns
+
+
+def _columns_size(columns: dict) -> int:
+    return sum(array.nbytes for array in columns.values())
+
+
+def _objects_size(objects: tuple) -> int:
+    # a rough estimate: the instance, its __dict__ and a boxed value per attribute
+    return sum(400 + 40 * len(obj.__dict__) for obj in objects) + 8 * len(objects)
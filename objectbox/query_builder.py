@@ -1,95 +1,200 @@
 from objectbox.model.entity import _Entity
 from objectbox.objectbox import ObjectBox
 from objectbox.query import Query
+from objectbox.condition import _hashable
 from objectbox.c import *
+import functools
+import numpy as np
 
 
 class QueryBuilder:
-    def __init__(self, ob: ObjectBox, box: 'Box', entity: '_Entity', condition: 'QueryCondition'):
+    """Builds a native query from a QueryCondition (combined with & and |, or None for all objects).
+    The public methods adding a condition return the builder; the private ones used by QueryCondition.apply() return
+    the condition's native handle (obx_qb_cond), to be combined with _all()/_any()."""
+
+    def __init__(self, ob: ObjectBox, box: 'Box', entity: '_Entity', condition: 'QueryCondition',
+                 alias_all: bool = False):
+        """alias_all: makes all conditions parameters, those without an alias named by their position ("_0", ...)"""
         if not isinstance(entity, _Entity):
             raise Exception("Given type is not an Entity")
         self._box = box
         self._entity = entity
         self._condition = condition
+        self._alias_all = alias_all
+        self._params = {}  # alias => QueryCondition
+        self._calls = []  # the public condition methods called, see _chained()
         self._c_builder = obx_query_builder(ob._c_store, entity.id)
 
-    def close(self) -> int:
-        return obx_qb_close(self)
+    def close(self):
+        """Frees the native builder; done by build(), which can only be called once"""
+        c_builder_to_close = self._c_builder
+        if c_builder_to_close:
+            self._c_builder = None
+            obx_qb_close(c_builder_to_close)
 
     def error_code(self) -> int:
-        return obx_qb_error_code(self)
+        return obx_qb_error_code(self._c_builder)
     
     def error_message(self) -> str:
-        return obx_qb_error_message(self)
+        return obx_qb_error_message(self._c_builder)
+
+    def default_alias(self) -> str:
+        """The alias for a condition without one: None, unless all conditions are made parameters (alias_all)"""
+        return "_%d" % len(self._params) if self._alias_all else None
+
+    def param_alias(self, alias: str, condition: 'QueryCondition'):
+        """Names the condition added last as a parameter, see QueryCondition.alias()"""
+        if alias in self._params:
+            raise Exception("Duplicate query parameter alias '%s'" % alias)
+        obx_qb_param_alias(self._c_builder, c_str(alias))
+        self._params[alias] = condition
     
-    def equals_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_equals_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _equals_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_equals_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def not_equals_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_not_equals_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _not_equals_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_not_equals_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def contains_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_contains_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _contains_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_contains_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def starts_with_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_starts_with_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _starts_with_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_starts_with_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def ends_with_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_ends_with_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _ends_with_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_ends_with_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def greater_than_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_greater_than_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _greater_than_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_greater_than_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def greater_or_equal_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_greater_or_equal_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _greater_or_equal_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_greater_or_equal_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def less_than_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_less_than_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _less_than_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_less_than_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def less_or_equal_string(self, property_id: int, value: str, case_sensitive: bool):
-        obx_qb_less_or_equal_string(self._c_builder, property_id, c_str(value), case_sensitive)
-        return self
+    def _less_or_equal_string(self, property_id: int, value: str, case_sensitive: bool):
+        return obx_qb_less_or_equal_string(self._c_builder, property_id, c_str(value), case_sensitive)
     
-    def equals_int(self, property_id: int, value: int):
-        obx_qb_equals_int(self._c_builder, property_id, value)
-        return self
+    def _equals_int(self, property_id: int, value: int):
+        return obx_qb_equals_int(self._c_builder, property_id, value)
     
-    def not_equals_int(self, property_id: int, value: int):
-        obx_qb_not_equals_int(self._c_builder, property_id, value)
-        return self
+    def _not_equals_int(self, property_id: int, value: int):
+        return obx_qb_not_equals_int(self._c_builder, property_id, value)
     
-    def greater_than_int(self, property_id: int, value: int):
-        obx_qb_greater_than_int(self._c_builder, property_id, value)
-        return self
+    def _greater_than_int(self, property_id: int, value: int):
+        return obx_qb_greater_than_int(self._c_builder, property_id, value)
     
-    def greater_or_equal_int(self, property_id: int, value: int):
-        obx_qb_greater_or_equal_int(self._c_builder, property_id, value)
-        return self
+    def _greater_or_equal_int(self, property_id: int, value: int):
+        return obx_qb_greater_or_equal_int(self._c_builder, property_id, value)
     
-    def less_than_int(self, property_id: int, value: int):
-        obx_qb_less_than_int(self._c_builder, property_id, value)
-        return self
+    def _less_than_int(self, property_id: int, value: int):
+        return obx_qb_less_than_int(self._c_builder, property_id, value)
     
-    def less_or_equal_int(self, property_id: int, value: int):
-        obx_qb_less_or_equal_int(self._c_builder, property_id, value)
-        return self
+    def _less_or_equal_int(self, property_id: int, value: int):
+        return obx_qb_less_or_equal_int(self._c_builder, property_id, value)
     
-    def between_2ints(self, property_id: int, value_a: int, value_b: int):
-        obx_qb_between_2ints(self._c_builder, property_id, value_a, value_b)
-        return self
+    def _between_2ints(self, property_id: int, value_a: int, value_b: int):
+        return obx_qb_between_2ints(self._c_builder, property_id, value_a, value_b)
     
+    def _in_int64s(self, property_id: int, values: np.ndarray):
+        return obx_qb_in_int64s(self._c_builder, property_id, values.ctypes.data_as(ctypes.POINTER(ctypes.c_int64)),
+                                len(values))
+
+    def _not_in_int64s(self, property_id: int, values: np.ndarray):
+        return obx_qb_not_in_int64s(self._c_builder, property_id,
+                                    values.ctypes.data_as(ctypes.POINTER(ctypes.c_int64)), len(values))
+
+    def _in_int32s(self, property_id: int, values: np.ndarray):
+        return obx_qb_in_int32s(self._c_builder, property_id, values.ctypes.data_as(ctypes.POINTER(ctypes.c_int32)),
+                                len(values))
+
+    def _not_in_int32s(self, property_id: int, values: np.ndarray):
+        return obx_qb_not_in_int32s(self._c_builder, property_id,
+                                    values.ctypes.data_as(ctypes.POINTER(ctypes.c_int32)), len(values))
+
+    def _in_strings(self, property_id: int, values: list, case_sensitive: bool):
+        c_values = (ctypes.c_char_p * len(values))(*[c_str(value) for value in values])
+        return obx_qb_in_strings(self._c_builder, property_id, c_values, len(values), case_sensitive)
+
+    def _greater_than_double(self, property_id: int, value: float):
+        return obx_qb_greater_than_double(self._c_builder, property_id, value)
+
+    def _greater_or_equal_double(self, property_id: int, value: float):
+        return obx_qb_greater_or_equal_double(self._c_builder, property_id, value)
+
+    def _less_than_double(self, property_id: int, value: float):
+        return obx_qb_less_than_double(self._c_builder, property_id, value)
+
+    def _less_or_equal_double(self, property_id: int, value: float):
+        return obx_qb_less_or_equal_double(self._c_builder, property_id, value)
+
+    def _between_2doubles(self, property_id: int, value_a: float, value_b: float):
+        return obx_qb_between_2doubles(self._c_builder, property_id, value_a, value_b)
+
+    def _equals_bytes(self, property_id: int, value: bytes):
+        return obx_qb_equals_bytes(self._c_builder, property_id, bytes(value), len(value))
+
+    def _greater_than_bytes(self, property_id: int, value: bytes):
+        return obx_qb_greater_than_bytes(self._c_builder, property_id, bytes(value), len(value))
+
+    def _greater_or_equal_bytes(self, property_id: int, value: bytes):
+        return obx_qb_greater_or_equal_bytes(self._c_builder, property_id, bytes(value), len(value))
+
+    def _less_than_bytes(self, property_id: int, value: bytes):
+        return obx_qb_less_than_bytes(self._c_builder, property_id, bytes(value), len(value))
+
+    def _less_or_equal_bytes(self, property_id: int, value: bytes):
+        return obx_qb_less_or_equal_bytes(self._c_builder, property_id, bytes(value), len(value))
+
+    def _all(self, conditions: list):
+        """Combines the given conditions (native handles) with AND into a new one"""
+        c_conditions = (obx_qb_cond * len(conditions))(*conditions)
+        return obx_qb_all(self._c_builder, c_conditions, len(conditions))
+
+    def _any(self, conditions: list):
+        """Combines the given conditions (native handles) with OR into a new one"""
+        c_conditions = (obx_qb_cond * len(conditions))(*conditions)
+        return obx_qb_any(self._c_builder, c_conditions, len(conditions))
+
     def apply_condition(self):
-        self._condition.apply(self)
+        if self._condition is not None:
+            self._condition.apply(self)
     
     def build(self) -> Query:
-        self.apply_condition()
-        c_query = obx_query(self._c_builder)
-        return Query(c_query, self._box)
\ No newline at end of file
+        if not self._c_builder:
+            raise Exception("The query builder has already been used")
+        try:
+            self.apply_condition()
+            c_query = obx_query(self._c_builder)
+        finally:
+            self.close()
+        key = (self._entity.id, self._condition and self._condition._cache_key(), tuple(self._calls))
+        return Query(c_query, self._box, self._params, key)
+
+
+def _chained(name: str):
+    """The public variant of the condition method `_<name>`, returning the builder instead of the native handle"""
+    method = getattr(QueryBuilder, "_" + name)
+
+    @functools.wraps(method)
+    def chained(self, *args, **kwargs):
+        method(self, *args, **kwargs)
+        self._calls.append((name, _hashable(args), tuple(sorted(kwargs.items()))))
+        return self
+
+    chained.__name__ = name
+    chained.__qualname__ = "QueryBuilder." + name
+    return chained
+
+
+# public condition methods, generated from the private ones
+_CONDITION_METHODS = ("equals_string", "not_equals_string", "contains_string", "starts_with_string", "ends_with_string",
+    "greater_than_string", "greater_or_equal_string", "less_than_string", "less_or_equal_string", "equals_int",
+    "not_equals_int", "greater_than_int", "greater_or_equal_int", "less_than_int", "less_or_equal_int", "between_2ints",
+    "in_int64s", "not_in_int64s", "in_int32s", "not_in_int32s", "in_strings", "greater_than_double",
+    "greater_or_equal_double", "less_than_double", "less_or_equal_double", "between_2doubles", "equals_bytes",
+    "greater_than_bytes", "greater_or_equal_bytes", "less_than_bytes", "less_or_equal_bytes")
+
+for _name in _CONDITION_METHODS:
+    setattr(QueryBuilder, _name, _chained(_name))
@@ -16,21 +16,66 @@ from objectbox.c import *
 from contextlib import contextmanager
 
 
+class Transaction:
+    """A native transaction, bound to the thread that started it; see ObjectBox.read_tx() and write_tx().
+    While it's active, read_tx()/write_tx() calls on the same thread (e.g. by Box methods) reuse it."""
+
+    def __init__(self, ob: 'ObjectBox', c_txn: OBX_txn_p, write: bool):
+        self._ob = ob
+        self._c_txn = c_txn
+        self._write = write
+        self._after_end = []  # callbacks to run once the transaction is committed or aborted
+
+    def after_end(self, callback):
+        """Calls the given function (without arguments) after the transaction has been committed or aborted"""
+        self._after_end.append(callback)
+
+    def is_write(self) -> bool:
+        return self._write
+
+
+def current(ob: 'ObjectBox') -> Transaction:
+    """Returns the transaction active on the current thread, or None"""
+    return getattr(ob._tx_local, "tx", None)
+
+
 @contextmanager
 def read(ob: 'ObjectBox'):
-    tx = obx_txn_read(ob._c_store)
+    tx = current(ob)
+    if tx is not None:
+        # reads work in both, read and write transactions
+        yield tx
+        return
+
+    tx = Transaction(ob, obx_txn_read(ob._c_store), False)
+    ob._tx_local.tx = tx
     try:
-        yield
+        yield tx
     finally:
-        obx_txn_close(tx)
+        ob._tx_local.tx = None
+        obx_txn_close(tx._c_txn)
 
 
 @contextmanager
 def write(ob: 'ObjectBox'):
-    tx = obx_txn_write(ob._c_store)
+    tx = current(ob)
+    if tx is not None:
+        if not tx.is_write():
+            raise Exception("Cannot start a write transaction inside a read only transaction")
+        # nested: committed (or aborted) by the outer write_tx()
+        yield tx
+        return
+
+    tx = Transaction(ob, obx_txn_write(ob._c_store), True)
+    ob._tx_local.tx = tx
     try:
-        yield
-        obx_txn_success(tx)
+        yield tx
+        ob._tx_local.tx = None
+        obx_txn_success(tx._c_txn)
     except:
-        obx_txn_close(tx)
+        ob._tx_local.tx = None
+        obx_txn_close(tx._c_txn)
         raise
+    finally:
+        for callback in tx._after_end:
+            callback()
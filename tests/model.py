@@ -13,13 +13,13 @@ class TestEntity:
     str = Property(str, id=2, uid=1002, index=True)
     bool = Property(bool, id=3, uid=1003)
     int64 = Property(int, type=PropertyType.long, id=4, uid=1004, index=True)
-    int32 = Property(int, type=PropertyType.int, id=5, uid=1005, index=True, index_type=IndexType.hash)
-    int16 = Property(int, type=PropertyType.short, id=6, uid=1006, index_type=IndexType.hash)
+    int32 = Property(int, type=PropertyType.int, id=5, uid=1005, index=True, index_type=IndexType.value)
+    int16 = Property(int, type=PropertyType.short, id=6, uid=1006, index_type=IndexType.value)
     int8 = Property(int, type=PropertyType.byte, id=7, uid=1007)
     float64 = Property(float, type=PropertyType.double, id=8, uid=1008)
     float32 = Property(float, type=PropertyType.float, id=9, uid=1009)
     bools = Property(np.ndarray, type=PropertyType.boolVector, id=10, uid=1010)
-    bytes = Property(bytes, id=11, uid=1011, index_type=IndexType.hash64)
+    bytes = Property(bytes, id=11, uid=1011)
     shorts = Property(np.ndarray, type=PropertyType.shortVector, id=12, uid=1012)
     chars = Property(np.ndarray, type=PropertyType.charVector, id=13, uid=1013)
     ints = Property(np.ndarray, type=PropertyType.intVector, id=14, uid=1014)
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+import objectbox
+import objectbox.aio
+from tests.model import TestEntity
+from tests.common import autocleanup, load_empty_test_objectbox
+
+
+def test_aio_box_query():
+    ob = load_empty_test_objectbox()
+
+    async def run():
+        box = objectbox.aio.Box(ob, TestEntity)
+        assert await box.is_empty()
+
+        # concurrent writers are serialized, readers run in parallel
+        await asyncio.gather(*[box.put(TestEntity("foo %d" % i)) for i in range(20)])
+        counts = await asyncio.gather(*[box.count() for _ in range(10)])
+        assert counts == [20] * 10
+
+        object = await box.get(1)
+        assert object.str.startswith("foo")
+        assert len(await box.get_many([1, 2, 100], found_only=True)) == 2
+
+        str_prop = TestEntity.properties[1]
+        query = box.query(str_prop.starts_with("foo 1")).build()
+        assert await query.count() == 11
+        assert len(await query.find()) == 11
+        assert len(await query.offset(10).limit(5).find()) == 1
+        query.offset(0).limit(0)
+        assert await query.update(int64=5) == 11
+        assert await query.remove() == 11
+        assert await box.count() == 9
+
+    asyncio.run(run())
+    ob.close()
+
+
+def test_aio_transactions():
+    ob = load_empty_test_objectbox()
+
+    async def run():
+        box = objectbox.aio.Box(ob, TestEntity)
+
+        async with objectbox.aio.write_tx(ob):
+            await box.put(TestEntity("first"))
+            assert await box.count() == 1  # reads see the transaction's changes
+        assert await box.count() == 1
+
+        with pytest.raises(Exception, match="abort"):
+            async with objectbox.aio.write_tx(ob):
+                await box.put(TestEntity("second"))
+                raise Exception("abort")
+        assert await box.count() == 1
+
+        # a cancelled transaction is aborted and the writer is available afterwards
+        started = asyncio.Event()
+
+        async def cancelled_tx():
+            async with objectbox.aio.write_tx(ob):
+                await box.put(TestEntity("third"))
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(cancelled_tx())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await box.put(TestEntity("fourth"))
+        assert [o.str for o in await box.get_all()] == ["first", "fourth"]
+
+        async with objectbox.aio.read_tx(ob):
+            assert await box.count() == 2
+            with pytest.raises(Exception):
+                await box.put(TestEntity("fifth"))
+            with pytest.raises(Exception, match="read only"):
+                async with objectbox.aio.write_tx(ob):
+                    pass
+
+        # nested transactions join the outer one, like the synchronous API
+        async def nested():
+            async with objectbox.aio.write_tx(ob):
+                await box.put(TestEntity("fifth"))
+                async with objectbox.aio.write_tx(ob):
+                    await box.put(TestEntity("sixth"))
+                async with objectbox.aio.read_tx(ob):
+                    assert await box.count() == 4  # sees the outer transaction's uncommitted writes
+                raise Exception("abort")
+
+        with pytest.raises(Exception, match="abort"):
+            await asyncio.wait_for(nested(), 5)
+        assert await box.count() == 2
+
+    asyncio.run(run())
+    ob.close()
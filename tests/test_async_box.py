@@ -0,0 +1,80 @@
+import pytest
+import objectbox
+from objectbox.model import IdUid
+from tests.model import TestEntity
+from tests.common import autocleanup, load_empty_test_objectbox, test_dir
+
+
+def test_async_box():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put(TestEntity("existing"))
+
+    with objectbox.AsyncBox(box) as async_box:
+        objects = [TestEntity("foo %d" % i) for i in range(100)]
+        ids = [async_box.put(object) for object in objects]
+        assert ids == [object.id for object in objects]  # assigned before the put is executed
+        assert len(set(ids)) == 100 and 1 not in ids
+
+        async_box.insert(TestEntity("inserted"))
+        async_box.remove(1)
+        assert async_box.await_completion()
+
+        assert box.count() == 101
+        assert not box.contains(1)
+        assert box.get(ids[-1]).str == "foo 99"
+
+        objects[0].str = "updated"
+        async_box.update(objects[0])
+        async_box.remove(objects[1])
+        assert async_box.await_submitted()
+        assert box.get(ids[0]).str == "updated"
+        assert box.count() == 100
+
+    ob.close()
+
+
+def test_async_options():
+    model = objectbox.Model()
+    model.entity(TestEntity, last_property_id=IdUid(27, 1027))
+    model.last_entity_id = IdUid(2, 2)
+    ob = objectbox.Builder().model(model).directory(test_dir) \
+        .async_max_queue_length(10).async_max_batch_size(5).build()
+    box = objectbox.Box(ob, TestEntity)
+
+    with objectbox.AsyncBox(box, enqueue_timeout_ms=1000) as async_box:
+        for i in range(50):
+            async_box.put(TestEntity(str(i)))
+        assert async_box.await_completion()
+    assert box.count() == 50
+
+    ob.close()
+
+
+def test_async_box_cache():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity, cache_size=10)
+    object = TestEntity("old")
+    box.put(object)
+
+    with objectbox.AsyncBox(box) as async_box:
+        for i in range(20):
+            object.str = "new %d" % i
+            async_box.put(object)
+            box.get(object.id)  # reads the old or the new object, depending on the commit
+        assert async_box.await_completion()
+        assert box.get(object.id).str == "new 19"
+        assert box.get(object.id).str == "new 19"  # cached again, once the commit is seen
+        assert box.cache.hits >= 1
+
+        async_box.remove(object)
+        try:
+            box.get(object.id)
+        except objectbox.NotFoundException:
+            pass
+        assert async_box.await_submitted()
+        assert not box.contains(object.id)
+        with pytest.raises(objectbox.NotFoundException):
+            box.get(object.id)
+
+    ob.close()
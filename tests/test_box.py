@@ -1,3 +1,4 @@
+import threading
 import pytest
 import objectbox
 from tests.model import TestEntity, TestEntityDatetime, TestEntityFlex
@@ -252,4 +253,544 @@ def test_flex_dict():
     assert id == object.id
     read = box.get(object.id)
     assert read.flex_dict == object.flex_dict
-    assert read.flex_int == object.flex_int
\ No newline at end of file
+    assert read.flex_int == object.flex_int
+
+def test_compiled_codec():
+    ob = load_empty_test_objectbox()
+    entity = TestEntity  # compiled by Model.entity()
+
+    object = TestEntity("foo")
+    object.int64 = 42
+    object.floats = np.array([0.1, 1.2], dtype=np.float32)
+    object.longs_list = [1, 2, 3]
+    object.date = 1234.5
+    object.flex = {"a": [1, 2]}
+
+    # the generated functions must read/write the same content as the generic implementation
+    for obj in [TestEntity(), object]:
+        data = bytes(objectbox.model.entity._Entity.marshal(entity, obj, 7))
+        read = entity.unmarshal(data)
+        expected = objectbox.model.entity._Entity.unmarshal(entity, data)
+        assert type(read) == type(expected)
+        assert_equal(read, expected)
+
+        # the data written without the Builder has a different layout but the same content
+        read = objectbox.model.entity._Entity.unmarshal(entity, bytes(entity.marshal(obj, 7)))
+        assert_equal(read, expected)
+
+    ob.close()
+
+
+def test_struct_marshal():
+    from objectbox.model import Entity, Id, Property, PropertyType, IdUid
+
+    @Entity(id=1, uid=1)
+    class Scalars:
+        id = Id(id=1, uid=1001)
+        bool = Property(bool, id=2, uid=1002)
+        int8 = Property(int, type=PropertyType.byte, id=3, uid=1003)
+        int16 = Property(int, type=PropertyType.short, id=4, uid=1004)
+        int32 = Property(int, type=PropertyType.int, id=5, uid=1005)
+        float32 = Property(float, type=PropertyType.float, id=7, uid=1007)
+        float64 = Property(float, id=8, uid=1008)
+        date = Property(int, type=PropertyType.date, id=9, uid=1009)
+
+    model = objectbox.Model()
+    model.entity(Scalars, last_property_id=IdUid(10, 1010))
+    model.last_entity_id = IdUid(1, 1)
+    ob = objectbox.Builder().model(model).directory("testdata").build()
+    box = objectbox.Box(ob, Scalars)
+
+    object = Scalars()
+    object.bool = True
+    object.int8 = -128
+    object.int16 = 300
+    object.int32 = -70000
+    object.float32 = 1.5
+    object.float64 = 2.25
+    object.date = 1234.5
+
+    # scalar-only entities are written without the FlatBuffers builder; the result must be a valid FlatBuffer
+    data = Scalars.marshal(object, 3)
+    read = objectbox.model.entity._Entity.unmarshal(Scalars, data)
+    assert read.id == 3
+    assert (read.bool, read.int8, read.int16, read.int32) == (True, -128, 300, -70000)
+    assert (read.float32, read.float64, read.date) == (1.5, 2.25, 1234)
+
+    box.put([object, Scalars()])
+    read = box.get(object.id)
+    assert (read.bool, read.int8, read.int16, read.int32) == (True, -128, 300, -70000)
+    assert box.get(2).int32 == 0
+
+    ob.close()
+
+
+def test_lazy():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    object = TestEntity("foo")
+    object.int64 = 42
+    object.doubles = np.array([1.5, 2.5])
+    object.flex = {"a": 1}
+    box.put(object, TestEntity("bar"))
+
+    read = box.get(object.id, lazy=True)
+    assert isinstance(read, TestEntity.cls)
+    assert "str" not in vars(read)  # not decoded yet
+    assert read.str == "foo"
+    assert "str" in vars(read)  # cached on the proxy
+    assert "doubles" not in vars(read)
+    assert_equal(read, object)
+
+    # changes to a proxy are regular attribute writes and can be put back
+    read.int64 = 43
+    box.put(read)
+    assert box.get(object.id).int64 == 43
+    assert box.get(object.id).str == "foo"
+
+    assert [o.str for o in box.get_all(lazy=True)] == ["foo", "bar"]
+
+    str_prop = TestEntity.properties[1]
+    found = box.query(str_prop.equals("bar")).build().find(lazy=True)
+    assert len(found) == 1
+    assert found[0].str == "bar"
+    assert found[0].id == 2
+
+    ob.close()
+
+
+def test_put_skip_unchanged():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    objects = [TestEntity("foo"), TestEntity("bar"), TestEntity("baz")]
+    objects[0].ints_list = [1, 2]
+    objects[0].flex = {"a": 1}
+    box.put(objects)
+
+    # untracked objects are always written
+    assert "_ob_loaded" not in box.get(1).__dict__
+    assert box.put(box.get_all(), skip_unchanged=True) == 0
+
+    # nothing changed since the objects were read
+    read = box.get_all(track=True)
+    assert box.put(read, skip_unchanged=True) == 3
+    assert box.put(read[0], skip_unchanged=True) == read[0].id
+
+    # assignments and in-place changes of mutable values are detected
+    read[0].ints_list.append(3)
+    read[1].str = "changed"
+    assert box.put(read, skip_unchanged=True) == 1
+    assert box.get(read[0].id).ints_list == [1, 2, 3]
+    assert box.get(read[1].id).str == "changed"
+
+    # the snapshot is refreshed by put
+    read[0].flex["b"] = 2
+    assert box.put(read, skip_unchanged=True) == 2
+    assert box.put(read, skip_unchanged=True) == 3
+    assert box.get(read[0].id).flex == {"a": 1, "b": 2}
+
+    # new, lazily read and removed objects are always written
+    lazy = box.get(read[1].id, lazy=True)
+    assert box.put([TestEntity("new"), lazy], skip_unchanged=True) == 0
+    box.remove(read[2])
+    assert box.put(read[2], skip_unchanged=True) == read[2].id
+    assert box.count() == 4
+
+    ob.close()
+
+
+def test_remove_many_contains():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put([TestEntity(str(i)) for i in range(5)])
+
+    assert box.contains(1)
+    assert not box.contains(6)
+    assert box.contains_many([1, 6, 0, 5]).tolist() == [True, False, False, True]
+    assert box.contains_many([]).tolist() == []
+    assert box.contains_many(np.array([2, 3], dtype=np.int64)).all()
+
+    assert box.remove_many([1, 3, 6]) == 2
+    assert box.remove_many(np.array([2], dtype=np.int64)) == 1
+    assert box.remove_many([]) == 0
+    assert box.contains_many([1, 2, 3, 4, 5]).tolist() == [False, False, False, True, True]
+    assert box.count() == 2
+
+    ob.close()
+
+
+def test_put_modes():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put(TestEntity("foo"), TestEntity("bar"))
+
+    object = TestEntity("baz")
+    object.id = 1
+    with pytest.raises(objectbox.c.CoreException):
+        box.put(object, mode=objectbox.PutMode.insert)
+    with pytest.raises(objectbox.c.CoreException):
+        box.put([TestEntity("new"), object], mode=objectbox.PutMode.insert)
+    assert box.count() == 2  # nothing put by the failing list
+    box.put(object, mode=objectbox.PutMode.update)
+    assert box.get(1).str == "baz"
+    with pytest.raises(Exception):
+        box.put(TestEntity("new"), mode=objectbox.PutMode.update)
+
+    # per-object outcomes
+    objects = [TestEntity("a"), TestEntity("b"), TestEntity("c")]
+    objects[1].id = 2
+    objects[2].id = 10
+    assert box.insert_many(objects) == [True, False, True]
+    assert box.get(2).str == "bar"
+    assert box.get(10).str == "c"
+    assert box.get(objects[0].id).str == "a"
+
+    objects[1].id = 20
+    objects[2].str = "updated"
+    assert box.update_many(objects[1:] + [TestEntity("d")]) == [False, True, False]
+    assert box.get(10).str == "updated"
+    assert box.count() == 4
+
+    # the same ID more than once: it's inserted once, but updated each time (the last one wins)
+    duplicates = [TestEntity("x"), TestEntity("y"), TestEntity("z")]
+    for obj in duplicates:
+        obj.id = 30
+    assert box.insert_many(duplicates[:2] + [TestEntity("e")]) == [True, False, True]
+    assert box.get(30).str == "x"
+    assert box.update_many(duplicates[1:]) == [True, True]
+    assert box.get(30).str == "z"
+    assert box.count() == 6
+
+    ob.close()
+
+
+def test_update():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    objects = [TestEntity("foo"), TestEntity("bar"), TestEntity("bar")]
+    objects[0].ints_list = [1, 2]
+    box.put(objects)
+
+    # scalars are patched in place, other properties re-encoded
+    box.update(objects[0].id, int64=42, float64=1.5, bool=True)
+    box.update(objects[0].id, str="changed", ints_list=[3])
+    read = box.get(objects[0].id)
+    assert (read.str, read.int64, read.float64, read.bool, read.ints_list) == ("changed", 42, 1.5, True, [3])
+
+    with pytest.raises(objectbox.NotFoundException):
+        box.update(100, int64=1)
+    with pytest.raises(Exception):
+        box.update(objects[0].id, id=5)
+
+    str_prop = TestEntity.properties[1]
+    assert box.query(str_prop.equals("bar")).build().update(int32=7, date=123) == 2
+    assert [(o.int32, o.date) for o in box.get_all()] == [(0, 0), (7, 123), (7, 123)]
+    assert box.query(str_prop.equals("none")).build().update(int32=1) == 0
+
+    ob.close()
+
+
+def test_get_many():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put([TestEntity("foo"), TestEntity("bar"), TestEntity("baz")])
+
+    assert [o.str for o in box.get_many([3, 1])] == ["baz", "foo"]
+    read = box.get_many(np.array([2, 10, 1], dtype=np.int64))
+    assert read[0].str == "bar" and read[1] is None and read[2].str == "foo"
+    assert [o.str for o in box.get_many([2, 10, 1], found_only=True)] == ["bar", "foo"]
+    assert box.get_many([1, 2], fields=["str"], into=tuple) == [("foo",), ("bar",)]
+    assert box.get_many([]) == []
+
+    ob.close()
+
+
+def test_iter():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put([TestEntity(str(i)) for i in range(1, 8)])
+    box.remove(4)
+
+    assert [o.str for o in box.iter()] == ["1", "2", "3", "5", "6", "7"]
+    assert [[o.id for o in chunk] for chunk in box.iter(chunk_size=4)] == [[1, 2, 3, 5], [6, 7]]
+    assert [o.id for o in box.iter(start_id=4, end_id=6)] == [5, 6]
+    assert [o.id for o in box.iter(start_id=6)] == [6, 7]
+    assert list(box.iter(start_id=8)) == []
+    assert list(box.iter(start_id=2, end_id=3, fields=["str"], into=tuple)) == [("2",), ("3",)]
+
+    # no transaction is held while the iterator is suspended: writes during the iteration work...
+    for object in box.iter():
+        object.str += "!"
+        box.put(object)
+    assert [o.str for o in box.get_all()] == ["1!", "2!", "3!", "5!", "6!", "7!"]
+
+    # ... also after an abandoned iterator
+    it = box.iter()
+    assert next(it).id == 1
+    box.put(TestEntity("8"))
+    assert box.count() == 7
+
+    # interleaved iterators are independent
+    it1, it2 = box.iter(), box.iter(chunk_size=2)
+    assert next(it1).id == 1
+    assert [o.id for o in next(it2)] == [1, 2]
+    it1.close()
+    assert [[o.id for o in chunk] for chunk in it2] == [[3, 5], [6, 7], [8]]
+
+    # batches are resumed after the last ID read
+    box.iter_batch_size = 2
+    assert [o.id for o in box.iter(start_id=2)] == [2, 3, 5, 6, 7, 8]
+    with ob.write_tx():
+        assert [o.id for o in box.iter(end_id=5)] == [1, 2, 3, 5]
+
+    ob.close()
+
+
+def test_put_many_large():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    # more new objects than the core hands out IDs for in a single call
+    objects = [TestEntity("foo %d" % i) for i in range(12000)]
+    objects[5].id = 100000
+    box.put(objects)
+    assert box.count() == 12000
+    assert len(set(o.id for o in objects)) == 12000
+    assert box.get(100000).str == "foo 5"
+    assert box.get(objects[-1].id).str == "foo 11999"
+
+    ob.close()
+
+
+def test_columns():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    objects = []
+    for i in range(3):
+        object = TestEntity("s%d" % i)
+        object.int32 = i * 10
+        object.float64 = i / 2
+        object.date = 1000 * i
+        object.floats = np.array([i, i + 1], dtype=np.float32)
+        object.ints_list = list(range(i))
+        objects.append(object)
+    box.put(objects)
+
+    columns = box.get_all_columns(["id", "str", "int32", "float64", "date", "floats", "ints_list"])
+    assert columns["id"].dtype == np.int64
+    assert columns["id"].tolist() == [1, 2, 3]
+    assert columns["str"].tolist() == ["s0", "s1", "s2"]
+    assert columns["int32"].dtype == np.int32
+    assert columns["int32"].tolist() == [0, 10, 20]
+    assert columns["float64"].tolist() == [0, 0.5, 1]
+    assert columns["date"].dtype == np.dtype("datetime64[ms]")
+    assert columns["date"][2] == np.datetime64(2000, "ms")
+    # vectors with equal lengths are stacked, others are object arrays
+    assert columns["floats"].shape == (3, 2)
+    assert columns["floats"][2].tolist() == [2, 3]
+    assert columns["ints_list"].dtype == np.dtype("O")
+    assert columns["ints_list"][2].tolist() == [0, 1]
+
+    str_prop = TestEntity.properties[1]
+    query = box.query(str_prop.starts_with("s")).build()
+    columns = query.find_columns([TestEntity.properties[4], str_prop], string_dtype=str)
+    assert list(columns.keys()) == ["int32", "str"]
+    assert columns["str"].dtype.kind == "U"
+    assert columns["int32"].tolist() == [0, 10, 20]
+
+    # scalars and strings are read by native property queries, in the order of the query results (here: the index)
+    query = box.query(str_prop.less_than("s2")).build()
+    query_ids = [object.id for object in query.find()]
+    columns = query.find_columns(["id", "str", "bool", "int32"])
+    assert columns["id"].tolist() == query_ids
+    assert columns["bool"].dtype == np.bool_
+    query.offset(1)  # not supported by property queries, the objects' data is read instead
+    assert query.find_columns(["id", "str"])["str"].tolist() == ["s1"]
+
+    columns = box.get_all_columns()
+    assert len(columns) == len(TestEntity.properties)
+
+    ob.close()
+
+
+def test_put_columns():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    # scalar columns are encoded all at once
+    ids = box.put_columns({
+        "int32": np.array([1, 2, 3], dtype=np.int32),
+        TestEntity.properties[7]: np.array([0.5, 1.5, 2.5]),  # float64
+        "date": np.array(["2023-01-01", "1970-01-01T00:00:01", "1970-01-01"], dtype="datetime64[ms]"),
+    })
+    assert ids.tolist() == [1, 2, 3]
+    read = box.get(2)
+    assert (read.int32, read.float64, read.date, read.str) == (2, 1.5, 1000, "")
+
+    # properties without a column are stored with their default, just like put() does
+    int64_prop = TestEntity.properties[3]
+    str_prop = TestEntity.properties[1]
+    assert box.query(int64_prop.equals(0)).build().count() == 3
+    assert box.query(str_prop.equals("")).build().count() == 3
+    assert box.query().build().property("int64").count() == 3
+
+    # structured arrays and properties of any type; objects with a given ID are updated
+    array = np.zeros(2, dtype=TestEntity.columns_dtype(["id", "str", "int64", "doubles"]))
+    array["id"] = [3, 0]
+    array["str"] = ["updated", "new"]
+    array["int64"] = [30, 40]
+    array["doubles"][0] = np.array([1.0, 2.0])
+    array["doubles"][1] = np.array([3.0])
+    ids = box.put_columns(array)
+    assert ids.tolist() == [3, 4]
+    assert box.count() == 4
+    assert box.get(3).str == "updated"
+    assert box.get(3).int64 == 30
+    assert box.get(3).int32 == 0  # not part of the columns
+    assert box.get(4).doubles.tolist() == [3.0]
+
+    with pytest.raises(Exception):
+        box.put_columns({"int32": [1, 2], "int64": [1]})
+
+    ob.close()
+
+
+def test_projection():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    object = TestEntity("foo")
+    object.int64 = 42
+    object.doubles = np.array([1.5, 2.5])
+    box.put(object, TestEntity("bar"))
+
+    read = box.get(object.id, fields=["id", "str"])
+    assert isinstance(read, TestEntity.cls)
+    assert (read.id, read.str) == (1, "foo")
+    assert "int64" not in vars(read)  # not decoded yet, but still available on access
+    assert read.int64 == 42
+
+    # putting a projected object back keeps the properties that weren't read
+    read = box.get(object.id, fields=["str"])
+    read.str = "changed"
+    box.put(read)
+    stored = box.get(object.id)
+    assert (stored.str, stored.int64, stored.doubles.tolist()) == ("changed", 42, [1.5, 2.5])
+    read.str = "foo"
+    box.put(read)
+
+    assert box.get(object.id, fields=["str", TestEntity.properties[3]], into=tuple) == ("foo", 42)
+    assert box.get(object.id, fields=["id", "int64"], into=dict) == {"id": 1, "int64": 42}
+    assert len(box.get(object.id, into=dict)) == len(TestEntity.properties)
+
+    assert box.get_all(fields=["str"], into=tuple) == [("foo",), ("bar",)]
+
+    str_prop = TestEntity.properties[1]
+    query = box.query(str_prop.equals("bar")).build()
+    assert query.find(fields=["id", "str"], into=dict) == [{"id": 2, "str": "bar"}]
+
+    with pytest.raises(Exception):
+        box.get(object.id, fields=["unknown"])
+    with pytest.raises(Exception):
+        box.get(object.id, fields=["str"], into=list)
+    with pytest.raises(Exception):
+        box.get(object.id, lazy=True, fields=["str"])
+
+    ob.close()
+
+
+def test_cache():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity, cache_size=2)
+    other = objectbox.Box(ob, TestEntity)
+    str_prop = TestEntity.properties[1]
+
+    objects = [TestEntity("a"), TestEntity("b"), TestEntity("c")]
+    objects[0].ints_list = [1, 2]
+    box.put(*objects)
+
+    first = box.get(1)
+    assert box.cache.stats() == {"hits": 0, "misses": 1, "size": 1, "max_size": 2}
+    first.str = "changed"
+    first.ints_list.append(3)
+    second = box.get(1)
+    assert (second.str, second.ints_list) == ("a", [1, 2])  # copies are handed out
+    assert second is not first
+    assert (box.cache.hits, box.cache.misses) == (1, 1)
+
+    # LRU eviction: 2 is dropped when 3 is added, 1 was used last
+    box.get(2)
+    box.get(1)
+    box.get(3)
+    assert len(box.cache) == 2
+    box.get(2)
+    assert box.cache.misses == 4
+
+    # invalidated by changes through any Box of the entity
+    other.put(second)
+    assert box.get(1).str == "a"
+    second.str = "x"
+    other.put(second)
+    assert box.get(1).str == "x"
+    other.remove(1)
+    with pytest.raises(objectbox.NotFoundException):
+        box.get(1)
+    box.get(2)
+    other.query(str_prop.equals("b")).build().remove()
+    with pytest.raises(objectbox.NotFoundException):
+        box.get(2)
+    box.get(3)
+    other.remove_all()
+    with pytest.raises(objectbox.NotFoundException):
+        box.get(3)
+
+    # nothing read inside a write transaction is cached, it's invalidated once the transaction ends
+    box.put(TestEntity("d"))
+    with pytest.raises(Exception):
+        with ob.write_tx():
+            box.update(4, str="e")
+            assert box.get(4).str == "e"
+            raise Exception("abort")
+    assert box.get(4).str == "d"
+
+    # neither is anything read in a read transaction, whose snapshot may be outdated by commits of other threads
+    with ob.read_tx():
+        assert box.get(4).str == "d"
+        writer = threading.Thread(target=lambda: other.update(4, str="f"))
+        writer.start()
+        writer.join()
+        assert box.get(4).str == "d"
+    assert box.get(4).str == "f"
+
+    ob.close()
+
+
+def _str_length(object) -> int:
+    return len(object.str)
+
+
+def _add(a, b):
+    return a + b
+
+
+def test_parallel_map():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    box.put(*[TestEntity("x" * (i % 10)) for i in range(1000)])
+    box.remove_many(range(1, 100))
+
+    lengths = [i % 10 for i in range(99, 1000)]
+    assert list(box.parallel_map(_str_length, workers=2)) == lengths
+    assert box.parallel_map(_str_length, workers=2, reduce=_add, partitions=3) == sum(lengths)
+
+    str_prop = TestEntity.properties[1]
+    query = box.query(str_prop.equals("xxx")).build()
+    assert query.find_ids().tolist() == [id for id in range(100, 1001) if (id - 1) % 10 == 3]
+    assert query.parallel_map(_str_length, workers=2, reduce=_add) == 3 * 90
+    assert box.query(str_prop.equals("none")).build().parallel_map(_str_length, reduce=_add) is None
+
+    ob.close()
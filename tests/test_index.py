@@ -6,7 +6,19 @@ from tests.model import TestEntity
 from tests.common import (
     autocleanup,
     load_empty_test_objectbox,
+    test_dir,
 )
+from objectbox.c import *
+
+
+@Entity(id=4, uid=4)
+class TestEntityUnique:
+    id = Id(id=1, uid=4001)
+    name = Property(str, id=2, uid=4002, unique=True, index_id=7, index_uid=4007)
+    value = Property(int, id=3, uid=4003)
+
+    def __init__(self, name: str = ""):
+        self.name = name
 
 def test_index_basics():
     ob = load_empty_test_objectbox()
@@ -18,18 +30,90 @@ def test_index_basics():
 
     # string - default index type is hash
     assert box._entity.properties[1]._index_type == IndexType.hash
+    assert box._entity.properties[1]._flags == OBXPropertyFlags_INDEX_HASH
 
     # int64 - default index type is value
     assert box._entity.properties[3]._index_type == IndexType.value
+    assert box._entity.properties[3]._flags == OBXPropertyFlags_INDEXED
 
-    # int32 - index type overwritten to hash
-    assert box._entity.properties[4]._index_type == IndexType.hash
+    # int32 - index type given explicitly
+    assert box._entity.properties[4]._index_type == IndexType.value
 
     # int16 - specify index type w/o explicitly enabling index
-    assert box._entity.properties[5]._index_type == IndexType.hash
+    assert box._entity.properties[5]._index_type == IndexType.value
+
+    # index IDs are assigned in the order of the properties, UIDs derived from the property UIDs
+    indexed = [prop for prop in TestEntity.properties if prop._index]
+    assert [ob._model.index_id(prop).id for prop in indexed] == [1, 2, 3, 4]
+    assert len(set(ob._model.index_id(prop).uid for prop in indexed)) == 4
+    ob.close()
+
+    # another model assigns its own IDs, without changing the (shared) properties
+    model = objectbox.Model()
+    model.last_index_id = IdUid(10, 10)
+    model.entity(TestEntity, last_property_id=IdUid(27, 1027))
+    assert [model.index_id(prop).id for prop in indexed] == [11, 12, 13, 14]
+    assert [prop._index_id for prop in indexed] == [0, 0, 0, 0]
+    # generated UIDs are the same in every model (to reopen stores) and don't collide with other UIDs
+    assert [model.index_id(prop).uid for prop in indexed] == [ob._model.index_id(prop).uid for prop in indexed]
+    assert not set(model.index_id(prop).uid for prop in indexed) & set(prop._uid for prop in TestEntity.properties)
+
+
+def test_index_ids_compatibility():
+    def open_store(entity):
+        model = objectbox.Model()
+        model.entity(entity, last_property_id=IdUid(3, 5003))
+        model.last_entity_id = IdUid(5, 5)
+        return objectbox.Builder().model(model).directory(test_dir).build()
+
+    def version_1():
+        @Entity(id=5, uid=5)
+        class TestEntityIndexes:
+            id = Id(id=1, uid=5001)
+            b = Property(int, id=2, uid=5002, index=True)
+        return TestEntityIndexes
 
-    # bytes - index type overwritten to hash64
-    assert box._entity.properties[10]._index_type == IndexType.hash64
+    def version_2(b_index_id: int = 0, b_index_uid: int = 0):
+        @Entity(id=5, uid=5)
+        class TestEntityIndexes:
+            id = Id(id=1, uid=5001)
+            a = Property(int, id=3, uid=5003, index=True, index_id=2 if b_index_id else 0,
+                         index_uid=5103 if b_index_id else 0)
+            b = Property(int, id=2, uid=5002, index=True, index_id=b_index_id, index_uid=b_index_uid)
+        return TestEntityIndexes
+
+    entity = version_1()
+    ob = open_store(entity)
+    assigned = ob._model.index_id(entity.properties[1])
+    ob.close()
+
+    # assigned index IDs follow the order of the properties: adding an index before others changes their IDs
+    with pytest.raises(CoreException, match="SCHEMA"):
+        open_store(version_2())
+
+    # ...so the IDs of existing indexes must be given explicitly
+    ob = open_store(version_2(assigned.id, assigned.uid))
+    assert (ob._model.last_index_id.id, ob._model.last_index_id.uid) == (2, 5103)
+    ob.close()
+
+
+def test_index_unique():
+    model = objectbox.Model()
+    model.entity(TestEntityUnique, last_property_id=IdUid(3, 4003))
+    model.last_entity_id = IdUid(4, 4)
+    assert (model.last_index_id.id, model.last_index_id.uid) == (7, 4007)  # derived from the explicit index ID
+    ob = objectbox.Builder().model(model).directory(test_dir).build()
+    box = objectbox.Box(ob, TestEntityUnique)
+
+    box.put(TestEntityUnique("foo"))
+    with pytest.raises(CoreException) as e:
+        box.put(TestEntityUnique("foo"))
+    assert e.value.code == 10201  # UNIQUE_VIOLATED
+    box.put(TestEntityUnique("bar"))
+
+    name = TestEntityUnique.properties[1]
+    assert box.query(name.equals("bar")).build().find()[0].name == "bar"
+    ob.close()
 
 
 def test_index_error():
@@ -41,4 +125,9 @@ def test_index_error():
         try:
             str = Property(str, id=2, uid=3002, index=False, index_type=IndexType.hash)
         except Exception:
-            assert pytest.raises(Exception, match='trying to set index type on property of id 2 while index is set to False')
\ No newline at end of file
+            assert pytest.raises(Exception, match='trying to set index type on property of id 2 while index is set to False')
+
+    with pytest.raises(Exception, match="only strings can have a hash index"):
+        Property(int, id=2, uid=3002, index_type=IndexType.hash)
+    with pytest.raises(Exception, match="indexes on vectors"):
+        Property(bytes, id=2, uid=3002, index=True)
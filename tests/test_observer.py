@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import objectbox
+from tests.model import TestEntity
+from tests.common import autocleanup, load_empty_test_objectbox
+
+
+def test_observe():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    changes = []
+    threads = set()
+    delivered = threading.Semaphore(0)
+
+    def on_change(entities):
+        changes.append(entities)
+        threads.add(threading.current_thread().name)
+        delivered.release()
+
+    observer = ob.observe(TestEntity, on_change)
+    box.put(TestEntity("foo"))
+    with ob.write_tx():  # a single notification per commit
+        box.put(TestEntity("bar"))
+        box.remove(1)
+    with ob.write_tx():  # nothing changed
+        pass
+    assert delivered.acquire(timeout=5) and delivered.acquire(timeout=5)
+    assert changes == [[TestEntity], [TestEntity]]
+    assert threads == {"objectbox-observers"}
+
+    observer.close()
+    box.put(TestEntity("baz"))
+    assert not delivered.acquire(timeout=0.1)
+    assert len(changes) == 2
+
+    ob.observe([TestEntity], lambda entities: 1 / 0)  # exceptions don't stop the dispatcher
+    ob.observe([TestEntity], on_change)
+    box.remove_all()
+    assert delivered.acquire(timeout=5)
+    ob.close()  # closes the remaining observers
+
+
+def test_observe_asyncio():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+
+    async def main():
+        changed = asyncio.Event()
+        loop_thread = threading.current_thread()
+
+        async def on_change(entities):
+            assert threading.current_thread() is loop_thread
+            changed.set()
+
+        with ob.observe(TestEntity, on_change, asyncio.get_running_loop()):
+            await asyncio.get_running_loop().run_in_executor(None, box.put, TestEntity("foo"))
+            await asyncio.wait_for(changed.wait(), 5)
+
+    asyncio.run(main())
+    ob.close()
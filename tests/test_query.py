@@ -2,8 +2,12 @@ import objectbox
 from objectbox.model import *
 from objectbox.c import *
 import pytest
-from tests.common import (load_empty_test_objectbox, autocleanup)
-from tests.model import TestEntity
+from tests.common import (load_empty_test_objectbox, load_empty_test_datetime, remove_test_dir, autocleanup)
+from tests.model import TestEntity, TestEntityDatetime
+from datetime import datetime
+import numpy as np
+import gc
+import threading
 
 
 def test_query_basics():
@@ -129,3 +133,248 @@ def test_offset_limit():
     query.offset(0)
     query.limit(0)
     assert len(query.find()) == 4
+
+
+def test_query_cache():
+    ob = load_empty_test_objectbox(query_cache_size=100000)
+    box = objectbox.Box(ob, TestEntity)
+    box.put(TestEntity("foo"), TestEntity("bar"), TestEntity("foo"))
+
+    str_prop: Property = TestEntity.properties[1]
+    query = box.query(str_prop.equals("foo")).build()
+    assert query.count() == 2
+    assert query.count() == 2
+    assert ob.query_cache.stats()["hits"] == 1
+
+    # results are cached by what the query matches, so queries built the same way share them
+    with box.query(str_prop.equals("foo")).build() as same:
+        assert same.count() == 2
+    assert ob.query_cache.stats()["hits"] == 2
+    assert box.query(str_prop.equals("bar")).build().count() == 1
+    assert box.query().equals_string(str_prop._id, "foo", True).build().count() == 2
+    assert box.query().equals_string(str_prop._id, "bar", True).build().count() == 1
+    assert ob.query_cache.stats()["hits"] == 2
+
+    found = query.find()
+    found[0].str = "changed"
+    assert [obj.str for obj in query.find()] == ["foo", "foo"]  # copies of the cached objects
+
+    columns = query.find_columns(["id", "str"])
+    assert query.find_columns(["id", "str"])["id"] is columns["id"]
+    with pytest.raises(ValueError):
+        columns["id"][0] = 5
+
+    query.limit(1)
+    assert query.count() == 1
+
+    # any commit changing the entity invalidates its cached results, also through AsyncBox
+    box.put(TestEntity("foo"))
+    assert query.count() == 1
+    query.limit(0)
+    assert query.count() == 3
+    async_box = objectbox.AsyncBox(box)
+    async_box.put(TestEntity("foo"))
+    async_box.await_completion()
+    assert query.count() == 4
+    assert len(query.find_columns(["id"])["id"]) == 4
+    async_box.close()
+
+    # results read inside a transaction are not cached
+    with ob.write_tx():
+        box.put(TestEntity("foo"))
+        assert query.count() == 5
+    hits = ob.query_cache.hits
+    assert query.count() == 5
+    assert ob.query_cache.hits == hits
+
+    ob.close()
+
+
+def test_combined_conditions():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    str_prop: Property = TestEntity.properties[1]
+    int_prop: Property = TestEntity.properties[3]
+    for i in range(10):
+        object = TestEntity("foo" if i % 2 else "bar")
+        object.int64 = i
+        box.put(object)
+
+    def find(condition) -> list:
+        return sorted(object.int64 for object in box.query(condition).build().find())
+
+    assert find(str_prop.equals("foo") & int_prop.greater_than(4)) == [5, 7, 9]
+    assert find(int_prop.less_than(2) | int_prop.greater_than(7)) == [0, 1, 8, 9]
+    assert find((int_prop.less_than(2) | int_prop.greater_than(7)) & str_prop.equals("bar")) == [0, 8]
+    assert find(int_prop.less_than(2) | int_prop.greater_than(7) & str_prop.equals("bar")) == [0, 1, 8]
+    assert find(int_prop.equals(1) | int_prop.equals(2) | int_prop.equals(3)) == [1, 2, 3]
+    assert find(None) == list(range(10))
+    assert box.query(str_prop.equals("foo") & int_prop.between(2, 6)).build().count() == 2
+
+    # the public QueryBuilder methods can still be chained (conditions are combined with AND)
+    builder = box.query(str_prop.equals("foo"))
+    assert builder.greater_than_int(int_prop._id, 2).less_than_int(int_prop._id, 7) is builder
+    assert builder.build().count() == 2
+
+    with pytest.raises(Exception):
+        str_prop.equals("foo") & "bar"
+
+    ob.close()
+
+
+def test_conditions():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    str_prop: Property = TestEntity.properties[1]
+    int64_prop: Property = TestEntity.properties[3]
+    int32_prop: Property = TestEntity.properties[4]
+    float64_prop: Property = TestEntity.properties[7]
+    bytes_prop: Property = TestEntity.properties[10]
+    for i in range(10):
+        object = TestEntity("Foo%d" % i)
+        object.int64 = i
+        object.int32 = i
+        object.float64 = i / 2
+        object.bytes = bytes([i, i])
+        box.put(object)
+
+    def find(condition) -> list:
+        return sorted(object.int64 for object in box.query(condition).build().find())
+
+    assert find(float64_prop.greater_than(3.5)) == [8, 9]
+    assert find(float64_prop.less_or_equal(1)) == [0, 1, 2]
+    assert find(float64_prop.between(0.9, 2.1)) == [2, 3, 4]
+    assert find(bytes_prop.equals(bytes([3, 3]))) == [3]
+    assert find(bytes_prop.greater_or_equal(bytes([8]))) == [8, 9]
+    assert find(str_prop.equals("FOO1", case_sensitive=False)) == [1]
+    assert find(str_prop.equals("FOO1")) == []
+
+    assert find(int64_prop.is_in(np.array([2, 4, 42], dtype=np.int64))) == [2, 4]
+    assert find(int64_prop.is_in(i for i in range(3))) == [0, 1, 2]
+    assert find(int32_prop.is_in([7, 8])) == [7, 8]
+    assert find(int32_prop.not_in(np.arange(1, 10))) == [0]
+    assert find(int64_prop.not_in(range(2, 10))) == [0, 1]
+    assert find(str_prop.is_in(["Foo3", "foo5"])) == [3]
+    assert find(str_prop.is_in(["Foo3", "foo5"], case_sensitive=False)) == [3, 5]
+
+    with pytest.raises(Exception):
+        box.query(float64_prop.equals(1.5)).build()
+    ob.close()
+
+    remove_test_dir()
+    ob = load_empty_test_datetime()
+    box = objectbox.Box(ob, TestEntityDatetime)
+    date_prop: Property = TestEntityDatetime.properties[1]
+    date_nano_prop: Property = TestEntityDatetime.properties[2]
+    for day in (1, 2, 3):
+        object = TestEntityDatetime()
+        object.date = object.date_nano = datetime(2023, 1, day)
+        box.put(object)
+    assert box.query(date_prop.greater_than(datetime(2023, 1, 1, 12))).build().count() == 2
+    assert box.query(date_nano_prop.between(datetime(2023, 1, 1), datetime(2023, 1, 2))).build().count() == 2
+    assert box.query(date_prop.is_in([datetime(2023, 1, 3)])).build().count() == 1
+    ob.close()
+
+
+def test_query_params():
+    ob = load_empty_test_objectbox(query_cache_size=100000)
+    box = objectbox.Box(ob, TestEntity)
+    str_prop: Property = TestEntity.properties[1]
+    int_prop: Property = TestEntity.properties[3]
+    float_prop: Property = TestEntity.properties[7]
+    for i in range(10):
+        object = TestEntity("foo" if i % 2 else "bar")
+        object.int64 = i
+        object.float64 = i / 2
+        box.put(object)
+
+    def ints(query) -> list:
+        return sorted(object.int64 for object in query.find())
+
+    with box.query(str_prop.equals("foo").alias("str") & int_prop.between(0, 9).alias("range")).build() as query:
+        assert ints(query) == [1, 3, 5, 7, 9]
+        assert ints(query.set(range=(2, 5))) == [3, 5]
+        assert ints(query.set(str="bar")) == [2, 4]
+        assert query.count() == 2
+        assert query.set(str="foo").count() == 2  # not the cached count of "bar"
+        with pytest.raises(Exception):
+            query.set(unknown=1)
+
+    query = box.query(int_prop.is_in([1, 2]).alias("ids") | float_prop.greater_than(4).alias("min")).build()
+    assert ints(query) == [1, 2, 9]
+    assert ints(query.set(ids=np.array([5, 6]), min=3.5)) == [5, 6, 8, 9]
+    query.close()
+
+    # cached queries are reused for conditions of the same shape
+    first = box.cached_query(str_prop.equals("foo") & int_prop.greater_than(5))
+    assert ints(first) == [7, 9]
+    first.limit(1)
+    second = box.cached_query(str_prop.equals("bar") & int_prop.greater_than(1))
+    assert second is first
+    assert ints(second) == [2, 4, 6, 8]
+    other = box.cached_query(str_prop.equals("bar") | int_prop.greater_than(1))
+    assert other is not first
+    assert other.count() == 9
+
+    # a float compared with an int property is a different (double) condition, rejected by the core like for
+    # query(), instead of being truncated by the cached query for ints
+    assert box.cached_query(int_prop.greater_than(5)).count() == 4
+    with pytest.raises(CoreException):
+        box.cached_query(int_prop.greater_than(5.5))
+    assert box.cached_query(float_prop.greater_than(3)).count() == 3
+    assert box.cached_query(float_prop.greater_than(3.5)).count() == 2
+
+    # cached queries are closed when their thread ends or the store is closed
+    thread_queries = []
+    thread = threading.Thread(target=lambda: thread_queries.append(box.cached_query(int_prop.equals(1))))
+    thread.start()
+    thread.join()
+    gc.collect()
+    assert thread_queries[0]._c_query is None
+    ob.close()
+    assert first._c_query is None
+
+
+def test_property_query():
+    ob = load_empty_test_objectbox(query_cache_size=100000)
+    box = objectbox.Box(ob, TestEntity)
+    int_prop: Property = TestEntity.properties[3]
+    for i in range(10):
+        object = TestEntity("foo" if i % 2 else "Foo")
+        object.int64 = i
+        object.int32 = i % 3
+        object.float64 = i / 2
+        box.put(object)
+
+    query = box.query(int_prop.greater_or_equal(0).alias("min")).build()
+    ints = query.property(int_prop)
+    assert (ints.min(), ints.max(), ints.sum(), ints.avg()) == (0, 9, 45, 4.5)
+    assert isinstance(ints.max(), int)
+    floats = query.property("float64")
+    assert (floats.min(), floats.max(), floats.sum(), floats.avg()) == (0.0, 4.5, 22.5, 2.25)
+    assert query.property("int32").count() == 10
+    assert query.property("int32").count(distinct=True) == 3
+    assert sorted(query.property("int32").distinct()) == [0, 1, 2]
+    assert sorted(query.property("str").distinct()) == ["Foo", "foo"]
+    assert query.property("str").count(distinct=True, case_sensitive=False) == 1
+    assert query.property("int64").find().dtype == np.int64
+
+    # follows the query parameters (and isn't served from the query cache of other values)
+    query.set(min=5)
+    assert (ints.min(), ints.sum()) == (5, 35)
+    query.set(min=10)
+    assert (ints.min(), ints.max(), ints.sum(), ints.avg(), ints.count()) == (None, None, 0, None, 0)
+    assert len(query.property("str").distinct()) == 0
+
+    with pytest.raises(Exception, match="isn't numeric"):
+        query.property("bytes").sum()
+    with pytest.raises(Exception, match="isn't numeric"):
+        query.property("bool").max()
+    query.set(min=0).limit(5)
+    with pytest.raises(Exception, match="offset/limit"):
+        ints.max()
+    query.limit(0)
+    assert ints.max() == 9
+    with pytest.raises(Exception):
+        query.property(TestEntityDatetime.properties[1])
+    ob.close()
@@ -40,3 +40,49 @@ def test_transactions():
         assert "Cannot start a write transaction inside a read only transaction" in str(err)
     finally:
         ob.close()
+
+
+def test_transaction_reuse():
+    ob = load_empty_test_objectbox()
+    box = objectbox.Box(ob, TestEntity)
+    assert ob.current_tx() is None
+
+    with ob.write_tx() as tx:
+        assert tx.is_write()
+        assert ob.current_tx() is tx
+        box.put([TestEntity("first"), TestEntity("second")])
+
+        # nested calls (including reads) reuse the outer transaction and see its changes
+        with ob.read_tx() as nested:
+            assert nested is tx
+            assert box.count() == 2
+            assert box.get(1).str == "first"
+        with ob.write_tx() as nested:
+            assert nested is tx
+            box.put(TestEntity("third"))
+    assert ob.current_tx() is None
+    assert box.count() == 3
+
+    # an exception in a nested block aborts the outer transaction, too
+    try:
+        with ob.write_tx():
+            box.put(TestEntity("fourth"))
+            with ob.write_tx():
+                box.remove_all()
+                raise Exception("mission abort!")
+    except Exception as err:
+        assert str(err) == "mission abort!"
+    assert box.count() == 3
+
+    with ob.read_tx() as tx:
+        assert not tx.is_write()
+        assert [o.str for o in box.get_many([1, 3])] == ["first", "third"]
+        try:
+            with ob.write_tx():
+                pass
+            assert 0
+        except Exception as err:
+            assert "Cannot start a write transaction inside a read only transaction" in str(err)
+    assert ob.current_tx() is None
+
+    ob.close()